@@ -0,0 +1,51 @@
+"""
+Measures CPU used by idle GUI main loop.
+
+Starts Mousai window, optionally starts playing a song, and reports process CPU time
+as percentage of one core over the measured period. Needs display and PySimpleGUI.
+
+Usage: python benchmarks/idle_cpu.py [seconds] [audio file to play]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "mousai"))
+
+from mousai import MousaiGUI  # noqa: E402
+from player.playlist import PlaylistItem  # noqa: E402
+
+
+def measure(seconds: float, song_path: Path | None = None) -> float:
+    app = MousaiGUI()
+    if song_path is not None:
+        song = PlaylistItem.from_file(song_path)
+        app.player.playlist.add(song)
+        app.set_current_song(song)
+
+    result = {}
+
+    def stop():
+        time.sleep(1)  # let window settle
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        time.sleep(seconds)
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+        result["cpu"] = cpu / wall * 100
+        app.window.write_event_value("Exit", None)
+
+    threading.Thread(target=stop, daemon=True).start()
+    app.run()
+    return result["cpu"]
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    song_path = Path(sys.argv[2]) if len(sys.argv) > 2 else None
+    state = "playing" if song_path else "idle"
+    print(f"{state}: {measure(seconds, song_path):.2f}% CPU")
@@ -0,0 +1,57 @@
+"""
+Measures memory used by `Playlist` per track.
+
+Metadata is generated the way parser would create it - every string is a new object,
+even when the same artist/album repeats - so interning and sharing of values is measured too.
+
+Usage: python benchmarks/playlist_memory.py [number of tracks]
+"""
+
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mousai.player.playlist import ArtRef, AudioMetaData, Playlist, PlaylistItem
+
+
+def fresh(value: str) -> str:
+    # build new string object with same content, like parser does for every file
+    return "".join(list(value))
+
+
+def make_item(i: int) -> PlaylistItem:
+    artist = f"Artist {i // 120}"
+    album = f"Album {i // 12}"
+    path = Path(f"/home/user/Music/{artist}/{album}/{i % 12 + 1:02} Track {i}.mp3")
+    meta = AudioMetaData(
+        path.name,
+        180.0 + i % 120,
+        fresh(artist),
+        fresh(album),
+        f"Track {i}",
+        fresh("Rock"),
+        fresh("2015"),
+        ArtRef(str(path), fresh("0123456789abcdef0123456789abcdef%08x" % (i // 12))),
+    )
+    return PlaylistItem(path, meta)
+
+
+def measure(count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    playlist = Playlist()
+    for i in range(count):
+        playlist.add(make_item(i))
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(playlist) == count
+    return size / count
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} tracks: {measure(count):.0f} bytes per track")
@@ -0,0 +1,85 @@
+"""
+Measures Mousai cold start: time from starting Python process to first window shown
+and to player being ready to play (mixer initialized).
+
+Every run starts new process, so imports are measured too (OS file cache stays warm after first run).
+Also reports which of heavy optional modules were already imported when window was shown.
+Needs display and PySimpleGUI.
+
+Usage: python benchmarks/startup.py [runs]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+MOUSAI_DIR = Path(__file__).resolve().parents[1] / "mousai"
+DEFERRED_MODULES = ("PIL.Image", "eyed3")
+
+
+def child(started: float) -> None:
+    """Runs in measured process; `started` is wall clock time before process was spawned"""
+    sys.path.insert(0, str(MOUSAI_DIR))
+    from mousai import MousaiGUI
+
+    imported = time.time()
+    app = MousaiGUI()
+    app.window.refresh()
+    window = time.time()
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    app.player.wait_ready()
+    ready = time.time()
+
+    app.window.write_event_value("Exit", None)
+    app.run()
+
+    print(
+        json.dumps(
+            {
+                "imports_ms": (imported - started) * 1000,
+                "first_window_ms": (window - started) * 1000,
+                "ready_to_play_ms": (ready - started) * 1000,
+                "loaded_before_window": loaded,
+            }
+        )
+    )
+
+
+def measure(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.time()
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", repr(started)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    result: dict = {"runs": runs}
+    for key in ("imports_ms", "first_window_ms", "ready_to_play_ms"):
+        values = [sample[key] for sample in samples]
+        result[key] = {
+            "median": round(statistics.median(values), 1),
+            "min": round(min(values), 1),
+        }
+    result["loaded_before_window"] = samples[-1]["loaded_before_window"]
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(float(sys.argv[2]))
+    else:
+        runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+        print(json.dumps(measure(runs), indent=2))
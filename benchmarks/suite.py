@@ -0,0 +1,378 @@
+"""
+Benchmark suite of Mousai hot paths, run against generated library (see `synthetic_library.py`).
+
+Every case is run `--repeat` times; results are written as JSON with run times, median and time per operation,
+together with commit and machine it ran on, so results of two commits can be compared:
+
+    python benchmarks/suite.py --output before.json
+    git checkout other-branch
+    python benchmarks/suite.py --output after.json --compare before.json
+
+`--compare` prints ratio of median time per operation for every case and exits with status 1
+if any case is slower than `--threshold` times the baseline.
+Library is kept in `--library` directory (temporary one by default) and reused when it exists.
+
+Usage: python benchmarks/suite.py [--tracks N] [--art-sizes 300,1200] [--playlist-size N] [--only NAME] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Sequence
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(1, str(Path(__file__).resolve().parent))
+
+from mousai import utils  # noqa: E402
+from mousai.player.audio_player import AudioPlayer  # noqa: E402
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem  # noqa: E402
+from mousai.table_model import TableModel  # noqa: E402
+from synthetic_library import FORMATS, generate_library, make_art  # noqa: E402
+
+Case = Dict[str, Any]
+
+# Restarts are slower than other player operations, they are measured fewer times
+RESTART_OPS = 20
+
+
+def run_case(
+    func: Callable[[Any], Any],
+    ops: int,
+    repeat: int,
+    setup: Callable[[], Any] = lambda: None,
+) -> Case:
+    """Times `func(setup())` `repeat` times; only `func` is timed, garbage collection is done before every run"""
+    runs = []
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        runs.append(time.perf_counter() - start)
+
+    median = statistics.median(runs)
+    return {
+        "ops": ops,
+        "runs_ms": [round(run * 1000, 4) for run in runs],
+        "min_ms": round(min(runs) * 1000, 4),
+        "median_ms": round(median * 1000, 4),
+        "per_op_us": round(median / ops * 1e6, 4),
+    }
+
+
+class Suite:
+    def __init__(self, library: Path, args: argparse.Namespace) -> None:
+        self.args = args
+        self.songs = generate_library(
+            library, args.tracks, args.art_sizes, args.seconds
+        )
+        self.paths = [song.path for song in self.songs]
+        self.results: Dict[str, Case] = {}
+
+        # playlist items are made from metadata of generated files, repeated up to `playlist_size`
+        metas = [AudioMetaData.from_file(path) for path in self.paths]
+        self.items = [
+            PlaylistItem(self.paths[i % len(metas)], metas[i % len(metas)])
+            for i in range(args.playlist_size)
+        ]
+
+    def add(self, name: str, case: Callable[[], Case]) -> None:
+        if self.args.only and not any(part in name for part in self.args.only):
+            return
+        print(f"{name}...", file=sys.stderr)
+        self.results[name] = case()
+
+    def run(self) -> Dict[str, Case]:
+        repeat = self.args.repeat
+
+        for suffix in FORMATS:
+            paths = [p for p in self.paths if p.suffix == suffix]
+            if paths:
+                self.add(
+                    f"metadata.from_file[{suffix[1:]}]",
+                    lambda paths=paths: run_case(
+                        lambda _: [AudioMetaData.from_file(p) for p in paths],
+                        len(paths),
+                        repeat,
+                    ),
+                )
+
+        self.add(
+            "playlistitem.from_file",
+            lambda: run_case(
+                lambda _: [PlaylistItem.from_file(p) for p in self.paths],
+                len(self.paths),
+                repeat,
+            ),
+        )
+
+        self.add_playlist_cases()
+        self.add("playlist_to_table", self.playlist_to_table)
+
+        for size in self.args.art_sizes:
+            art = make_art(size, seed=size)
+            self.add(
+                f"utils.resize_img[{size}px]",
+                lambda art=art: run_case(
+                    lambda _: utils.resize_img(art), 1, max(repeat, 5)
+                ),
+            )
+
+        self.add_player_cases()
+        return self.results
+
+    def add_playlist_cases(self) -> None:
+        items, repeat = self.items, self.args.repeat
+        ops = min(self.args.ops, len(items))
+
+        def filled() -> Playlist:
+            playlist = Playlist()
+            for item in items:
+                playlist.add(item)
+            return playlist
+
+        def add_all(playlist: Playlist) -> None:
+            for item in items:
+                playlist.add(item)
+
+        def remove_at_random(playlist: Playlist) -> None:
+            rng = random.Random(0)
+            for _ in range(ops):
+                playlist.remove(rng.randrange(len(playlist)))
+
+        def remove_by_id(playlist: Playlist) -> None:
+            for item in items[::-1][:ops]:
+                playlist.remove_item(item.id)
+
+        def pick_random(playlist: Playlist) -> None:
+            for _ in range(ops):
+                playlist.get_random_item()
+
+        self.add(
+            "playlist.add", lambda: run_case(add_all, len(items), repeat, Playlist)
+        )
+        self.add(
+            "playlist.remove[index]",
+            lambda: run_case(remove_at_random, ops, repeat, filled),
+        )
+        self.add(
+            "playlist.remove_item[id]",
+            lambda: run_case(remove_by_id, ops, repeat, filled),
+        )
+        self.add(
+            "playlist.get_random_item",
+            lambda: run_case(pick_random, ops, repeat, filled),
+        )
+
+    def playlist_to_table(self) -> Case:
+        """Renders first screen of the table and then scrolls to random positions"""
+        try:
+            sys.path.append(str(ROOT / "mousai"))
+            from mousai.mousai import MousaiGUI
+        except ImportError as e:
+            return {"skipped": f"can't import GUI: {e}"}
+
+        playlist = Playlist()
+        for item in self.items:
+            playlist.add(item)
+
+        # only the table model is needed, window is not created
+        gui = MousaiGUI.__new__(MousaiGUI)
+        gui.table_model = TableModel(playlist, gui.song_to_row)
+        ops = min(self.args.ops, 1000)
+        rng = random.Random(0)
+        offsets = [rng.randrange(len(playlist)) for _ in range(ops)]
+
+        def render(_) -> None:
+            gui.table_model.invalidate_all()
+            for offset in offsets:
+                gui.table_model.scroll_to(offset)
+                gui.playlist_to_table()
+
+        return run_case(render, ops, self.args.repeat)
+
+    def add_player_cases(self) -> None:
+        playlist = Playlist()
+        for item in self.items:
+            playlist.add(item)
+        player = AudioPlayer()
+        player.playlist = playlist
+        ops, repeat = self.args.ops, self.args.repeat
+
+        def fresh_queue() -> AudioPlayer:
+            player.rebuild_queue()
+            return player
+
+        def add_to_queue(player: AudioPlayer) -> None:
+            for item in self.items[:ops]:
+                player.add_to_queue(item, next=True)
+
+        def next_song(player: AudioPlayer) -> None:
+            for _ in range(ops):
+                player.add_to_history(player.get_next_song())
+
+        def remove_and_play_next(player: AudioPlayer) -> None:
+            # queue holds `ops` songs, every one is moved to the front and then removed
+            for item in self.items[:ops]:
+                player.add_to_queue(item)
+            for item in self.items[:ops]:
+                player.play_next(item)
+            for item in self.items[:ops]:
+                player.remove_from_queue(item.id)
+
+        def iterate(player: AudioPlayer) -> None:
+            for _ in range(ops):
+                for _ in player.get_playlistitems_gen(source="queue"):
+                    pass
+                for _ in player.get_playlistitems_gen(source="history"):
+                    pass
+
+        def restart(player: AudioPlayer) -> None:
+            # song is loaded into mixer again every time, from `track_cache` once its read in background
+            for _ in range(RESTART_OPS):
+                player.stop()
+                player.play()
+
+        def with_current_song() -> AudioPlayer:
+            player.change_song(self.items[0])
+            return player
+
+        for shuffle in (True, False):
+            player.set_shuffle(shuffle)
+            mode = "shuffle" if shuffle else "in_order"
+            self.add(
+                f"audio_player.next_song[{mode}]",
+                lambda: run_case(next_song, ops, repeat, fresh_queue),
+            )
+        self.add(
+            "audio_player.add_to_queue[next]",
+            lambda: run_case(add_to_queue, ops, repeat, fresh_queue),
+        )
+        self.add(
+            "audio_player.queue_play_next_remove",
+            lambda: run_case(remove_and_play_next, ops, repeat, fresh_queue),
+        )
+        self.add(
+            "audio_player.iterate_queue_history",
+            lambda: run_case(iterate, ops, repeat, fresh_queue),
+        )
+        self.add(
+            "audio_player.restart",
+            lambda: run_case(restart, RESTART_OPS, repeat, with_current_song),
+        )
+        player.stop()
+        player.clean_up()
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> bool:
+    """Prints ratio of time per operation of every case; returns `True` if any case regressed"""
+    regressed = False
+    for name, case in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or "per_op_us" not in old or "per_op_us" not in case:
+            print(f"{name:40} {'-':>12}")
+            continue
+        ratio = case["per_op_us"] / old["per_op_us"] if old["per_op_us"] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:40} {old['per_op_us']:>12.2f} -> {case['per_op_us']:>12.2f} us  x{ratio:.2f}{flag}"
+        )
+    return regressed
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mousai benchmark suite")
+    parser.add_argument("--library", type=Path, help="where to generate library")
+    parser.add_argument("--tracks", type=int, default=300, help="files in library")
+    parser.add_argument(
+        "--art-sizes",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        default=[300, 1200],
+        help="comma separated art sizes in pixels",
+    )
+    parser.add_argument("--seconds", type=float, default=5.0, help="song length")
+    parser.add_argument(
+        "--playlist-size", type=int, default=20_000, help="songs in playlist cases"
+    )
+    parser.add_argument("--ops", type=int, default=2_000, help="operations per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", help="run cases containing NAME")
+    parser.add_argument(
+        "--output", type=Path, help="write JSON here (stdout if not set)"
+    )
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str]) -> int:
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        suite = Suite(args.library or Path(tmp), args)
+        results = suite.run()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tracks": args.tracks,
+            "art_sizes": args.art_sizes,
+            "playlist_size": args.playlist_size,
+            "ops": args.ops,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,302 @@
+"""
+Generates library of tagged MP3, OGG and WAV files for benchmarks, so they run offline and on any machine.
+
+Files are laid out as `Artist/Album/NN Title.ext` with 12 songs per album and 10 albums per artist,
+formats alternate between songs. Every album has its own cover art embedded in all its songs;
+art sizes (in pixels, square) are taken in turn from `art_sizes`, so one library can mix small and big covers.
+Content depends only on arguments - libraries generated on different machines are the same.
+
+- MP3: silent MPEG-1 Layer III frames (128 kbps, 44.1 kHz) with ID3v2.3 tag written by eyed3
+- OGG: Ogg pages with Vorbis identification and comment headers (art as `METADATA_BLOCK_PICTURE`)
+  and last page granule position set to song length; there are no audio packets, files are meant
+  for tag readers and can't be played
+- WAV: 8 kHz mono silence with `LIST/INFO` tags, WAV files have no art
+
+Usage: python benchmarks/synthetic_library.py DIRECTORY [tracks] [art sizes, e.g. 300,1200]
+"""
+
+from __future__ import annotations
+
+import base64
+import random
+import struct
+import sys
+import zlib
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence
+
+import eyed3  # type: ignore
+from PIL import Image
+
+FORMATS = (".mp3", ".ogg", ".wav")
+SONGS_PER_ALBUM = 12
+ALBUMS_PER_ARTIST = 10
+GENRES = ("Rock", "Jazz", "Blues", "Pop", "Metal", "Classical", "Ambient", "Folk")
+
+# 128 kbps, 44.1 kHz, joint stereo; every frame is 417 bytes and lasts 1152 samples
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x64"
+MP3_FRAME_SIZE = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+OGG_SAMPLE_RATE = 44100
+WAV_SAMPLE_RATE = 8000
+
+
+class SyntheticSong(NamedTuple):
+    path: Path
+    artist: str
+    album: str
+    title: str
+    genre: str
+    year: str
+    track: int
+    seconds: float
+    art_size: int | None
+
+
+def make_art(size: int, seed: int) -> bytes:
+    """Returns JPEG image of `size`x`size` pixels; noise keeps it from compressing unrealistically well"""
+    rng = random.Random(seed)
+    color = tuple(rng.randrange(256) for _ in range(3))
+    img = Image.new("RGB", (size, size), color)  # type: ignore
+    noise = Image.effect_noise((size, size), 64).convert("RGB")
+    img = Image.blend(img, noise, 0.3)
+    data = BytesIO()
+    img.save(data, format="JPEG", quality=85)
+    return data.getvalue()
+
+
+def write_mp3(song: SyntheticSong, art: bytes | None) -> None:
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_SIZE - len(MP3_FRAME_HEADER))
+    song.path.write_bytes(frame * max(1, round(song.seconds / MP3_FRAME_SECONDS)))
+
+    audiofile = eyed3.load(song.path)
+    audiofile.initTag(version=eyed3.id3.ID3_V2_3)
+    tag = audiofile.tag
+    tag.artist = song.artist
+    tag.album = song.album
+    tag.title = song.title
+    tag.genre = song.genre
+    tag.recording_date = song.year
+    tag.track_num = song.track
+    if art is not None:
+        tag.images.set(eyed3.id3.frames.ImageFrame.FRONT_COVER, art, "image/jpeg")
+    tag.save()
+
+
+_CRC_TABLE: List[int] = []
+
+
+def ogg_crc(data: bytes) -> int:
+    if not _CRC_TABLE:
+        for i in range(256):
+            r = i << 24
+            for _ in range(8):
+                r = ((r << 1) ^ 0x04C11DB7) if r & 0x80000000 else r << 1
+            _CRC_TABLE.append(r & 0xFFFFFFFF)
+
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+
+def ogg_pages(
+    packet: bytes, serial: int, sequence: int, granule: int = 0, flags: int = 0
+) -> List[bytes]:
+    """Splits `packet` into Ogg pages (at most 255 segments each), first page gets `flags`"""
+    lacing = [255] * (len(packet) // 255) + [len(packet) % 255]
+    pages = []
+    offset = 0
+    for i in range(0, len(lacing), 255):
+        segments = lacing[i : i + 255]
+        body = packet[offset : offset + sum(segments)]
+        offset += len(body)
+        page_flags = flags if i == 0 else 0x01  # continued packet
+        last = i + 255 >= len(lacing)
+        header = struct.pack(
+            "<4sBBqIII",
+            b"OggS",
+            0,
+            page_flags,
+            granule if last else -1,
+            serial,
+            sequence + len(pages),
+            0,
+        ) + bytes([len(segments)] + segments)
+        page = bytearray(header + body)
+        struct.pack_into("<I", page, 22, ogg_crc(page))
+        pages.append(bytes(page))
+    return pages
+
+
+def flac_picture(art: bytes) -> bytes:
+    """Picture block stored base64 encoded in `METADATA_BLOCK_PICTURE` Vorbis comment"""
+    with Image.open(BytesIO(art)) as img:
+        width, height = img.size
+    mime = b"image/jpeg"
+    return (
+        struct.pack(">II", 3, len(mime))  # front cover
+        + mime
+        + struct.pack(">IIIIII", 0, width, height, 24, 0, len(art))
+        + art
+    )
+
+
+def write_ogg(song: SyntheticSong, art: bytes | None) -> None:
+    serial = song.track
+    identification = (
+        b"\x01vorbis"
+        + struct.pack("<IBIiii", 0, 2, OGG_SAMPLE_RATE, 0, 128000, 0)
+        + b"\xb8\x01"  # block sizes 256/2048, framing bit
+    )
+
+    comments = [
+        f"ARTIST={song.artist}",
+        f"ALBUM={song.album}",
+        f"TITLE={song.title}",
+        f"GENRE={song.genre}",
+        f"DATE={song.year}",
+        f"TRACKNUMBER={song.track}",
+    ]
+    encoded = [c.encode("utf-8") for c in comments]
+    if art is not None:
+        encoded.append(b"METADATA_BLOCK_PICTURE=" + base64.b64encode(flac_picture(art)))
+    vendor = b"mousai benchmarks"
+    comment = (
+        b"\x03vorbis"
+        + struct.pack("<I", len(vendor))
+        + vendor
+        + struct.pack("<I", len(encoded))
+        + b"".join(struct.pack("<I", len(c)) + c for c in encoded)
+        + b"\x01"
+    )
+
+    pages = ogg_pages(identification, serial, 0, flags=0x02)
+    pages += ogg_pages(comment, serial, len(pages))
+    pages += ogg_pages(
+        b"",
+        serial,
+        len(pages),
+        granule=round(song.seconds * OGG_SAMPLE_RATE),
+        flags=0x04,
+    )
+    song.path.write_bytes(b"".join(pages))
+
+
+def _riff_chunk(chunk_id: bytes, data: bytes) -> bytes:
+    return chunk_id + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)
+
+
+def write_wav(song: SyntheticSong) -> None:
+    fmt = struct.pack("<HHIIHH", 1, 1, WAV_SAMPLE_RATE, WAV_SAMPLE_RATE * 2, 2, 16)
+    data = bytes(2 * round(song.seconds * WAV_SAMPLE_RATE))
+    info = b"INFO" + b"".join(
+        _riff_chunk(chunk_id, value.encode("utf-8") + b"\0")
+        for chunk_id, value in (
+            (b"IART", song.artist),
+            (b"IPRD", song.album),
+            (b"INAM", song.title),
+            (b"IGNR", song.genre),
+            (b"ICRD", song.year),
+        )
+    )
+    body = (
+        b"WAVE"
+        + _riff_chunk(b"fmt ", fmt)
+        + _riff_chunk(b"data", data)
+        + _riff_chunk(b"LIST", info)
+    )
+    song.path.write_bytes(_riff_chunk(b"RIFF", body))
+
+
+def plan_library(
+    root: Path,
+    tracks: int,
+    art_sizes: Sequence[int] = (500,),
+    seconds: float = 5.0,
+    formats: Sequence[str] = FORMATS,
+) -> List[SyntheticSong]:
+    songs = []
+    for i in range(tracks):
+        album_no = i // SONGS_PER_ALBUM
+        artist = f"Artist {album_no // ALBUMS_PER_ARTIST:04}"
+        album = f"Album {album_no:05}"
+        title = f"Track {i:06}"
+        track = i % SONGS_PER_ALBUM + 1
+        suffix = formats[i % len(formats)]
+        path = root / artist / album / f"{track:02} {title}{suffix}"
+        art_size = art_sizes[album_no % len(art_sizes)] if art_sizes else None
+        songs.append(
+            SyntheticSong(
+                path,
+                artist,
+                album,
+                title,
+                GENRES[album_no % len(GENRES)],
+                str(1970 + album_no % 50),
+                track,
+                # lengths vary a little so songs are not all equal
+                seconds * (1 + (i % 7) / 10),
+                art_size,
+            )
+        )
+    return songs
+
+
+def generate_library(
+    root: Path,
+    tracks: int,
+    art_sizes: Sequence[int] = (500,),
+    seconds: float = 5.0,
+    formats: Sequence[str] = FORMATS,
+) -> List[SyntheticSong]:
+    """
+    Writes `tracks` songs under `root` and returns them; files that already exist are not written again,
+    so library can be generated once and reused between benchmark runs.
+    """
+    songs = plan_library(root, tracks, art_sizes, seconds, formats)
+    arts: Dict[str, bytes] = {}
+
+    for song in songs:
+        if song.path.exists():
+            continue
+        song.path.parent.mkdir(parents=True, exist_ok=True)
+
+        art = None
+        if song.art_size:
+            if song.album not in arts:
+                arts.clear()  # songs of one album are next to each other
+                arts[song.album] = make_art(
+                    song.art_size, seed=zlib.crc32(song.album.encode())
+                )
+            art = arts[song.album]
+
+        suffix = song.path.suffix
+        if suffix == ".mp3":
+            write_mp3(song, art)
+        elif suffix == ".ogg":
+            write_ogg(song, art)
+        elif suffix == ".wav":
+            write_wav(song)
+        else:
+            raise ValueError(f"{suffix!r} files are not supported")
+
+    return songs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+
+    root = Path(sys.argv[1])
+    tracks = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    art_sizes = (
+        [int(size) for size in sys.argv[3].split(",") if size]
+        if len(sys.argv) > 3
+        else [500]
+    )
+    songs = generate_library(root, tracks, art_sizes)
+    size = sum(song.path.stat().st_size for song in songs)
+    print(f"{len(songs)} songs, {size / 2**20:.1f} MiB in {root}")
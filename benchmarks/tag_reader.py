@@ -0,0 +1,125 @@
+"""
+Compares `tag_reader` with eyed3: bytes read from disk and time per file, by format,
+on generated library (see `synthetic_library.py`). Only MP3 files are read with eyed3,
+other formats were not parsed before `tag_reader`.
+
+Bytes read are taken from `rchar` of /proc/self/io (Linux only, `null` elsewhere) - it counts bytes
+returned by `read` calls, not only ones read from disk, so OS file cache doesnt hide them.
+Also reports MP3 files for which both readers return different metadata.
+
+Usage: python benchmarks/tag_reader.py [--tracks N] [--art-sizes 500,1200] [--library DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(1, str(Path(__file__).resolve().parent))
+
+from mousai.player.playlist import AudioMetaData  # noqa: E402
+from mousai.player.tag_reader import read_metadata  # noqa: E402
+from synthetic_library import FORMATS, generate_library  # noqa: E402
+
+# eyed3 computes duration with its own frame scan, it can differ a little
+PLAYTIME_TOLERANCE = 0.1
+
+
+def read_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(
+    reader: Callable[[Path], AudioMetaData], paths: Sequence[Path], repeat: int
+) -> Dict[str, Optional[float]]:
+    times = []
+    bytes_read: Optional[int] = None
+    for _ in range(repeat):
+        before = read_bytes()
+        start = time.perf_counter()
+        for path in paths:
+            reader(path)
+        times.append(time.perf_counter() - start)
+        after = read_bytes()
+        if before is not None and after is not None:
+            # reading /proc/self/io counts too, but its few hundred bytes per run
+            bytes_read = after - before
+
+    return {
+        "files": len(paths),
+        "per_file_us": round(statistics.median(times) / len(paths) * 1e6, 1),
+        "bytes_per_file": (
+            round(bytes_read / len(paths)) if bytes_read is not None else None
+        ),
+    }
+
+
+def mismatches(paths: Sequence[Path]) -> List[Dict[str, object]]:
+    found = []
+    for path in paths:
+        ours, eyed3 = read_metadata(path), AudioMetaData.from_eyed3(path)
+        fields = [
+            field
+            for field in ("artist", "album", "title", "genre", "release_date")
+            if getattr(ours, field) != getattr(eyed3, field)
+        ]
+        if (ours.art and ours.art.digest) != (eyed3.art and eyed3.art.digest):
+            fields.append("art")
+        if abs((ours.playtime or 0) - (eyed3.playtime or 0)) > PLAYTIME_TOLERANCE:
+            fields.append("playtime")
+        if fields:
+            found.append({"path": str(path), "fields": fields})
+    return found
+
+
+def main(argv: Sequence[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tracks", type=int, default=300)
+    parser.add_argument(
+        "--art-sizes",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        default=[500, 1200],
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--library", type=Path)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library = args.library or Path(tmp)
+        songs = generate_library(library, args.tracks, args.art_sizes)
+        result: Dict[str, object] = {"tracks": len(songs), "art_sizes": args.art_sizes}
+
+        for suffix in FORMATS:
+            paths = [song.path for song in songs if song.path.suffix == suffix]
+            if not paths:
+                continue
+            size = sum(path.stat().st_size for path in paths) / len(paths)
+            case: Dict[str, object] = {
+                "file_size": round(size),
+                "tag_reader": measure(read_metadata, paths, args.repeat),
+            }
+            if suffix == ".mp3":
+                case["eyed3"] = measure(AudioMetaData.from_eyed3, paths, args.repeat)
+                case["mismatches"] = mismatches(paths)
+            result[suffix[1:]] = case
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+Measures silence between two songs played one after another by `AudioPlayer`.
+
+Generates WAV files of known length and plays them the way GUI main loop does - checking for end of song
+every `POLL_INTERVAL` seconds - with gapless playback turned on and off. Mean gap is total time
+of playing all songs minus time of playing one file as long as all of them, divided by number of transitions;
+comparing with real playback time (not file length) makes result independent of audio driver clock.
+Runs with dummy SDL audio driver by default, so no sound card is needed.
+
+Usage: python benchmarks/transition_gap.py [number of transitions]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mousai.player.audio_player import AudioPlayer  # noqa: E402
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem  # noqa: E402
+
+SONG_SECONDS = 1.0
+POLL_INTERVAL = 0.02  # `TickScheduler.MIN_TIMEOUT`
+
+
+def write_silence(path: Path, seconds: float) -> None:
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(b"\0" * 4 * int(44100 * seconds))
+
+
+def play_time(player: AudioPlayer, item: PlaylistItem) -> float:
+    """Returns seconds it takes to play `item` alone"""
+    player.current_song = item
+    started = time.perf_counter()
+    player.play()
+    while player.is_playing():
+        time.sleep(0.001)
+    return time.perf_counter() - started
+
+
+def measure(player: AudioPlayer, transitions: int) -> float:
+    """Returns seconds it takes to play `transitions + 1` songs from queue"""
+    player.current_song = player.get_next_song()
+    started = time.perf_counter()
+    player.play()
+    done = 0
+
+    while done < transitions:
+        time.sleep(POLL_INTERVAL)
+        if not player.song_ended():
+            player.queue_next()
+            continue
+
+        song = player.get_next_song()
+        if not player.started_gaplessly(song):
+            player.stop()
+        player.current_song = song
+        player.play()
+        done += 1
+
+    # last song must not be followed by queued one
+    while player.is_playing():
+        time.sleep(0.001)
+    total = time.perf_counter() - started
+
+    player.stop()
+    return total
+
+
+if __name__ == "__main__":
+    transitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        items = []
+        for i in range(2):
+            path = Path(tmp) / f"{i}.wav"
+            write_silence(path, SONG_SECONDS)
+            items.append(PlaylistItem(path, AudioMetaData(path.name, SONG_SECONDS)))
+
+        path = Path(tmp) / "all.wav"
+        write_silence(path, SONG_SECONDS * (transitions + 1))
+        player = AudioPlayer()
+        baseline = play_time(player, PlaylistItem(path, AudioMetaData(path.name)))
+        player.clean_up()
+
+        for gapless in (False, True):
+            player = AudioPlayer()
+            player.gapless = gapless
+            player.set_shuffle(False)
+            player.playlist = Playlist(songs=items)
+            player.init_queue()
+            total = measure(player, transitions)
+            player.clean_up()
+            results["gapless" if gapless else "stop_load_play"] = {
+                "transitions": transitions,
+                "mean_gap_ms": round((total - baseline) / transitions * 1000, 2),
+                # silence between songs measured by player from mixer positions
+                "reported_gap_ms": round(statistics.mean(player.transition_gaps), 2),
+            }
+
+    print(json.dumps(results, indent=2))
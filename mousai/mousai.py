@@ -1,29 +1,109 @@
 from __future__ import annotations
 
-from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Generator, List
+from typing import Any, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
 
 import PySimpleGUI as sg
 
 import utils
-from player.audio_player import AudioPlayer
-from player.playlist import SUPPORTED_AUDIO_FILES, PlaylistItem
-
-WINDOW_TIMEOUT = 10
-
-
-class CustomTable(sg.Table):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.RowHeaderText = "#"
+from scheduler import TickScheduler
+from table_model import TableModel
+from player import perf
+from player.art_store import ArtStore
+from player.audio_player import FIRST_AUDIO_MARK, AudioPlayer
+from player.duplicates import DUPLICATES_FOUND_EVENT, DuplicateFinder
+from player.importer import (
+    IMPORT_BATCH_EVENT,
+    IMPORT_CANCELLED_EVENT,
+    IMPORT_DONE_EVENT,
+    IMPORT_PROGRESS_EVENT,
+    ImportProgress,
+    ImportResult,
+    LibraryImporter,
+    scan_audio_files,
+)
+from player.library import (
+    LIBRARY_CHANGES_EVENT,
+    LibraryWatcher,
+    PathIndex,
+    apply_library_changes,
+)
+from player.library_stats import GROUP_FIELDS, LibraryStats
+from player.loudness import (
+    LOUDNESS_DONE_EVENT,
+    LOUDNESS_PROGRESS_EVENT,
+    LoudnessAnalyzer,
+    LoudnessResult,
+)
+from player.metadata_cache import MetadataCache
+from player.playlist import SUPPORTED_AUDIO_FILES, ArtRef, PlayerError, PlaylistItem
+from player.playlist_file import (
+    FILE_EXTENSION,
+    PlaylistFileError,
+    PlaylistFileReader,
+    save_playlist,
+)
+from player.search import SearchIndex
+from player.shuffle import WEIGHT_NONE
+from player.sorting import SortIndex
+from player.text_playlist import (
+    M3U_EXTENSIONS,
+    PLS_EXTENSION,
+    TEXT_PLAYLIST_EXTENSIONS,
+    count_entries,
+    playlist_items,
+    read_text_playlist,
+    save_text_playlist,
+)
+from player.thumbnails import ThumbnailCache
 
 
 class MousaiGUI:
     PLAY_BTN_SYMBOL = "▶"
     PAUSE_BTN_SYMBOL = "| |"
 
+    # Worker pool used to parse metadata when importing songs;
+    # `None` picks number of workers based on cpu count
+    IMPORT_MAX_WORKERS: int | None = None
+    IMPORT_USE_PROCESSES = False
+    IMPORT_PROGRESS_METER_KEY = "-IMPORT_METER-"
+
+    # Memory used to keep files of recently played and upcoming songs, see `TrackCache`
+    TRACK_CACHE_BYTES = 256 * 1024 * 1024
+
+    # Songs are played at similar loudness using gain measured with "Analyze loudness"
+    NORMALIZE_VOLUME = True
+    LOUDNESS_MAX_WORKERS: int | None = None
+    LOUDNESS_PROGRESS_METER_KEY = "-LOUDNESS_METER-"
+
+    TABLE_HEADINGS = ["#", "Track", "Artist", "Duration"]
+    # Playlist table column -> sort order used when its heading is clicked, see `SORT_ORDERS`;
+    # clicking "#" heading shows playlist order again
+    TABLE_SORT_ORDERS = {1: "title", 2: "artist", 3: "duration"}
+
+    # Seconds skipped with arrow keys
+    SEEK_STEP = 5
+
+    # Songs shown at once in `Show queue`/`Show history` window
+    QUEUE_PAGE_SIZE = 20
+
+    BROWSE_HEADINGS = ["Name", "Songs", "Duration"]
+    # `Browse library` view -> field songs are grouped by
+    BROWSE_VIEWS = dict(zip(("Artists", "Albums", "Genres"), GROUP_FIELDS))
+
+    # Number of upcoming songs from queue which art thumbnails are rendered ahead of time
+    THUMBNAIL_PREFETCH_COUNT = 3
+    # See `ShuffleEngine`
+    SHUFFLE_WEIGHTING = WEIGHT_NONE
+    SHUFFLE_ARTIST_SPACING = 3
+
     audio_file_types = (("Supported audio file", " ".join(SUPPORTED_AUDIO_FILES)),)
+    playlist_file_types = (
+        ("Mousai playlist", f"*{FILE_EXTENSION}"),
+        ("M3U playlist", " ".join(f"*{ext}" for ext in M3U_EXTENSIONS)),
+        ("PLS playlist", f"*{PLS_EXTENSION}"),
+    )
 
     menu_layout = [
         [
@@ -34,23 +114,64 @@ class MousaiGUI:
                 "---",
                 "Show queue",
                 "Show history",
+                "Browse library",
                 "---",
-                "!Save playlist",
-                "!Load playlist",
+                "Save playlist",
+                "Load playlist",
+                "Remove duplicates",
+                "Analyze loudness",
                 "---",
                 "&Exit",
             ],
         ],
         ["Edit", ["!Settings"]],
-        ["Help", "!About"],
+        ["Help", ["!About", "---", "Performance stats", "Export performance stats"]],
     ]
 
     def __init__(self, theme: str = "DarkAmber") -> None:
         self._default_art_cover = utils.get_default_art_cover()
         self.theme = theme
-        self.player = AudioPlayer()
+        # Mixer is initialized in background once window is shown, see below
+        self.player = AudioPlayer(
+            init_mixer=False,
+            track_cache_bytes=self.TRACK_CACHE_BYTES,
+            seek_index_path=utils.get_data_dir() / "seek_index.sqlite3",
+        )
+        self.player.shuffle.weighting = self.SHUFFLE_WEIGHTING
+        self.player.shuffle.artist_spacing = self.SHUFFLE_ARTIST_SPACING
+        self.player.normalize_volume = self.NORMALIZE_VOLUME
+        self._importer: LibraryImporter | None = None
+        self._loudness_analyzer: LoudnessAnalyzer | None = None
+        self._finding_duplicates = False
+        self.scheduler = TickScheduler()
+        # Last values set with `update_widget`
+        self._widget_values: Dict[str, Any] = {}
+        self.metadata_cache = MetadataCache(utils.get_data_dir() / "metadata.sqlite3")
+        self.art_store = ArtStore()
+        self.thumbnails = ThumbnailCache(
+            self.art_store,
+            perf.timed("utils.resize_img")(utils.resize_img),
+            utils.get_data_dir() / "thumbnails",
+        )
+        self.search_index = SearchIndex(self.player.playlist)
+        self.search_query = ""
+        self.sort_index = SortIndex(self.player.playlist)
+        self.sort_order: str | None = None
+        self.sort_reverse = False
+        self.library_stats = LibraryStats(self.player.playlist)
+        # (field, value) of group picked in `Browse library`, only its songs are shown in table
+        self.browse_filter: Tuple[str, Optional[str]] | None = None
+        self.table_model = TableModel(self.player.playlist, self.song_to_row)
         self.layout = self.create_layout()
         self.window = sg.Window("Mousai", self.layout, resizable=False, finalize=True)
+        self.player.init_mixer(background=True)
+
+        # Directories added to playlist are watched and changed files are synced with playlist
+        self.library_paths = PathIndex(self.player.playlist)
+        self.library = LibraryWatcher(
+            self.window.write_event_value, cache=self.metadata_cache
+        )
+        self.library.start()
 
         # Keyboard shortcuts
         # 'RETURN': Start selected song from playlist
@@ -58,63 +179,91 @@ class MousaiGUI:
         # 'M': Increase volume
         # 'SPACE': Pause/Resume current song
         # 'R': Restart current song
+        # 'LEFT'/'RIGHT': Seek `SEEK_STEP` seconds back/forward
+        # 'ESCAPE': Clear search (when typing in search box)
 
         self.window["-TABLE-"].bind("<Return>", "+START_KEY_PRESS+")
+        # Table shows only visible rows, scrolling moves them through the playlist
+        self.window["-TABLE-"].bind("<MouseWheel>", "+WHEEL+")
+        self.window["-TABLE-"].bind("<Button-4>", "+WHEEL_UP+")
+        self.window["-TABLE-"].bind("<Button-5>", "+WHEEL_DOWN+")
         self.window.bind("n", "+N_KEY_PRESS+")
         self.window.bind("m", "+M_KEY_PRESS+")
         self.window.bind("<space>", "+SPACE_KEY_PRESS+")
         self.window.bind("r", "+R_KEY_PRESS+")
-
-    def get_song_art(self, song_meta_art: BytesIO | None) -> bytes:
+        self.window.bind("p", "+P_KEY_PRESS+")
+        self.window.bind("<Left>", "+LEFT_KEY_PRESS+")
+        self.window.bind("<Right>", "+RIGHT_KEY_PRESS+")
+        # Clicking progress bar seeks to clicked position
+        self.window["-PROG_BAR-"].bind("<Button-1>", "+CLICK+")
+        self.window["-SEARCH-"].bind("<Escape>", "+CLEAR+")
+
+    def get_song_art(self, song_meta_art: ArtRef | None) -> bytes:
         """Returns song art cover to display in `Metadata` frame;
         If its not present in audio file metadata return default one."""
-        if not song_meta_art:
+        art = self.thumbnails.get(song_meta_art)
+        if not art:
             return self._default_art_cover
 
-        return utils.resize_img(song_meta_art)
+        return art
 
     def set_current_song(self, song: PlaylistItem) -> None:
-        if self.player.current_song is None:
-            # this runs when first song since launching the app is picked by user to be played
-            self.player.init_queue()
-        else:
-            self.player.add_to_history(self.player.current_song)
-
-        # Fixes bug where pygame mixer would not play next track if playback was paused
-        if self.player.playback_paused:
-            self.player.play()
+        # Song starts playing before metadata frame is updated, so art rendering doesnt delay it
+        self.player.change_song(song)
+        self.current_song_changed()
 
+    def current_song_changed(self) -> None:
+        """Updates play button, metadata frame and timers after song started playing"""
         self.window["-PLAY_PAUSE_BTN-"].update(self.PAUSE_BTN_SYMBOL)
-        self.player.stop()
-        self.player.current_song = song
 
         self.set_metadata_frame()
         self.set_timers()
 
-        self.player.play()
-
-        # Because when new music is loaded the volume is set to full volume
-        self.player.set_volume(self.player.volume)
+        upcoming = islice(
+            self.player.get_playlistitems_gen(source="queue"),
+            self.THUMBNAIL_PREFETCH_COUNT,
+        )
+        self.thumbnails.prefetch(song.meta.art for song in upcoming)
 
     def create_layout(self) -> List[List[sg.Pane]]:
         right_col = [
             [
-                CustomTable(
+                sg.Input(
+                    "",
+                    tooltip="Search by title, artist, album or genre",
+                    enable_events=True,
+                    expand_x=True,
+                    key="-SEARCH-",
+                )
+            ],
+            [
+                sg.Table(
                     values=self.playlist_to_table(),
-                    headings=["Track", "Artist", "Duration"],
-                    col_widths=[19, 15, 7],
+                    headings=self.TABLE_HEADINGS,
+                    col_widths=[5, 19, 15, 7],
                     max_col_width=15,
                     auto_size_columns=False,
-                    display_row_numbers=True,
                     justification="left",
+                    num_rows=self.table_model.visible_rows,
+                    hide_vertical_scroll=True,
                     expand_y=True,
                     enable_events=True,
                     enable_click_events=True,
                     key="-TABLE-",
-                )
-            ]
+                ),
+                sg.Slider(
+                    range=(0, self.table_model.max_offset),
+                    orientation="vertical",
+                    disable_number_display=True,
+                    enable_events=True,
+                    expand_y=True,
+                    size=(None, 10),
+                    key="-TABLE_SCROLL-",
+                ),
+            ],
         ]
         controls = [
+            sg.Button("|<", key="-PREV_SONG_BTN-"),
             sg.Button("<<", key="-RESTART_SONG_BTN-"),
             sg.Button(self.PLAY_BTN_SYMBOL, focus=True, key="-PLAY_PAUSE_BTN-"),
             sg.Button(">>", key="-NEXT_SONG_BTN-"),
@@ -164,7 +313,7 @@ class MousaiGUI:
                 sg.Text("-:--", key="-PLAY_DURATION-"),
             ],
             [
-                sg.Button("Random", disabled=True),
+                sg.Button(self.random_btn_text(), key="-RANDOM_BTN-"),
                 sg.Button("Loop", disabled=True),
                 sg.Push(),
                 *controls,
@@ -185,10 +334,32 @@ class MousaiGUI:
                     key="-VOLUME_SLIDER-",
                 ),
             ],
+            [sg.Text(self.status_text(), expand_x=True, key="-STATUS-")],
         ]
 
         return layout
 
+    def random_btn_text(self) -> str:
+        return "Random: on" if self.player.shuffle_enabled else "Random: off"
+
+    def toggle_shuffle(self) -> None:
+        """Turns random song picking on/off; songs already in queue are replaced"""
+        try:
+            self.player.set_shuffle(not self.player.shuffle_enabled)
+        except (
+            PlayerError
+        ):  # playlist is empty, queue is filled when first song is picked
+            pass
+        self.window["-RANDOM_BTN-"].update(self.random_btn_text())
+
+    def play_selected_song(self, song: PlaylistItem) -> None:
+        """Plays song picked by user from playlist table"""
+        perf.stats.mark(FIRST_AUDIO_MARK)
+        self.set_current_song(song)
+        if not self.player.shuffle_enabled:
+            # continue in playlist order from picked song
+            self.player.rebuild_queue()
+
     def get_audio_file_paths(self) -> None | Generator[Path, None, None]:
         """
         Opens file dialog where user can choose multiple files;
@@ -209,34 +380,370 @@ class MousaiGUI:
 
         return paths_gen
 
-    def get_audio_files_from_directory(self) -> None | Generator[Path, None, None]:
+    def get_audio_files_from_directory(self) -> None | Iterator[Path]:
         """
         Opens `FolderPopup` to let user choose directory;
-        Returns `None` if popup is cancelled, else generator with paths
+        Returns `None` if popup is cancelled, else lazy iterator with paths of supported audio files
+        found in directory and its subdirectories.
+        Directory is registered as library root, so later changes of its files are applied to playlist.
         """
         dir_path = sg.popup_get_folder("Choose directory", no_window=True)
 
-        if dir_path is None:
+        if not dir_path:
             return None
 
-        dir_path = Path(dir_path)
-        return dir_path.iterdir()
+        self.library.add_root(Path(dir_path))
+        return scan_audio_files(Path(dir_path))
+
+    def import_in_progress(self) -> bool:
+        """Returns `True` and lets user know if songs are being imported right now"""
+        if self._importer and self._importer.is_running():
+            sg.popup_error(
+                "Error",
+                "Another import is already in progress",
+                non_blocking=True,
+                keep_on_top=True,
+            )
+            return True
+        return False
+
+    def start_import(
+        self, paths: Iterator[Path | PlaylistItem], total: int | None = None
+    ) -> None:
+        """Starts parsing `paths` in background, results are handled in `run` as import events"""
+        if self.import_in_progress():
+            return
+
+        self._importer = LibraryImporter(
+            paths,
+            self.window.write_event_value,
+            total=total,
+            max_workers=self.IMPORT_MAX_WORKERS,
+            use_processes=self.IMPORT_USE_PROCESSES,
+            cache=self.metadata_cache,
+        )
+        self._importer.start()
+
+    def save_playlist_file(self) -> None:
+        path = sg.popup_get_file(
+            "Save playlist",
+            save_as=True,
+            no_window=True,
+            default_extension=FILE_EXTENSION,
+            file_types=self.playlist_file_types,
+        )
+        if not path:
+            return
+
+        try:
+            if Path(path).suffix.lower() in TEXT_PLAYLIST_EXTENSIONS:
+                saved = save_text_playlist(self.player.playlist, Path(path))
+            else:
+                saved = save_playlist(self.player.playlist, Path(path))
+        except (OSError, PlaylistFileError) as e:
+            sg.popup_error("Error", f"Cant save playlist\n{e}", keep_on_top=True)
+        else:
+            sg.popup_ok(
+                f"{saved} song{'s' if saved != 1 else ''} saved",
+                title="Success",
+                non_blocking=True,
+                keep_on_top=True,
+            )
+
+    def load_playlist_file(self) -> None:
+        """
+        Adds songs from saved playlist file, they are added in batches like imported songs.
+        M3U/PLS playlists are read while songs are imported; songs with title and duration in playlist
+        are not parsed (see `playlist_items`).
+        """
+        if self.import_in_progress():
+            return
+
+        path = sg.popup_get_file(
+            "Load playlist",
+            no_window=True,
+            file_types=self.playlist_file_types,
+        )
+        if not path:
+            return
+
+        if Path(path).suffix.lower() in TEXT_PLAYLIST_EXTENSIONS:
+            try:
+                total = count_entries(Path(path))
+                entries = read_text_playlist(Path(path))
+            except (OSError, PlaylistFileError) as e:
+                sg.popup_error("Error", f"Cant load playlist\n{e}", keep_on_top=True)
+                return
+
+            self.start_import(playlist_items(entries, self.metadata_cache), total=total)
+            return
+
+        try:
+            reader = PlaylistFileReader(Path(path))
+        except (OSError, PlaylistFileError) as e:
+            sg.popup_error("Error", f"Cant load playlist\n{e}", keep_on_top=True)
+            return
+
+        def read_items():
+            with reader:
+                yield from reader
+
+        self.start_import(read_items(), total=len(reader))
+
+    def find_duplicates(self) -> None:
+        """Looks for duplicated songs in background; `DUPLICATES_FOUND_EVENT` is sent with groups of them"""
+        if self._finding_duplicates:
+            return
+
+        self._finding_duplicates = True
+        songs = list(self.player.playlist)
+        self.window.perform_long_operation(
+            lambda: DuplicateFinder().find(songs), DUPLICATES_FOUND_EVENT
+        )
+
+    def handle_duplicates_found(self, groups: List[List[PlaylistItem]]) -> None:
+        self._finding_duplicates = False
+        count = len(self.player.playlist)
+        self.player.playlist.remove_duplicates(groups)
+        self.apply_search(self.search_query, keep_offset=True)
+
+        sg.popup_ok(
+            f"Removed {count - len(self.player.playlist)} duplicated songs",
+            title="Remove duplicates",
+            non_blocking=True,
+        )
+
+    def analyze_loudness(self) -> None:
+        """Measures loudness of songs that werent analyzed yet in background, see `handle_loudness_finished`"""
+        if self._loudness_analyzer and self._loudness_analyzer.is_running():
+            return
+
+        songs = [song for song in self.player.playlist if song.meta.gain is None]
+        if not songs:
+            sg.popup_ok(
+                "Loudness of all songs is already measured",
+                title="Analyze loudness",
+                non_blocking=True,
+                keep_on_top=True,
+            )
+            return
+
+        self._loudness_analyzer = LoudnessAnalyzer(
+            songs,
+            self.window.write_event_value,
+            max_workers=self.LOUDNESS_MAX_WORKERS,
+            cache=self.metadata_cache,
+        )
+        self._loudness_analyzer.start()
+
+    def handle_loudness_progress(self, progress: ImportProgress) -> None:
+        if self._loudness_analyzer is None:
+            return
+
+        keep_going = sg.one_line_progress_meter(
+            "Analyzing loudness",
+            progress.done,
+            progress.total,
+            f"Failed: {progress.failed}",
+            key=self.LOUDNESS_PROGRESS_METER_KEY,
+            orientation="h",
+            keep_on_top=True,
+        )
+        if not keep_going and progress.done < progress.total:
+            self._loudness_analyzer.cancel()
+
+    def handle_loudness_finished(self, result: LoudnessResult) -> None:
+        """Sets measured gain in metadata of songs; current song volume is adjusted right away"""
+        sg.one_line_progress_meter_cancel(key=self.LOUDNESS_PROGRESS_METER_KEY)
+        self._loudness_analyzer = None
+
+        for song_id, gain in result.gains.items():
+            try:
+                song = self.player.playlist.get(song_id)
+            except KeyError:
+                # removed from playlist while it was analyzed
+                continue
+            song.meta = song.meta._replace(gain=gain)
+
+        if self.player.current_song is not None:
+            self.player.set_volume(self.player.volume)
+
+        msg = f"Loudness of {len(result.gains)} songs measured"
+        if result.failed:
+            msg += f", {len(result.failed)} songs could not be decoded"
+        sg.popup_ok(msg, title="Analyze loudness", non_blocking=True, keep_on_top=True)
+
+    def show_perf_stats(self) -> None:
+        """Shows counts and latencies of instrumented hot paths; offers to start recording if its off"""
+        if not perf.stats.enabled:
+            answer = sg.popup_yes_no(
+                "Performance stats are not being recorded.\n"
+                f"Start recording now? (set {perf.PERF_ENV}=1 to record from start)",
+                title="Performance stats",
+                keep_on_top=True,
+            )
+            if answer == "Yes":
+                perf.stats.enabled = True
+            return
+
+        cache = self.player.track_cache.stats
+        cache_line = (
+            f"Track cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%}),"
+            f" {cache.items} files, {cache.size / 2**20:.1f} of"
+            f" {self.player.track_cache.max_bytes / 2**20:.0f} MiB"
+        )
+        sg.popup_scrolled(
+            "\n".join([*perf.stats.summary(), "", cache_line]),
+            title="Performance stats (ms)",
+            font=("Courier", 10),
+            size=(90, 20),
+            non_blocking=True,
+        )
+
+    def export_perf_stats(self) -> None:
+        path = sg.popup_get_file(
+            "Export performance stats",
+            save_as=True,
+            no_window=True,
+            default_extension=".json",
+            file_types=(("JSON", "*.json"),),
+        )
+        if not path:
+            return
+
+        try:
+            perf.stats.export(Path(path))
+        except OSError as e:
+            sg.popup_error(
+                "Error", f"Cant export performance stats\n{e}", keep_on_top=True
+            )
+
+    def handle_import_progress(self, progress: ImportProgress) -> None:
+        if self._importer is None:
+            return
+
+        # `one_line_progress_meter` returns False when user clicks its `Cancel` button
+        keep_going = sg.one_line_progress_meter(
+            "Importing songs",
+            progress.done,
+            progress.total,
+            f"Failed: {progress.failed}",
+            key=self.IMPORT_PROGRESS_METER_KEY,
+            orientation="h",
+            keep_on_top=True,
+        )
+        if not keep_going and progress.done < progress.total:
+            self._importer.cancel()
+
+    def handle_import_finished(self, result: ImportResult) -> None:
+        sg.one_line_progress_meter_cancel(key=self.IMPORT_PROGRESS_METER_KEY)
+        self._importer = None
+        self.metadata_cache.flush()
+
+        if result.failed:
+            failed_msg = "\n".join(f"{path}: {err}" for path, err in result.failed[:20])
+            if len(result.failed) > 20:
+                failed_msg += f"\n...and {len(result.failed) - 20} more"
+            sg.popup_error(
+                "Error",
+                f"Cant import {len(result.failed)} file{'s' if len(result.failed) > 1 else ''}",
+                failed_msg,
+                non_blocking=True,
+                keep_on_top=True,
+            )
+
+        if result.added > 0:
+            msg = f"{result.added} song{'s' if result.added > 1 else ''} added to playlist"
+            if result.cancelled:
+                msg += " before import was cancelled"
+            sg.popup_ok(msg, title="Success", non_blocking=True, keep_on_top=True)
+
+    def song_to_row(self, song: PlaylistItem) -> List[str]:
+        """Creates playlist table row in [Title, Artist, Duration] format"""
+        title = song.meta.title if song.meta.title else song.meta.file_name
+        artist = song.meta.artist if song.meta.artist else "-"
+        duration = "-"
+
+        if song.meta.playtime:
+            duration = utils.playtime_to_str(song.meta.playtime)
+
+        return [title, artist, duration]
 
     def playlist_to_table(self) -> List[List[str]]:
-        """Creates list of lists which contain values for playlist table in [Title, Artist, Duration] format"""
-        table_data = []
-        for song in self.player.playlist:
-            title = song.meta.title if song.meta.title else song.meta.file_name
-            artist = song.meta.artist if song.meta.artist else "-"
-            duration = "-"
+        """Creates list of lists which contain values for visible rows of playlist table in [#, Title, Artist, Duration] format"""
+        return self.table_model.get_visible_rows()
+
+    def apply_search(self, query: str, keep_offset: bool = False) -> None:
+        """
+        Shows only songs matching `query` in playlist table; empty query shows whole playlist.
+        Songs are sorted in `sort_order` if its set.
+        """
+        self.search_query = query.strip()
+        offset = self.table_model.offset if keep_offset else 0
+
+        source: Sequence[PlaylistItem] = self.player.playlist
+        ids: Sequence[int] | None = None
+        if self.search_query:
+            results = self.search_index.search(self.search_query)
+            source = results
+            ids = results.ids
+
+        if self.browse_filter is not None:
+            group = self.library_stats.item_ids(*self.browse_filter)
+            if ids is not None:
+                in_group = set(group)
+                group = [item_id for item_id in ids if item_id in in_group]
+            # songs of a group are shown in order they were added unless table is sorted
+            source = self.sort_index.sort(
+                group, self.sort_order or "added", self.sort_reverse
+            )
+        elif self.sort_order:
+            if ids is not None:
+                source = self.sort_index.sort(ids, self.sort_order, self.sort_reverse)
+            else:
+                source = self.sort_index.sorted(self.sort_order, self.sort_reverse)
 
-            if song.meta.playtime:
-                duration = utils.playtime_to_str(song.meta.playtime)
+        self.table_model.set_source(source, offset)
+        self.refresh_table()
 
-            table_data.append([title, artist, duration])
+    def sort_table(self, column: int) -> None:
+        """Sorts playlist table by clicked column; clicking the same column again reverses order"""
+        order = self.TABLE_SORT_ORDERS.get(column)
+        if order is not None and order == self.sort_order:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_order = order
+            self.sort_reverse = False
+
+        table = self.window["-TABLE-"].Widget
+        for i, heading in enumerate(self.TABLE_HEADINGS):
+            if order is not None and i == column:
+                heading += " ▼" if self.sort_reverse else " ▲"
+            table.heading(f"#{i + 1}", text=heading)
+
+        self.apply_search(self.search_query)
+
+    def typing_in_search(self) -> bool:
+        """Keyboard shortcuts are ignored while user types in search box"""
+        return self.window.find_element_with_focus() is self.window["-SEARCH-"]
+
+    def refresh_table(self) -> None:
+        """Updates playlist table if rows it shows changed"""
+        if self.table_model.dirty:
+            self.window["-TABLE-"].update(values=self.playlist_to_table())
+
+        max_offset = self.table_model.max_offset
+        self.window["-TABLE_SCROLL-"].update(
+            value=self.table_model.offset,
+            range=(0, max_offset),
+            disabled=max_offset == 0,
+        )
 
-        return table_data
+    def scroll_table(self, rows: int) -> None:
+        self.table_model.scroll_by(rows)
+        self.refresh_table()
 
+    @perf.timed("gui.set_metadata_frame")
     def set_metadata_frame(self) -> None:
         song = self.player.current_song
 
@@ -268,10 +775,56 @@ class MousaiGUI:
 
     def set_timers(self, start="0:00") -> None:
         end = "-:--"
+        duration = 0
         if self.player.current_song:
-            end = utils.playtime_to_str(self.player.current_song.meta.playtime)
-        self.window["-PLAY_TIME-"].update(start)
+            duration = self.player.current_song.meta.playtime
+            end = utils.playtime_to_str(duration)
+        self.update_widget("-PLAY_TIME-", start)
         self.window["-PLAY_DURATION-"].update(end)
+        self.window["-PROG_BAR-"].update(0, max=max(1, int(duration)))
+        self._widget_values["-PROG_BAR-"] = 0
+
+    def update_widget(self, key: str, value: Any) -> None:
+        """Updates widget only if `value` is different from the one it displays"""
+        if self._widget_values.get(key) != value:
+            self._widget_values[key] = value
+            self.window[key].update(value)
+
+    def window_visible(self) -> bool:
+        return self.window.TKroot.state() not in ("iconic", "withdrawn")
+
+    def update_playback(self) -> None:
+        """Starts next song if current one ended, else refreshes play time and progress bar"""
+        if self.player.song_ended():
+            # Get next song from queue and play it
+            self.set_current_song(self.player.get_next_song())
+            return
+
+        # Next song has to be in mixer queue before current one ends
+        self.player.queue_next()
+
+        current_playtime = self.player.get_playtime()
+        if current_playtime < 0:
+            return
+
+        current_playtime_in_seconds = int(current_playtime // 1000)
+        self.update_widget(
+            "-PLAY_TIME-", utils.playtime_to_str(current_playtime_in_seconds)
+        )
+        self.update_widget("-PROG_BAR-", current_playtime_in_seconds)
+
+    def next_read_timeout(self) -> int | None:
+        song = self.player.current_song
+        playing = song is not None and not self.player.playback_paused
+        if not playing:
+            return self.scheduler.next_timeout(False)
+
+        return self.scheduler.next_timeout(
+            True,
+            self.window_visible(),
+            self.player.get_playtime(),
+            song.meta.playtime * 1000,  # type: ignore
+        )
 
     def restart_current_song(self) -> None:
         if self.player.current_song:
@@ -279,6 +832,209 @@ class MousaiGUI:
                 self.player.play()
             self.set_current_song(self.player.current_song)
 
+    def play_previous_song(self) -> None:
+        """Plays last song from history, current song is played again after it"""
+        try:
+            self.player.play_previous()
+        except PlayerError:
+            return
+
+        self.current_song_changed()
+
+    def show_queue(self, source: str) -> None:
+        """
+        Shows queue or history (`source`) page by page, playback goes on while window is open.
+        Selected song can be moved to play next or removed from queue.
+        """
+        songs = self.player.get_play_queue(source)
+        page_size = self.QUEUE_PAGE_SIZE
+        buttons = [sg.Button("Play next")]
+        if source == "queue":
+            buttons.append(sg.Button("Remove"))
+
+        layout = [
+            [
+                sg.Listbox(
+                    [],
+                    size=(50, page_size),
+                    select_mode=sg.LISTBOX_SELECT_MODE_SINGLE,
+                    key="-SONGS-",
+                )
+            ],
+            [
+                sg.Button("<", key="-PREV_PAGE-"),
+                sg.Text("", size=9, justification="center", key="-PAGE-"),
+                sg.Button(">", key="-NEXT_PAGE-"),
+                sg.Push(),
+                *buttons,
+                sg.Button("Close"),
+            ],
+        ]
+        window = sg.Window(
+            source.capitalize(), layout, modal=True, keep_on_top=True, finalize=True
+        )
+
+        page = 0
+        shown: tuple | None = None
+        items: List[PlaylistItem] = []
+        while True:
+            pages = max(1, -(-len(songs) // page_size))
+            page = min(page, pages - 1)
+            # list is refreshed only when queue changed, so selection isnt lost
+            if shown != (page, songs.version):
+                shown = (page, songs.version)
+                start = page * page_size
+                items = songs.page(start, page_size)
+                window["-SONGS-"].update(
+                    [f"{i}. {song}" for i, song in enumerate(items, start=start + 1)]
+                )
+                window["-PAGE-"].update(f"{page + 1}/{pages}")
+
+            event, values = window.read(timeout=self.next_read_timeout())
+            if self.player.current_song and not self.player.playback_paused:
+                self.update_playback()
+
+            if event in (sg.WINDOW_CLOSED, "Close"):
+                break
+            elif event == "-PREV_PAGE-":
+                page = max(0, page - 1)
+            elif event == "-NEXT_PAGE-":
+                page += 1
+            elif event in ("Play next", "Remove"):
+                selected = window["-SONGS-"].get_indexes()
+                if not selected:
+                    continue
+                song = items[selected[0]]
+                if event == "Remove":
+                    self.player.remove_from_queue(song.id)
+                else:
+                    self.player.play_next(song)
+
+        window.close()
+
+    def status_text(self) -> str:
+        """Library totals shown in status bar; they are kept up to date by `LibraryStats`, nothing is counted here"""
+        stats = self.library_stats
+        total = stats.total
+        text = (
+            f"{total.songs} songs, {stats.count('artist')} artists, {stats.count('album')} albums,"
+            f" {utils.total_time_to_str(total.duration)}"
+        )
+        if self.browse_filter is not None:
+            field, name = self.browse_filter
+            text += f" | showing {field} {name or 'Unknown'}"
+        return text
+
+    def update_status_bar(self) -> None:
+        self.update_widget("-STATUS-", self.status_text())
+
+    def show_browser(self) -> None:
+        """
+        Shows artists, albums or genres with number of songs and their total duration;
+        songs of selected one can be shown in playlist table. Playback goes on while window is open.
+        """
+        views = list(self.BROWSE_VIEWS)
+        layout = [
+            [
+                sg.Combo(
+                    views,
+                    default_value=views[0],
+                    readonly=True,
+                    enable_events=True,
+                    key="-VIEW-",
+                )
+            ],
+            [
+                sg.Table(
+                    values=[],
+                    headings=self.BROWSE_HEADINGS,
+                    col_widths=[30, 7, 10],
+                    auto_size_columns=False,
+                    justification="left",
+                    num_rows=self.QUEUE_PAGE_SIZE,
+                    select_mode=sg.TABLE_SELECT_MODE_BROWSE,
+                    key="-GROUPS-",
+                )
+            ],
+            [
+                sg.Push(),
+                sg.Button("Show songs"),
+                sg.Button("Show all"),
+                sg.Button("Close"),
+            ],
+        ]
+        window = sg.Window(
+            "Browse library", layout, modal=True, keep_on_top=True, finalize=True
+        )
+
+        field = self.BROWSE_VIEWS[views[0]]
+        shown: tuple | None = None
+        groups = []
+        while True:
+            # list is refreshed only when library changed, so selection isnt lost
+            total = self.library_stats.total
+            if shown != (field, total):
+                shown = (field, total)
+                groups = self.library_stats.groups(field)
+                window["-GROUPS-"].update(
+                    values=[
+                        [
+                            group.name or "Unknown",
+                            group.songs,
+                            utils.total_time_to_str(group.duration),
+                        ]
+                        for group in groups
+                    ]
+                )
+
+            event, values = window.read(timeout=self.next_read_timeout())
+            if self.player.current_song and not self.player.playback_paused:
+                self.update_playback()
+
+            if event in (sg.WINDOW_CLOSED, "Close"):
+                break
+            elif event == "-VIEW-":
+                field = self.BROWSE_VIEWS[values["-VIEW-"]]
+            elif event == "Show songs":
+                selected = values["-GROUPS-"]
+                if not selected:
+                    continue
+                self.browse_filter = (field, groups[selected[0]].name)
+                self.apply_search(self.search_query)
+                break
+            elif event == "Show all":
+                self.browse_filter = None
+                self.apply_search(self.search_query)
+                break
+
+        window.close()
+
+    def seek(self, seconds: float) -> None:
+        """Plays current song from `seconds`, play time and progress bar are updated right away"""
+        if not self.player.current_song:
+            return
+
+        try:
+            position = self.player.seek(max(0.0, seconds))
+        except PlayerError as e:
+            sg.popup_error(
+                "Error", f"Cant seek\n{e}", non_blocking=True, keep_on_top=True
+            )
+            return
+
+        self.update_widget("-PLAY_TIME-", utils.playtime_to_str(int(position)))
+        self.update_widget("-PROG_BAR-", int(position))
+
+    def seek_to_click(self) -> None:
+        """Seeks to position of progress bar that was clicked"""
+        song = self.player.current_song
+        if not song or not song.meta.playtime:
+            return
+
+        bar = self.window["-PROG_BAR-"]
+        width = max(1, bar.Widget.winfo_width())
+        self.seek(bar.user_bind_event.x / width * song.meta.playtime)
+
     def handle_volume_change(self, value: float) -> None:
         if value > 100:
             value = 100
@@ -289,40 +1045,28 @@ class MousaiGUI:
         self.window["-VOLUME_SLIDER-"].update(value)
 
     def run(self) -> None:
+        frame_started: float | None = None
         while True:
-            event, values = self.window.read(timeout=WINDOW_TIMEOUT)  # type: ignore
-            if event != "__TIMEOUT__":
-                print(f"{event=} {values=}")
+            # Frame time is time spent handling an event, waiting for the next one is not included
+            perf.stats.stop("gui.frame", frame_started)
+            event, values = self.window.read(timeout=self.next_read_timeout())  # type: ignore
+            frame_started = perf.stats.start()
 
             # There is current song set and is not paused
             if self.player.current_song and not self.player.playback_paused:
-                current_playtime = self.player.get_playtime()
-
-                # Song ended
-                if current_playtime == -1:
-                    # Get next song from queue and play it
-                    self.set_current_song(self.player.get_next_song())
-                # Song playing
-                else:
-                    current_playtime_in_seconds = round(current_playtime / 1000)
-
-                    # Update play time and progress bar
-                    self.window["-PLAY_TIME-"].update(
-                        utils.playtime_to_str(current_playtime_in_seconds)
-                    )
-                    self.window["-PROG_BAR-"].update(
-                        current_playtime_in_seconds,
-                        self.player.current_song.meta.playtime,
-                    )
+                self.update_playback()
+            self.update_status_bar()
 
             # TABLE CLICKED Event has value in format ('.TABLE', '+CLICKED+', (row, col))
             if isinstance(event, tuple):
                 # Item in table was clicked
                 if event[0] == "-TABLE-":
-                    print(f"{event=} {values=}")
-                    value = event[2][0]
-                    if value is not None:  # can be None if user clicks on table headers
-                        self.set_current_song(self.player.playlist[value])
+                    value, column = event[2]
+                    # can be None or -1 if user clicks on table headers
+                    if value is not None and value >= 0:
+                        self.play_selected_song(self.table_model.item_at(value))
+                    elif value == -1 and column is not None:
+                        self.sort_table(column)
             else:
                 # MENU EVENTS
                 # Menu -> File -> Exit or window closed
@@ -337,41 +1081,81 @@ class MousaiGUI:
                         paths = self.get_audio_file_paths()
 
                     if paths:
-                        added_songs_count = 0
-                        for song_path in paths:
-                            try:
-                                playlist_item = PlaylistItem.from_file(song_path)
-                            except ValueError as e:
-                                sg.popup_error(
-                                    "Error",
-                                    f"Cant import {song_path}\n{e}",
-                                    non_blocking=True,
-                                    keep_on_top=True,
-                                )
-                            else:
-                                self.player.playlist.add(playlist_item)
-                                added_songs_count += 1
-
-                        if added_songs_count > 0:
-                            sg.popup_ok(
-                                f"{added_songs_count} song{'s' if added_songs_count > 1 else ''} added to playlist",
-                                title="Success",
-                                non_blocking=True,
-                                keep_on_top=True,
-                            )
+                        self.start_import(paths)
 
-                            self.window["-TABLE-"].update(
-                                values=self.playlist_to_table()
-                            )
+                # IMPORT EVENTS (sent from `LibraryImporter` thread)
+                elif event == IMPORT_BATCH_EVENT:
+                    start = len(self.player.playlist)
+                    for playlist_item in values[event]:
+                        self.player.playlist.add(playlist_item)
+
+                    if self.search_query or self.sort_order or self.browse_filter:
+                        # new songs can match current query or be sorted anywhere
+                        self.apply_search(self.search_query, keep_offset=True)
+                    else:
+                        self.table_model.items_changed(start, len(self.player.playlist))
+                        self.refresh_table()
+
+                # Text typed in search box
+                elif event == "-SEARCH-":
+                    self.apply_search(values["-SEARCH-"])
+
+                elif event == "-SEARCH-+CLEAR+":
+                    self.window["-SEARCH-"].update("")
+                    self.browse_filter = None
+                    self.apply_search("")
+
+                # Files in library directories changed (sent from `LibraryWatcher` thread)
+                elif event == LIBRARY_CHANGES_EVENT:
+                    apply_library_changes(
+                        self.player.playlist, self.library_paths, values[event]
+                    )
+                    self.apply_search(self.search_query, keep_offset=True)
+
+                elif event == IMPORT_PROGRESS_EVENT:
+                    self.handle_import_progress(values[event])
+
+                elif event == IMPORT_DONE_EVENT or event == IMPORT_CANCELLED_EVENT:
+                    self.handle_import_finished(values[event])
+
+                # Menu -> File -> Save playlist/Load playlist
+                elif event == "Save playlist":
+                    self.save_playlist_file()
+
+                elif event == "Load playlist":
+                    self.load_playlist_file()
+
+                # Menu -> File -> Remove duplicates
+                elif event == "Remove duplicates":
+                    self.find_duplicates()
+
+                elif event == DUPLICATES_FOUND_EVENT:
+                    self.handle_duplicates_found(values[event])
+
+                # Menu -> File -> Analyze loudness
+                elif event == "Analyze loudness":
+                    self.analyze_loudness()
+
+                elif event == LOUDNESS_PROGRESS_EVENT:
+                    self.handle_loudness_progress(values[event])
+
+                elif event == LOUDNESS_DONE_EVENT:
+                    self.handle_loudness_finished(values[event])
+
+                # Menu -> Help -> Performance stats/Export performance stats
+                elif event == "Performance stats":
+                    self.show_perf_stats()
+
+                elif event == "Export performance stats":
+                    self.export_perf_stats()
 
                 # Menu -> File -> Show queue/Show history
                 elif event == "Show queue" or event == "Show history":
-                    src: str = event.split()[-1]
-                    items = self.player.get_playlistitems_gen(source=src)
-                    msg = "\n".join(
-                        f"{i}. {str(song)}" for i, song in enumerate(items, start=1)
-                    )
-                    sg.popup_ok(msg, title=src.capitalize(), non_blocking=True)
+                    self.show_queue(event.split()[-1])
+
+                # Menu -> File -> Browse library
+                elif event == "Browse library":
+                    self.show_browser()
 
                 # BUTTONS/SLIDERS
                 # Volume slider moved
@@ -380,7 +1164,9 @@ class MousaiGUI:
                     self.handle_volume_change(value)
 
                 # Play/Pause btn clicked or spacebar pressed
-                elif event == "-PLAY_PAUSE_BTN-" or event == "+SPACE_KEY_PRESS+":
+                elif event == "-PLAY_PAUSE_BTN-" or (
+                    event == "+SPACE_KEY_PRESS+" and not self.typing_in_search()
+                ):
                     if self.player.current_song:
 
                         # Start playing if player was paused or pause if otherwise
@@ -392,16 +1178,29 @@ class MousaiGUI:
                         else:
                             self.player.pause()
                             self.window["-PLAY_PAUSE_BTN-"].update(self.PLAY_BTN_SYMBOL)
+                elif event == "-RANDOM_BTN-":
+                    self.toggle_shuffle()
+
+                # Previous Song btn clicked or P pressed
+                elif event == "-PREV_SONG_BTN-" or (
+                    event == "+P_KEY_PRESS+" and not self.typing_in_search()
+                ):
+                    perf.stats.mark(FIRST_AUDIO_MARK)
+                    self.play_previous_song()
+
                 elif event == "-RESTART_SONG_BTN-":
                     self.restart_current_song()
 
                 # Next Song btn clicked
                 elif event == "-NEXT_SONG_BTN-":
+                    perf.stats.mark(FIRST_AUDIO_MARK)
                     self.set_current_song(self.player.get_next_song())
 
                 # KEYBOARD SHORTCUTS
                 # Keyboard shortcut to change volume
-                elif event == "+N_KEY_PRESS+" or event == "+M_KEY_PRESS+":
+                elif (
+                    event == "+N_KEY_PRESS+" or event == "+M_KEY_PRESS+"
+                ) and not self.typing_in_search():
                     step = 5 if event[1] == "M" else -5
                     new_v = self.player.volume * 100 + step
 
@@ -409,14 +1208,48 @@ class MousaiGUI:
 
                 # Return key pressed on table item
                 elif event == "-TABLE-+START_KEY_PRESS+":
-                    value = values["-TABLE-"][0]
-                    self.set_current_song(self.player.playlist[value])
+                    if values["-TABLE-"]:
+                        value = values["-TABLE-"][0]
+                        self.play_selected_song(self.table_model.item_at(value))
+
+                # Playlist table scrolled
+                elif event == "-TABLE_SCROLL-":
+                    self.table_model.scroll_to(int(values["-TABLE_SCROLL-"]))
+                    self.refresh_table()
+
+                elif event == "-TABLE-+WHEEL+":
+                    delta = self.window["-TABLE-"].user_bind_event.delta
+                    self.scroll_table(-3 if delta > 0 else 3)
+
+                elif event == "-TABLE-+WHEEL_UP+" or event == "-TABLE-+WHEEL_DOWN+":
+                    self.scroll_table(-3 if event.endswith("UP+") else 3)
 
                 # 'R' key pressed
-                elif event == "+R_KEY_PRESS+":
+                elif event == "+R_KEY_PRESS+" and not self.typing_in_search():
                     self.restart_current_song()
 
+                # Arrow keys pressed
+                elif (
+                    event == "+LEFT_KEY_PRESS+" or event == "+RIGHT_KEY_PRESS+"
+                ) and not self.typing_in_search():
+                    step = self.SEEK_STEP if event[1] == "R" else -self.SEEK_STEP
+                    self.seek(self.player.get_playtime() / 1000 + step)
+
+                # Progress bar clicked
+                elif event == "-PROG_BAR-+CLICK+":
+                    self.seek_to_click()
+
         # Cleanup before exit
+        if self._importer:
+            self._importer.cancel()
+            self._importer.join()
+        if self._loudness_analyzer:
+            self._loudness_analyzer.cancel()
+            self._loudness_analyzer.join()
+        self.library.stop()
+        self.metadata_cache.close()
+        self.thumbnails.close()
+
         if self.player.is_playing:
             self.player.stop()
 
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .playlist import ArtRef, art_digest
+
+
+class ArtStoreStats(NamedTuple):
+    hits: int
+    misses: int
+    items: int
+    size: int
+
+
+class ArtStore:
+    """
+    In-memory, content-addressed store of art cover images.
+
+    Images are loaded from audio files only when they are requested and kept once per unique content,
+    so tracks from the same album share one copy. Least recently used images are evicted
+    when total size of stored images exceeds `max_bytes`.
+
+    Can be shared between threads.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._images: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._images
+
+    @property
+    def size(self) -> int:
+        """Total size of stored images in bytes"""
+        return self._size
+
+    @property
+    def stats(self) -> ArtStoreStats:
+        return ArtStoreStats(self._hits, self._misses, len(self._images), self._size)
+
+    def get(self, ref: ArtRef | None) -> bytes | None:
+        """Returns image referenced by `ref`, reading it from audio file if its not stored yet"""
+        if ref is None:
+            return None
+
+        with self._lock:
+            data = self._images.get(ref.digest)
+            if data is not None:
+                self._images.move_to_end(ref.digest)
+                self._hits += 1
+                return data
+            self._misses += 1
+
+        data = ref.read()
+        if data is not None:
+            self.put(data)
+        return data
+
+    def put(self, data: bytes) -> str:
+        """Stores image and returns its digest"""
+        digest = art_digest(data)
+        with self._lock:
+            if digest in self._images:
+                self._images.move_to_end(digest)
+                return digest
+
+            self._images[digest] = data
+            self._size += len(data)
+
+            # Always keep most recent image even if its bigger than the limit
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+
+        return digest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._size = 0
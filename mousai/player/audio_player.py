@@ -1,37 +1,156 @@
 from __future__ import annotations
 
 import sys
+import threading
+import time
 from collections import deque
+from io import BufferedReader, BytesIO
+from pathlib import Path
 from typing import Deque, Generator
 
+import pygame
 from pygame import mixer
 
+from .perf import stats, timed
+from .play_queue import PlayQueue
 from .playlist import PlayerError, Playlist, PlaylistItem
+from .preloader import TrackPreloader
+from .seek_index import SeekIndexCache, SeekIndexError
+from .shuffle import ShuffleEngine
+from .track_cache import TrackCache
 
 _called_from_test = False
 
+# Posted by pygame when music stops playing
+MUSIC_END_EVENT = pygame.USEREVENT + 1
+
+# Set with `stats.mark` when user picks a song; `play` records time from it
+# to the moment mixer starts playing the song as `time_to_first_audio`
+FIRST_AUDIO_MARK = "play_requested"
+
 
 class AudioPlayer:
-    QUEUE_MAX_LEN = 10
-    HISTORY_MAX_LEN = 10
+    QUEUE_MAX_LEN = 5000
+    HISTORY_MAX_LEN = 1000
+    # Songs picked from playlist ahead of time; queue is topped up to this length as songs are played
+    QUEUE_PREFILL = 10
+    TRANSITION_GAPS_MAX_LEN = 100
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        init_mixer: bool = True,
+        track_cache_bytes: int = TrackCache.DEFAULT_MAX_BYTES,
+        seek_index_path: Path | str = ":memory:",
+    ) -> None:
+        self.shuffle = ShuffleEngine()
+        # When disabled songs are queued in playlist order
+        self.shuffle_enabled = True
         self.playlist = Playlist()
         self.current_song: PlaylistItem | None = None
         self.volume = 0.05
-        self._queue: Deque[PlaylistItem] = deque(maxlen=self.QUEUE_MAX_LEN)
-        self._history: Deque[PlaylistItem] = deque(maxlen=self.HISTORY_MAX_LEN)
+        # Gain of current song from loudness analysis is applied on top of `volume`
+        self.normalize_volume = True
+        self._queue = PlayQueue(maxlen=self.QUEUE_MAX_LEN)
+        self._history = PlayQueue(maxlen=self.HISTORY_MAX_LEN)
         self.playback_paused = False
+        self._end_event_enabled = False
+        # Mixer play time starts from 0 when song is played from seek point, see `seek`
+        self.seek_indexes = SeekIndexCache(db_path=seek_index_path)
+        self._playtime_offset = 0.0
+
+        # Files of recently played and preloaded songs, restarting a song or playing it again doesnt read the disk
+        self.track_cache = TrackCache(track_cache_bytes)
 
-        if not "pytest" in sys.modules:
+        # Gapless playback: next song is preloaded and queued in mixer, so it starts right after current one
+        self.gapless = True
+        # also builds seek indexes of played songs
+        self.preloader = TrackPreloader(self.track_cache, self.seek_indexes)
+        self._queued_item: PlaylistItem | None = (
+            None  # song handed to `mixer.music.queue`
+        )
+        self._gapless_item: PlaylistItem | None = (
+            None  # queued song that mixer already started
+        )
+        # When audio in mixer started (`time.perf_counter`), from mixer position; `None` until its known
+        self._audio_started_at: float | None = None
+        # When audio of song that just ended should have ended, until next song starts playing
+        self._gap_from: float | None = None
+        # Silence between end of song and start of next one in milliseconds, see `_track_position`
+        self.transition_gaps: Deque[float] = deque(maxlen=self.TRANSITION_GAPS_MAX_LEN)
+
+        self._mixer_init: threading.Thread | None = None
+        self._mixer_error: BaseException | None = None
+        if init_mixer and not "pytest" in sys.modules:
+            self.init_mixer()
+
+    def init_mixer(self, background: bool = False) -> None:
+        """
+        Initializes pygame mixer. Opening audio device can take a while, with `background` its done
+        in worker thread so e.g. window can be shown in the meantime; methods using mixer wait for it.
+        """
+        self._enable_end_event()
+        if not background:
+            self._open_mixer()
+            return
+
+        self._mixer_init = threading.Thread(
+            target=self._open_mixer, name="MixerInit", daemon=True
+        )
+        self._mixer_init.start()
+
+    def _open_mixer(self) -> None:
+        try:
             mixer.init()
             mixer.music.set_volume(self.volume)
+        except BaseException as e:
+            if self._mixer_init is None:
+                raise
+            self._mixer_error = e
+
+    def wait_ready(self) -> None:
+        """Blocks until mixer initialized in background is ready, raises error that happened during its init"""
+        if self._mixer_init is None:
+            return
+
+        self._mixer_init.join()
+        self._mixer_init = None
+        if self._mixer_error is not None:
+            raise self._mixer_error
+
+    @property
+    def ready(self) -> bool:
+        """Can songs be played without waiting for mixer"""
+        return self._mixer_init is None or not self._mixer_init.is_alive()
+
+    def _enable_end_event(self) -> None:
+        """
+        Makes pygame post `MUSIC_END_EVENT` when song ends, so it doesnt have to be detected by polling playtime.
+        pygame event queue needs display module to be initialized (no window is created);
+        if that fails `song_ended` falls back to checking playtime.
+        """
+        try:
+            pygame.display.init()
+        except pygame.error:
+            return
+
+        mixer.music.set_endevent(MUSIC_END_EVENT)
+        self._end_event_enabled = True
+
+    @property
+    def playlist(self) -> Playlist:
+        return self._playlist
+
+    @playlist.setter
+    def playlist(self, playlist: Playlist) -> None:
+        self._playlist = playlist
+        self.shuffle.set_playlist(playlist)
 
     def init_queue(self) -> None:
         """
-        This method is meant to be ran when you want to populate queue for first time.
+        This method is meant to be ran when you want to populate queue for first time;
+        fills it up to `QUEUE_PREFILL` songs.
         """
-        for _ in range(self.QUEUE_MAX_LEN):
+        for _ in range(self.QUEUE_PREFILL - len(self._queue)):
             self.add_to_queue()
 
     def add_to_history(self, item: PlaylistItem) -> None:
@@ -52,21 +171,55 @@ class AudioPlayer:
         """
         Adds item to queue.
 
-        If item is None pick random song from playlist.
+        If item is None pick random song from playlist (or next one in playlist order if shuffle is disabled).
 
         If `next` is True, item is appended to the left - to be played right after current song;
         """
         if item is None:
-            try:
-                item = self.playlist.get_random_item()
-            except PlayerError:
-                raise
+            if self.shuffle_enabled:
+                item = self.shuffle.pick()
+            else:
+                item = self._get_next_in_order()
 
         if next:
             self._queue.appendleft(item)
         else:
             self._queue.append(item)
 
+    def remove_from_queue(self, item_id: int) -> int:
+        """Removes every copy of song from queue, returns how many were removed"""
+        return self._queue.remove(item_id)
+
+    def play_next(self, item: PlaylistItem) -> None:
+        """Moves song to the front of queue, or adds it there if its not queued"""
+        if item in self._queue:
+            self._queue.move_to_front(item.id)
+        else:
+            self._queue.appendleft(item)
+
+    def _get_next_in_order(self) -> PlaylistItem:
+        """Returns song after the last queued one (or current song) in playlist, wraps around at the end"""
+        if len(self.playlist) < 1:
+            raise PlayerError("No items in playlist.")
+
+        last = self._queue[-1] if self._queue else self.current_song
+        if last is None or last not in self.playlist:
+            return self.playlist[0]
+
+        return self.playlist[(self.playlist.index(last.id) + 1) % len(self.playlist)]
+
+    def rebuild_queue(self) -> None:
+        """Replaces queued songs with new ones, e.g. after shuffle was turned on/off"""
+        for item in self._queue:
+            self.shuffle.put_back(item)
+        self._queue.clear()
+        self.init_queue()
+
+    def set_shuffle(self, enabled: bool) -> None:
+        self.shuffle_enabled = enabled
+        if self._queue:
+            self.rebuild_queue()
+
     def get_playlistitems_gen(
         self, *, source: str
     ) -> Generator[PlaylistItem, None, None]:
@@ -74,56 +227,293 @@ class AudioPlayer:
         Returns generator with items from `_queue` or `_history` attributes.
         Raises `ValueError` if not allowed source is passed
         """
+        src = iter(self.get_play_queue(source))
+        return (song for song in src)
+
+    def get_play_queue(self, source: str) -> PlayQueue:
+        """Returns queue or history (`source` is "queue" or "history"), e.g. to read it page by page"""
         if source == "queue":
-            src = iter(self._queue)
+            return self._queue
         elif source == "history":
-            src = iter(self._history)
-        else:
-            raise ValueError(f"Cant fetch items from {source!r}. See docstring")
+            return self._history
+        raise ValueError(f"Cant fetch items from {source!r}. See docstring")
 
-        return (song for song in src)
+    def change_song(self, song: PlaylistItem, to_history: bool = True) -> None:
+        """
+        Plays `song` from start as current song, previous current song goes to history (unless `to_history` is False).
+        Queue is filled first if its empty; raises `PlayerError` if that fails because playlist is empty.
+        """
+        if self.current_song is not None and to_history:
+            self.add_to_history(self.current_song)
+        if not self._queue:
+            self.init_queue()
+
+        # Fixes bug where pygame mixer would not play next track if playback was paused
+        if self.playback_paused:
+            self.play()
+
+        if not self.started_gaplessly(song):
+            self.stop()
+        self.current_song = song
+        self.play()
+
+        # Because when new music is loaded the volume is set to full volume;
+        # it also applies loudness gain of new song
+        self.set_volume(self.volume)
 
     def get_next_song(self) -> PlaylistItem:
         next_song = self._queue.popleft()
-        self.add_to_queue()  # add new song to the end of the queue
+        if len(self._queue) < self.QUEUE_PREFILL:
+            self.add_to_queue()  # add new song to the end of the queue
         return next_song
 
+    def play_previous(self) -> PlaylistItem:
+        """
+        Plays last song from history; current song is put back in front of queue, so it plays after it again.
+        Raises `PlayerError` if history is empty.
+        """
+        if not self._history:
+            raise PlayerError("No previous song in history")
+
+        song = self._history.popleft()
+        if self.current_song is not None:
+            self._queue.appendleft(self.current_song)
+        self.change_song(song, to_history=False)
+        return song
+
+    def song_ended(self) -> bool:
+        """Returns `True` if current song finished playing since last check"""
+        if not self._end_event_enabled:
+            ended = self.get_playtime() == -1
+        else:
+            ended = any(event.type == MUSIC_END_EVENT for event in pygame.event.get())
+
+        if ended:
+            self._gap_from = self._expected_end()
+            self._audio_started_at = None
+            if self._queued_item is not None:
+                # mixer started queued song as soon as current one ended, it plays with its own gain
+                self._gapless_item = self._queued_item
+                self._queued_item = None
+                mixer.music.set_volume(self._mixer_volume(self._gapless_item))
+        else:
+            self._track_position()
+
+        return ended
+
+    def _expected_end(self) -> float | None:
+        """When audio of current song ends, if its start and duration are known"""
+        song = self.current_song
+        if self._audio_started_at is None or song is None or not song.meta.playtime:
+            return None
+        return (
+            self._audio_started_at + song.meta.playtime - self._playtime_offset / 1000
+        )
+
+    def _track_position(self) -> None:
+        """
+        Notes when audio in mixer started, from mixer position.
+        After end of song, gap is start of next song minus expected end of the one that ended
+        (its start plus its remaining duration), so it counts time to notice end of song and mixer latency
+        the same way for songs started from queue in mixer and loaded after end.
+        """
+        self.wait_ready()
+        position = mixer.music.get_pos()
+        if position <= 0:  # not playing or first audio wasnt mixed yet
+            return
+
+        self._audio_started_at = time.perf_counter() - position / 1000
+        if self._gap_from is not None:
+            # duration from tags can be a bit longer than decoded audio
+            gap = max(0.0, self._audio_started_at - self._gap_from) * 1000
+            self.transition_gaps.append(gap)
+            stats.record("audio_player.transition_gap", gap)
+            self._gap_from = None
+
+    def started_gaplessly(self, item: PlaylistItem) -> bool:
+        """Is `item` already playing because it was queued in mixer (see `queue_next`)"""
+        return item is self._gapless_item
+
+    def queue_next(self) -> None:
+        """
+        Hands first song from queue to mixer, so it starts without a gap when current song ends.
+        Song file is read in background first; meant to be called periodically during playback.
+        Needs end event to notice when queued song starts, so its disabled without it.
+        """
+        if not (self.gapless and self._end_event_enabled) or not self._queue:
+            return
+
+        next_song = self._queue[0]
+        if next_song is self._queued_item or self.current_song is None:
+            return
+
+        data = self.preloader.get(next_song)
+        if data is None:
+            self.preloader.request(next_song)
+            return
+
+        # Queuing again replaces previously queued song, e.g. when queue order changed
+        self.wait_ready()
+        mixer.music.queue(BytesIO(data), next_song.path.suffix[1:].lower())
+        self._queued_item = next_song
+
+    def _song_started(self, gapless: bool) -> None:
+        self._playtime_offset = 0.0
+        if not gapless:
+            self._audio_started_at = None
+
+        self.shuffle.record_play(self.current_song)  # type: ignore
+        self.preloader.build_seek_index(self.current_song)  # type: ignore
+        if self.gapless and self._queue:
+            self.preloader.request(self._queue[0])
+
+    @property
+    def last_transition_gap_ms(self) -> float | None:
+        return self.transition_gaps[-1] if self.transition_gaps else None
+
+    def _clear_end_event(self) -> None:
+        # pygame posts end event also when music is stopped manually, it must not be treated as end of song
+        if self._end_event_enabled:
+            pygame.event.clear(MUSIC_END_EVENT)
+
     def is_playing(self) -> bool:
         """Is there any audio currently playing"""
+        self.wait_ready()
         return mixer.music.get_busy()
 
+    def seek(self, seconds: float) -> float:
+        """
+        Plays current song from `seconds`; returns position it actually starts at - start of MP3 frame,
+        Ogg page or WAV sample playing at `seconds` (see `SeekIndex`).
+
+        Mixer is given file object that starts at that position (nothing is copied), so seeking takes the same time
+        anywhere in song and is exact for variable bitrate files too. Index is built in background when song starts;
+        until its ready and for files without index mixer seeks with `mixer.music.set_pos`.
+        """
+        song = self.current_song
+        if song is None:
+            raise PlayerError("No song is playing")
+
+        self.wait_ready()
+        index = self.seek_indexes.peek(song.path)
+        try:
+            if index is None:
+                self.preloader.build_seek_index(song)
+                raise SeekIndexError(f"Seek index of {song.path.name} is not ready")
+            cached = self.track_cache.get(song.path, record=True)
+            position, stream = index.open_from(
+                cached if cached is not None else song.path, seconds
+            )
+        except (SeekIndexError, OSError):
+            try:
+                mixer.music.set_pos(seconds)
+            except pygame.error as e:
+                raise PlayerError(f"Cant seek in {song.path.name}: {e}")
+            # `get_pos` doesnt count position set with `set_pos`
+            self._playtime_offset = seconds * 1000 - max(0, mixer.music.get_pos())
+            return seconds
+
+        mixer.music.stop()
+        self._clear_end_event()
+        mixer.music.load(BufferedReader(stream), index.format)
+        mixer.music.play()
+        if self.playback_paused:
+            mixer.music.pause()
+        # loading drops song queued in mixer
+        self._queued_item = None
+        self._gapless_item = None
+        mixer.music.set_volume(self.get_mixer_volume())
+
+        self._playtime_offset = position * 1000
+        self._audio_started_at = None
+        return position
+
     def set_playtime(self, value: float) -> None:
-        mixer.music.set_pos(value)
+        self.seek(value)
 
     def get_playtime(self) -> float:
-        return mixer.music.get_pos()
+        """Position in current song in milliseconds, -1 if nothing is playing"""
+        self.wait_ready()
+        playtime = mixer.music.get_pos()
+        return playtime + self._playtime_offset if playtime >= 0 else playtime
+
+    def get_mixer_volume(self) -> float:
+        """`volume` adjusted by gain of current song (when it was analyzed), as it is set in mixer"""
+        return self._mixer_volume(self.current_song)
+
+    def _mixer_volume(self, song: PlaylistItem | None) -> float:
+        gain = song.meta.gain if song is not None else None
+        if not self.normalize_volume or gain is None:
+            return self.volume
+        # mixer cant go above full volume, so boosted songs are never clipped
+        return min(1.0, self.volume * 10 ** (gain / 20))
 
     def set_volume(self, value: float) -> None:
         self.volume = round(value, 2)
-        mixer.music.set_volume(self.volume)
+        self.wait_ready()
+        mixer.music.set_volume(self.get_mixer_volume())
 
+    @timed("audio_player.play")
     def play(self) -> None:
+        self.wait_ready()
         if self.current_song:
             if self.playback_paused:
                 mixer.music.unpause()
+            elif self.current_song is self._gapless_item:
+                # already started by mixer right after previous song
+                self._gapless_item = None
+                stats.record_since("time_to_first_audio", FIRST_AUDIO_MARK)
+                self._song_started(gapless=True)
             else:
                 mixer.music.stop()
-                mixer.music.load(self.current_song.path)
+                self._clear_end_event()
+                started = stats.start()
+                self._load(self.current_song)
+                stats.stop("audio_player.load", started)
                 mixer.music.play()
+                stats.record_since("time_to_first_audio", FIRST_AUDIO_MARK)
+                # loading drops song queued in mixer
+                self._queued_item = None
+                self._gapless_item = None
+                self._song_started(gapless=False)
 
             self.playback_paused = False
         else:
             raise ValueError(f"Current song is not set. {self.current_song=!r}")
 
+    def _load(self, song: PlaylistItem) -> None:
+        """
+        Loads song into mixer from `track_cache`; songs that are not there are streamed from disk
+        (reading whole file first would block, e.g. on network drive) and read into cache in background.
+        """
+        data = self.track_cache.get(song.path, record=True)
+        if data is None:
+            mixer.music.load(song.path)
+            self.preloader.fill_cache(song)
+        else:
+            mixer.music.load(BytesIO(data), song.path.suffix[1:].lower())
+
+    @timed("audio_player.stop")
     def stop(self) -> None:
         """Stop any playback"""
+        self.wait_ready()
         mixer.music.stop()
         mixer.music.unload()
+        self._clear_end_event()
+        self._queued_item = None
+        self._gapless_item = None
+        self._playtime_offset = 0.0
+        self._audio_started_at = None
 
     def pause(self) -> None:
+        self.wait_ready()
         mixer.music.pause()
         self.playback_paused = True
 
     def clean_up(self) -> None:
         """Unload the currently loaded music to free up resources"""
+        self.wait_ready()
         mixer.music.unload()
+        self.preloader.close()
+        self.track_cache.clear()
+        self.seek_indexes.close()
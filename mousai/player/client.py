@@ -0,0 +1,250 @@
+"""
+Client of `PlayerDaemon` control API and command line tool using it.
+
+Usage: python -m mousai.player.client [--socket PATH] COMMAND [ARGS]
+
+Commands: status, play [PATH], play-id ID, pause, next, previous, seek SECONDS, queue [PATH] [--next] [--remove ID],
+volume [VALUE], add PATH..., watch (prints status events until interrupted), shutdown
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .daemon import Message, default_socket_path, encode
+from .playlist import PlayerError
+
+
+class PlayerClient:
+    """
+    Connection to player daemon; can be used as async context manager.
+
+    Responses are matched with requests by id, so requests can be sent concurrently;
+    status events (after `subscribe`) are read from `events`.
+    """
+
+    def __init__(self, socket_path: Path | None = None) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._events: asyncio.Queue[Optional[Message]] | None = None
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            str(self.socket_path)
+        )
+        self._events = asyncio.Queue()
+        self._read_task = asyncio.ensure_future(self._read_messages())
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        if self._read_task is not None:
+            await self._read_task
+
+    async def __aenter__(self) -> "PlayerClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _read_messages(self) -> None:
+        assert self._reader is not None and self._events is not None
+        try:
+            async for line in self._reader:
+                message = json.loads(line)
+                if "event" in message:
+                    self._events.put_nowait(message)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to player closed"))
+            self._pending.clear()
+            self._events.put_nowait(None)
+
+    async def request(self, cmd: str, **args: Any) -> Any:
+        """Sends command and returns its result; raises `PlayerError` with message from daemon if it failed"""
+        if self._writer is None:
+            raise ConnectionError("Not connected")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode({"id": request_id, "cmd": cmd, "args": args}))
+        await self._writer.drain()
+
+        response = await future
+        if not response["ok"]:
+            raise PlayerError(response["error"])
+        return response["result"]
+
+    async def status(self) -> Dict[str, Any]:
+        return await self.request("status")
+
+    async def play(
+        self, path: str | None = None, id: int | None = None
+    ) -> Dict[str, Any]:
+        args: Dict[str, Any] = {}
+        if path is not None:
+            args["path"] = path
+        if id is not None:
+            args["id"] = id
+        return await self.request("play", **args)
+
+    async def pause(self) -> Dict[str, Any]:
+        return await self.request("pause")
+
+    async def next(self) -> Dict[str, Any]:
+        return await self.request("next")
+
+    async def previous(self) -> Dict[str, Any]:
+        return await self.request("previous")
+
+    async def seek(self, position: float) -> Dict[str, Any]:
+        return await self.request("seek", position=position)
+
+    async def queue(
+        self,
+        path: str | None = None,
+        id: int | None = None,
+        next: bool = False,
+        remove: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        args: Dict[str, Any] = {"next": next}
+        if path is not None:
+            args["path"] = path
+        if id is not None:
+            args["id"] = id
+        if remove is not None:
+            args["remove"] = remove
+        return await self.request("queue", **args)
+
+    async def volume(self, value: float | None = None) -> float:
+        if value is None:
+            return await self.request("volume")
+        return await self.request("volume", value=value)
+
+    async def add(self, paths: List[str]) -> Dict[str, Any]:
+        return await self.request("add", paths=paths)
+
+    async def shutdown(self) -> None:
+        await self.request("shutdown")
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yields current status and then every status sent by daemon, until connection is closed"""
+        yield await self.request("subscribe")
+        assert self._events is not None
+        while True:
+            message = await self._events.get()
+            if message is None:
+                return
+            yield message["status"]
+
+
+def _absolute(path: str | None) -> str | None:
+    # daemon can run in other working directory
+    return str(Path(path).resolve()) if path is not None else None
+
+
+async def run_command(client: PlayerClient, args: argparse.Namespace) -> Any:
+    command = args.command
+    if command == "status":
+        return await client.status()
+    if command == "play":
+        return await client.play(_absolute(args.path))
+    if command == "play-id":
+        return await client.play(id=args.id)
+    if command == "pause":
+        return await client.pause()
+    if command == "next":
+        return await client.next()
+    if command == "previous":
+        return await client.previous()
+    if command == "seek":
+        return await client.seek(args.position)
+    if command == "queue":
+        return await client.queue(
+            _absolute(args.path), next=args.next, remove=args.remove
+        )
+    if command == "volume":
+        return await client.volume(args.value)
+    if command == "add":
+        return await client.add([str(Path(p).resolve()) for p in args.paths])
+    if command == "shutdown":
+        return await client.shutdown()
+    if command == "watch":
+        async for status in client.subscribe():
+            print(json.dumps(status), flush=True)
+        return None
+    raise ValueError(f"Unknown command: {command!r}")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Control headless Mousai player")
+    parser.add_argument("--socket", type=Path, help="control socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status")
+    commands.add_parser("play").add_argument("path", nargs="?")
+    commands.add_parser("play-id").add_argument("id", type=int)
+    commands.add_parser("pause")
+    commands.add_parser("next")
+    commands.add_parser("previous")
+    commands.add_parser("seek").add_argument("position", type=float)
+    queue = commands.add_parser("queue")
+    queue.add_argument("path", nargs="?")
+    queue.add_argument(
+        "--next", action="store_true", help="play right after current song"
+    )
+    queue.add_argument(
+        "--remove", type=int, metavar="ID", help="take song out of queue"
+    )
+    commands.add_parser("volume").add_argument("value", type=float, nargs="?")
+    commands.add_parser("add").add_argument("paths", nargs="+")
+    commands.add_parser("watch")
+    commands.add_parser("shutdown")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+
+    async def run() -> Any:
+        async with PlayerClient(args.socket) as client:
+            return await run_command(client, args)
+
+    try:
+        result = asyncio.run(run())
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"Cant connect to player: {e}", file=sys.stderr)
+        return 1
+    except PlayerError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+
+    if result is not None:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,455 @@
+"""
+Headless player process controlled over a local Unix socket.
+
+Protocol: every message is one line of JSON. Client sends requests
+`{"id": 1, "cmd": "volume", "args": {"value": 0.5}}` and gets responses with the same id:
+`{"id": 1, "ok": true, "result": ...}` or `{"id": 1, "ok": false, "error": "..."}`.
+After `subscribe` client also gets `{"event": "status", "status": {...}}` messages whenever
+player state changes, and every `STATUS_INTERVAL` seconds while song is playing.
+
+Usage: python -m mousai.player.daemon [--socket PATH] [audio files or directories to add...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import pygame
+
+from .audio_player import AudioPlayer
+from .importer import scan_audio_files
+from .playlist import PlayerError, PlaylistItem
+from .track_cache import TrackCache
+
+SOCKET_ENV = "MOUSAI_SOCKET"
+
+Message = Dict[str, Any]
+Command = Callable[..., Awaitable[Any]]
+
+
+def default_socket_path() -> Path:
+    """`MOUSAI_SOCKET` if set, else socket in user runtime directory (temp directory if there is none)"""
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(runtime_dir) / f"mousai-{uid}.sock"
+
+
+def encode(message: Message) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def expand_paths(paths: List[str]) -> List[Path]:
+    """Replaces directories with audio files found in them; touches disk so it runs in a worker thread"""
+    files: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(scan_audio_files(path))
+        else:
+            files.append(path)
+    return files
+
+
+def song_info(item: PlaylistItem | None) -> Optional[Dict[str, Any]]:
+    if item is None:
+        return None
+    return {
+        "id": item.id,
+        "path": item._path,
+        "title": item.meta.title or item.meta.file_name,
+        "artist": item.meta.artist,
+        "album": item.meta.album,
+        "duration": item.meta.playtime,
+    }
+
+
+class PlayerDaemon:
+    """
+    Runs `AudioPlayer` in asyncio event loop and serves control API on Unix socket.
+
+    End of song is checked every `POLL_INTERVAL` seconds by a task of its own, so playback
+    doesnt depend on any UI. Everything touching the player runs in event loop thread;
+    only reading metadata of added files runs in worker threads.
+    """
+
+    POLL_INTERVAL = 0.05
+    STATUS_INTERVAL = 1.0
+    # subscribers that dont read their events are dropped when this many bytes wait to be sent
+    MAX_PENDING_BYTES = 1 << 20
+    # songs from queue that cant be played are skipped, up to this many in a row
+    MAX_SKIPS = 10
+
+    def __init__(
+        self,
+        player: AudioPlayer,
+        socket_path: Path | None = None,
+        load_item: Callable[[Path], PlaylistItem] = PlaylistItem.from_file,
+    ) -> None:
+        self.player = player
+        self.socket_path = socket_path or default_socket_path()
+        self._load_item = load_item
+        self._subscribers: Set[asyncio.StreamWriter] = set()
+        self._stopped: asyncio.Event | None = None
+        self._commands: Dict[str, Command] = {
+            "status": self.cmd_status,
+            "play": self.cmd_play,
+            "pause": self.cmd_pause,
+            "next": self.cmd_next,
+            "previous": self.cmd_previous,
+            "seek": self.cmd_seek,
+            "queue": self.cmd_queue,
+            "volume": self.cmd_volume,
+            "add": self.cmd_add,
+            "subscribe": self.cmd_subscribe,
+            "shutdown": self.cmd_shutdown,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        player = self.player
+        if player.current_song is None:
+            state = "stopped"
+        elif player.playback_paused:
+            state = "paused"
+        else:
+            state = "playing"
+
+        position = None
+        if player.current_song is not None:
+            playtime = player.get_playtime()
+            position = playtime / 1000 if playtime >= 0 else None
+
+        return {
+            "state": state,
+            "song": song_info(player.current_song),
+            "position": position,
+            "volume": player.volume,
+            "shuffle": player.shuffle_enabled,
+            "playlist_length": len(player.playlist),
+            "queue_length": len(player.get_play_queue("queue")),
+        }
+
+    async def serve(self) -> None:
+        """Serves clients until `shutdown` command or `stop`"""
+        self._stopped = asyncio.Event()
+        if self.socket_path.exists():
+            # socket left by a daemon that was killed
+            self.socket_path.unlink()
+
+        server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.socket_path)
+        )
+        playback = asyncio.ensure_future(self._playback_loop())
+        try:
+            await self._stopped.wait()
+        finally:
+            playback.cancel()
+            server.close()
+            await server.wait_closed()
+            for writer in list(self._subscribers):
+                writer.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _playback_loop(self) -> None:
+        last_status = time.monotonic()
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            player = self.player
+            if player.current_song is None or player.playback_paused:
+                continue
+
+            if player.song_ended():
+                try:
+                    self._play_next()
+                except PlayerError as e:
+                    print(e, file=sys.stderr)
+                self.broadcast()
+                last_status = time.monotonic()
+                continue
+
+            # Next song has to be in mixer queue before current one ends
+            player.queue_next()
+
+            if time.monotonic() - last_status >= self.STATUS_INTERVAL:
+                self.broadcast()
+                last_status = time.monotonic()
+
+    def broadcast(self) -> None:
+        """Sends current status to every subscriber"""
+        if not self._subscribers:
+            return
+
+        data = encode({"event": "status", "status": self.status()})
+        for writer in list(self._subscribers):
+            if (
+                writer.is_closing()
+                or writer.transport.get_write_buffer_size() > self.MAX_PENDING_BYTES
+            ):
+                self._subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line, writer)
+                writer.write(encode(response))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # client disconnected or sent line longer than stream limit
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> Message:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            command = self._commands.get(request.get("cmd"))
+            if command is None:
+                raise PlayerError(f"Unknown command: {request.get('cmd')!r}")
+
+            args = request.get("args") or {}
+            if command == self.cmd_subscribe:
+                args = {"writer": writer}
+            result = await command(**args)
+        except (
+            PlayerError,
+            pygame.error,
+            OSError,
+            ValueError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as e:
+            # ValueError also covers invalid JSON, TypeError - wrong arguments
+            return {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _load(
+        self, paths: List[str]
+    ) -> Tuple[List[PlaylistItem], List[Tuple[str, str]]]:
+        """
+        Reads metadata of audio files (files in directories too) in worker threads.
+        Returns loaded items and `(path, error)` of files that couldnt be read.
+        """
+        loop = asyncio.get_running_loop()
+        files = await loop.run_in_executor(None, expand_paths, paths)
+        results = await asyncio.gather(
+            *(loop.run_in_executor(None, self._load_item, path) for path in files),
+            return_exceptions=True,
+        )
+
+        items: List[PlaylistItem] = []
+        failed: List[Tuple[str, str]] = []
+        for path, result in zip(files, results):
+            if isinstance(result, BaseException):
+                failed.append((str(path), str(result) or type(result).__name__))
+            else:
+                items.append(result)
+        return items, failed
+
+    async def _add_file(self, path: str) -> PlaylistItem:
+        loop = asyncio.get_running_loop()
+        item = await loop.run_in_executor(None, self._load_item, Path(path))
+        self.player.playlist.add(item)
+        return item
+
+    def _find(self, song_id: int) -> PlaylistItem:
+        try:
+            return self.player.playlist.get(int(song_id))
+        except KeyError:
+            raise PlayerError(f"No song with id {song_id} in playlist")
+
+    def _play_next(self) -> None:
+        """Plays next song from queue; songs that cant be played are skipped (up to `MAX_SKIPS`)"""
+        player = self.player
+        if not player.get_play_queue("queue"):
+            player.init_queue()
+
+        for _ in range(self.MAX_SKIPS):
+            song = player.get_next_song()
+            try:
+                player.change_song(song)
+                return
+            except pygame.error as e:
+                print(f"Cant play {song._path}: {e}", file=sys.stderr)
+
+        player.current_song = None
+        raise PlayerError(f"Cant play any of {self.MAX_SKIPS} songs from queue")
+
+    async def cmd_status(self) -> Dict[str, Any]:
+        return self.status()
+
+    async def cmd_play(
+        self, path: str | None = None, id: int | None = None
+    ) -> Dict[str, Any]:
+        """
+        Without arguments resumes paused song or starts next one from queue if nothing is playing;
+        `path` adds file to playlist and plays it, `id` plays song from playlist.
+        """
+        player = self.player
+        if path is not None:
+            player.change_song(await self._add_file(path))
+        elif id is not None:
+            player.change_song(self._find(id))
+        elif player.current_song is None:
+            self._play_next()
+        elif player.playback_paused:
+            player.play()
+
+        self.broadcast()
+        return self.status()
+
+    async def cmd_pause(self) -> Dict[str, Any]:
+        if self.player.current_song is not None and not self.player.playback_paused:
+            self.player.pause()
+            self.broadcast()
+        return self.status()
+
+    async def cmd_next(self) -> Dict[str, Any]:
+        self._play_next()
+        self.broadcast()
+        return self.status()
+
+    async def cmd_previous(self) -> Dict[str, Any]:
+        """Plays last song from history, current song is played after it"""
+        self.player.play_previous()
+        self.broadcast()
+        return self.status()
+
+    async def cmd_seek(self, position: float) -> Dict[str, Any]:
+        """Plays current song from `position` seconds"""
+        self.player.seek(max(0.0, float(position)))
+        self.broadcast()
+        return self.status()
+
+    async def cmd_queue(
+        self,
+        path: str | None = None,
+        id: int | None = None,
+        next: bool = False,
+        remove: int | None = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns songs in queue; `path` (added to playlist) or `id` is queued first, as next song if `next`
+        (song already in queue is moved). `remove` takes song with that id out of queue.
+        """
+        item = None
+        if path is not None:
+            item = await self._add_file(path)
+        elif id is not None:
+            item = self._find(id)
+
+        if item is not None:
+            if next:
+                self.player.play_next(item)
+            else:
+                self.player.add_to_queue(item)
+            self.broadcast()
+        if remove is not None and self.player.remove_from_queue(int(remove)):
+            self.broadcast()
+
+        return [
+            song_info(song)
+            for song in self.player.get_playlistitems_gen(source="queue")
+        ]
+
+    async def cmd_volume(self, value: float | None = None) -> float:
+        """Returns volume (0-1); sets it first if `value` is passed"""
+        if value is not None:
+            self.player.set_volume(min(1.0, max(0.0, float(value))))
+            self.broadcast()
+        return self.player.volume
+
+    async def cmd_add(self, paths: List[str]) -> Dict[str, Any]:
+        """
+        Adds audio files and directories to playlist. Returns number of added songs
+        and `{"path": ..., "error": ...}` of every file that couldnt be added.
+        """
+        items, failed = await self._load(paths)
+        for item in items:
+            self.player.playlist.add(item)
+        if items:
+            self.broadcast()
+        return {
+            "added": len(items),
+            "failed": [{"path": path, "error": error} for path, error in failed],
+        }
+
+    async def cmd_subscribe(self, writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        """Starts sending status events to this client; returns current status"""
+        self._subscribers.add(writer)
+        return self.status()
+
+    async def cmd_shutdown(self) -> None:
+        self.stop()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Headless Mousai player")
+    parser.add_argument("--socket", type=Path, help="control socket path")
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=TrackCache.DEFAULT_MAX_BYTES // 2**20,
+        help="memory for files of recently played songs, in MiB",
+    )
+    parser.add_argument("paths", nargs="*", help="audio files or directories to add")
+    args = parser.parse_args(argv)
+
+    if not hasattr(asyncio, "start_unix_server"):
+        print("Unix sockets are not supported on this platform", file=sys.stderr)
+        return 1
+
+    # pygame needs video subsystem only for its event queue, no window is created
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    player = AudioPlayer(track_cache_bytes=args.cache_mb * 2**20)
+    daemon = PlayerDaemon(player, args.socket)
+
+    async def run() -> None:
+        if args.paths:
+            result = await daemon.cmd_add(args.paths)
+            for failure in result["failed"]:
+                print(
+                    f"Cant add {failure['path']}: {failure['error']}", file=sys.stderr
+                )
+        await daemon.serve()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if player.is_playing():
+            player.stop()
+        player.clean_up()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from .playlist import PlaylistItem
+
+DUPLICATES_FOUND_EVENT = "-DUPLICATES_FOUND-"
+
+# (start, end) byte offsets of audio data in file
+PayloadRange = Tuple[int, int]
+
+ID3V1_SIZE = 128
+APE_FOOTER_SIZE = 32
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def mp3_payload_range(f, size: int) -> PayloadRange:
+    """Returns range of MP3 frames in file `f` without ID3v2 tag at start and ID3v1/APE tags at end"""
+    start, end = 0, size
+
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        start = 10 + _syncsafe(header[6:10])
+        if header[5] & 0x10:  # footer present
+            start += 10
+
+    tail_size = min(size, ID3V1_SIZE + APE_FOOTER_SIZE)
+    f.seek(size - tail_size)
+    tail = f.read(tail_size)
+    if tail[-ID3V1_SIZE:].startswith(b"TAG"):
+        end -= ID3V1_SIZE
+        tail = tail[:-ID3V1_SIZE]
+    if tail[-APE_FOOTER_SIZE:].startswith(b"APETAGEX"):
+        tag_size, flags = struct.unpack_from("<II", tail, len(tail) - 20)
+        end -= tag_size + (APE_FOOTER_SIZE if flags & 0x80000000 else 0)
+
+    return start, max(start, end)
+
+
+def _wav_payload_range(f, size: int) -> PayloadRange:
+    if f.read(12)[8:12] != b"WAVE":
+        return 0, size
+
+    offset = 12
+    while offset + 8 <= size:
+        f.seek(offset)
+        chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+        if chunk_id == b"data":
+            return offset + 8, min(size, offset + 8 + chunk_size)
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+    return 0, size
+
+
+def payload_range(path: str) -> PayloadRange | None:
+    """
+    Returns byte range of audio data in file - without ID3/APE tags of MP3 files or chunks other than
+    `data` in WAV files - so copies of a song with different tags have equal payloads.
+    Ogg comments are part of the stream, whole file is used for them.
+    Returns `None` if file can't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            suffix = os.path.splitext(path)[1].lower()
+            if suffix == ".mp3":
+                return mp3_payload_range(f, size)
+            if suffix == ".wav":
+                return _wav_payload_range(f, size)
+            return 0, size
+    except (OSError, struct.error):
+        return None
+
+
+def edge_digest(path: str, payload: PayloadRange, edge_size: int) -> str | None:
+    """Hashes first and last `edge_size` bytes of payload (whole payload if its shorter)"""
+    start, end = payload
+    h = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            if end - start <= 2 * edge_size:
+                h.update(f.read(end - start))
+            else:
+                h.update(f.read(edge_size))
+                f.seek(end - edge_size)
+                h.update(f.read(edge_size))
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def payload_digest(path: str, payload: PayloadRange, chunk_size: int) -> str | None:
+    start, end = payload
+    h = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                h.update(chunk)
+                remaining -= len(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class DuplicateStats(NamedTuple):
+    # number of files checked at each stage
+    payload_checked: int
+    edges_hashed: int
+    fully_hashed: int
+
+
+class DuplicateFinder:
+    """
+    Finds songs with the same audio.
+
+    Candidates are narrowed down in stages, each one more expensive but run on fewer files:
+
+    1. items with the same path are duplicates without reading anything
+    2. files are grouped by duration (from metadata) and size of audio payload (tags excluded)
+    3. files left in groups get first and last `EDGE_SIZE` bytes of payload hashed
+    4. only files whose edges match get whole payload hashed
+
+    File reading and hashing run in worker threads.
+    """
+
+    EDGE_SIZE = 4096
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers
+        self.stats = DuplicateStats(0, 0, 0)
+
+    def find(self, items: Iterable[PlaylistItem]) -> List[List[PlaylistItem]]:
+        """
+        Returns groups of duplicated songs; items in group and groups themselves
+        are in the order of `items`, so first item of group is its first occurrence.
+        """
+        by_path: Dict[str, List[PlaylistItem]] = {}
+        for item in items:
+            by_path.setdefault(os.path.normcase(item._path), []).append(item)
+
+        groups = _split(
+            [list(by_path)], lambda p: round(by_path[p][0].meta.playtime or 0)
+        )
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            groups = self._find_same_payload(pool, groups)
+
+        # songs with the same path that have no other copies are duplicates too
+        grouped = {path for group in groups for path in group}
+        groups += [
+            [path]
+            for path, same in by_path.items()
+            if len(same) > 1 and path not in grouped
+        ]
+
+        order = {path: i for i, path in enumerate(by_path)}
+        result = []
+        for group in groups:
+            group.sort(key=order.__getitem__)
+            result.append([item for path in group for item in by_path[path]])
+        result.sort(key=lambda group: order[os.path.normcase(group[0]._path)])
+        return result
+
+    def _find_same_payload(
+        self, pool: Executor, groups: List[List[str]]
+    ) -> List[List[str]]:
+        candidates = [path for group in groups for path in group]
+        ranges: Dict[str, PayloadRange] = {}
+        for path, payload in zip(
+            candidates, pool.map(payload_range, candidates, chunksize=64)
+        ):
+            # unreadable files and files without audio data can't be compared
+            if payload is not None and _size(payload) > 0:
+                ranges[path] = payload
+
+        groups = _split(groups, lambda p: _size(ranges[p]) if p in ranges else None)
+        edges_hashed = sum(map(len, groups))
+        groups = _split_by_digest(
+            pool, groups, lambda p: edge_digest(p, ranges[p], self.EDGE_SIZE)
+        )
+
+        # edges of short payloads already cover all of it
+        small = [g for g in groups if _size(ranges[g[0]]) <= 2 * self.EDGE_SIZE]
+        big = [g for g in groups if _size(ranges[g[0]]) > 2 * self.EDGE_SIZE]
+        fully_hashed = sum(map(len, big))
+        big = _split_by_digest(
+            pool, big, lambda p: payload_digest(p, ranges[p], self.CHUNK_SIZE)
+        )
+
+        self.stats = DuplicateStats(len(candidates), edges_hashed, fully_hashed)
+        return small + big
+
+
+def _size(payload: PayloadRange) -> int:
+    return payload[1] - payload[0]
+
+
+def _split(
+    groups: Iterable[List[str]], key: Callable[[str], Optional[Hashable]]
+) -> List[List[str]]:
+    """Splits every group by `key`, drops groups with single path and ones with `None` key"""
+    result: List[List[str]] = []
+    for group in groups:
+        by_key: Dict[Hashable, List[str]] = {}
+        for path in group:
+            value = key(path)
+            if value is not None:
+                by_key.setdefault(value, []).append(path)
+        result.extend(paths for paths in by_key.values() if len(paths) > 1)
+    return result
+
+
+def _split_by_digest(
+    pool: Executor, groups: List[List[str]], digest: Callable[[str], Optional[str]]
+) -> List[List[str]]:
+    paths = [path for group in groups for path in group]
+    digests = dict(zip(paths, pool.map(digest, paths)))
+    return _split(groups, digests.__getitem__)
+
+
+def find_duplicates(
+    items: Sequence[PlaylistItem], max_workers: int | None = None
+) -> List[List[PlaylistItem]]:
+    return DuplicateFinder(max_workers).find(items)
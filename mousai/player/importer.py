@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .playlist import SUPPORTED_AUDIO_FILES, PlaylistItem
+
+if TYPE_CHECKING:
+    from .metadata_cache import MetadataCache
+
+IMPORT_BATCH_EVENT = "-IMPORT_BATCH-"
+IMPORT_PROGRESS_EVENT = "-IMPORT_PROGRESS-"
+IMPORT_DONE_EVENT = "-IMPORT_DONE-"
+IMPORT_CANCELLED_EVENT = "-IMPORT_CANCELLED-"
+
+EmitFunc = Callable[[str, Any], None]
+
+
+class ImportProgress(NamedTuple):
+    done: int
+    total: int
+    failed: int
+
+
+class ImportResult(NamedTuple):
+    added: int
+    failed: List[Tuple[Path, str]]
+    cancelled: bool = False
+
+
+def is_supported_audio_file(name: str) -> bool:
+    """Checks file extension only, so it is safe to call before any IO on the file"""
+    return os.path.splitext(name)[1].lower() in SUPPORTED_AUDIO_FILES
+
+
+def scan_audio_files(directory: Path | str) -> Iterator[Path]:
+    """
+    Recursively yields paths of supported audio files from `directory`.
+
+    Uses `os.scandir` so directory entries are classified without extra `stat` calls;
+    files with unsupported extensions are dropped by name before anything else is done with them.
+    Directories that can't be read are skipped.
+    """
+    stack = [os.fspath(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.path)
+                    continue
+            except OSError:
+                continue
+
+            if is_supported_audio_file(entry.name):
+                yield Path(entry.path)
+
+        # reversed so directories are visited in alphabetical order
+        stack.extend(reversed(sub_dirs))
+
+
+def _load_item(path: Path) -> PlaylistItem:
+    # module level function so it can be pickled and sent to `ProcessPoolExecutor` workers
+    return PlaylistItem.from_file(path)
+
+
+class LibraryImporter:
+    """
+    Parses audio files on a worker pool in the background and streams
+    finished `PlaylistItem`s back in batches.
+
+    Results are delivered through `emit(event, value)` which is called from the importer thread;
+    it has the same signature as `sg.Window.write_event_value` so GUI can pass it directly
+    and handle import events in its main loop:
+
+    - `IMPORT_BATCH_EVENT` with list of parsed `PlaylistItem`s
+    - `IMPORT_PROGRESS_EVENT` with `ImportProgress`
+    - `IMPORT_DONE_EVENT` or `IMPORT_CANCELLED_EVENT` with `ImportResult`
+
+    When `cache` is passed, files are looked up in it first and only cache misses are sent to the pool.
+
+    `paths` can also contain ready `PlaylistItem`s (e.g. read from saved playlist), they are passed through as they are.
+    `paths` is read completely before import starts to count files, unless `total` is passed -
+    then items are streamed from it as they are imported.
+    """
+
+    BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        paths: Iterable[Union[Path, PlaylistItem]],
+        emit: EmitFunc,
+        *,
+        total: int | None = None,
+        max_workers: int | None = None,
+        use_processes: bool = False,
+        batch_size: int = BATCH_SIZE,
+        cache: MetadataCache | None = None,
+    ) -> None:
+        self._paths = paths
+        self._total = total
+        self._emit = emit
+        self._cache = cache
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.batch_size = batch_size
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="LibraryImporter", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop importing; files that are already being parsed are finished but not delivered"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="import"
+        )
+
+    def _run(self) -> None:
+        # Walking directories can be slow too (network drives) so it happens here and not in the GUI thread
+        if self._total is None:
+            paths: Iterable[Union[Path, PlaylistItem]] = list(self._paths)
+            total = len(paths)  # type: ignore
+        else:
+            paths = self._paths
+            total = self._total
+        added = 0
+        failed: List[Tuple[Path, str]] = []
+        batch: List[PlaylistItem] = []
+
+        # Limit number of submitted futures so huge imports dont keep every result in memory at once
+        max_pending = self.max_workers * 4
+        paths_iter = iter(paths)
+        pending: Set[Future] = set()
+        futures_paths = {}
+
+        with self._create_executor() as executor:
+            paths_exhausted = False
+            while not self.cancelled:
+                while len(pending) < max_pending and len(batch) < self.batch_size:
+                    path = next(paths_iter, None)
+                    if path is None:
+                        paths_exhausted = True
+                        break
+
+                    if isinstance(path, PlaylistItem):
+                        batch.append(path)
+                        continue
+
+                    cached_item = self._get_cached(path)
+                    if cached_item is not None:
+                        batch.append(cached_item)
+                    else:
+                        future = executor.submit(_load_item, path)
+                        futures_paths[future] = path
+                        pending.add(future)
+
+                if pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = futures_paths.pop(future)
+                        try:
+                            item = future.result()
+                        except Exception as e:
+                            failed.append((path, str(e)))
+                        else:
+                            batch.append(item)
+                            if self._cache is not None:
+                                self._cache.put(path, item.meta)
+                elif paths_exhausted:
+                    break
+
+                while len(batch) >= self.batch_size:
+                    added += self._flush(batch[: self.batch_size], added, total, failed)
+                    batch = batch[self.batch_size :]
+
+            for future in pending:
+                future.cancel()
+
+        if self.cancelled:
+            self._emit(
+                IMPORT_CANCELLED_EVENT, ImportResult(added, failed, cancelled=True)
+            )
+            return
+
+        if batch:
+            added += self._flush(batch, added, total, failed)
+        self._emit(IMPORT_DONE_EVENT, ImportResult(added, failed))
+
+    def _get_cached(self, path: Path) -> PlaylistItem | None:
+        if self._cache is None:
+            return None
+
+        try:
+            meta = self._cache.get(path)
+        except OSError:
+            # let `PlaylistItem.from_file` report the error
+            return None
+
+        return PlaylistItem(path, meta) if meta is not None else None
+
+    def _flush(
+        self,
+        batch: List[PlaylistItem],
+        added: int,
+        total: int,
+        failed: List[Tuple[Path, str]],
+    ) -> int:
+        self._emit(IMPORT_BATCH_EVENT, batch)
+        done = added + len(batch) + len(failed)
+        self._emit(IMPORT_PROGRESS_EVENT, ImportProgress(done, total, len(failed)))
+        return len(batch)
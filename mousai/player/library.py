@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .importer import EmitFunc, is_supported_audio_file
+from .playlist import AudioMetaData, Playlist, PlaylistItem
+
+if TYPE_CHECKING:
+    from .metadata_cache import MetadataCache
+
+LIBRARY_CHANGES_EVENT = "-LIBRARY_CHANGES-"
+
+# (size, mtime_ns) of a file
+FileSignature = Tuple[int, int]
+
+
+class LibraryChanges(NamedTuple):
+    added: List[PlaylistItem]
+    # new items for files that changed on disk
+    updated: List[PlaylistItem]
+    removed: List[str]
+
+
+def file_signature(path: str) -> FileSignature | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def walk_library(root: str) -> Tuple[List[str], Dict[str, FileSignature]]:
+    """Returns all directories under `root` (including it) and signatures of supported audio files in them"""
+    dirs = []
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        dirs.append(dir_path)
+        for name in file_names:
+            if is_supported_audio_file(name):
+                path = os.path.join(dir_path, name)
+                signature = file_signature(path)
+                if signature is not None:
+                    files[path] = signature
+    return dirs, files
+
+
+class Inotify:
+    """Minimal wrapper of Linux inotify API (through libc), raises `OSError` if its not available"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (
+        IN_CLOSE_WRITE
+        | IN_ATTRIB
+        | IN_CREATE
+        | IN_DELETE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_DELETE_SELF
+        | IN_MOVE_SELF
+        | IN_ONLYDIR
+    )
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is available on Linux only")
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.dirs: Dict[int, str] = {}  # watch descriptor -> directory path
+
+    def add_watch(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = path
+
+    def read(self, timeout: float) -> List[Tuple[str, int]]:
+        """Returns (path, event mask) pairs of events that happened; waits up to `timeout` seconds for first one"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                events.append(("", mask))
+                continue
+
+            dir_path = self.dirs.get(wd)
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+            if dir_path is None:
+                continue
+
+            path = os.path.join(dir_path, os.fsdecode(name)) if name else dir_path
+            events.append((path, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LibraryWatcher:
+    """
+    Watches library root directories and reports changed audio files.
+
+    Every root is scanned once when its added, remembering size and modification time of every file;
+    after that only files that changed are parsed again. Changes are detected with inotify on Linux,
+    elsewhere (or if inotify fails) roots are rescanned every `poll_interval` seconds and signatures compared.
+
+    Changes are delivered from watcher thread as `LibraryChanges` through `emit(LIBRARY_CHANGES_EVENT, changes)`,
+    like `LibraryImporter` events; `apply_library_changes` applies them to playlist.
+    """
+
+    POLL_INTERVAL = 30.0
+    # inotify events are collected for this many seconds so file that is being copied is parsed once
+    DEBOUNCE = 1.0
+
+    def __init__(
+        self,
+        emit: EmitFunc,
+        *,
+        cache: MetadataCache | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        self._emit = emit
+        self._cache = cache
+        self.poll_interval = poll_interval
+        self.roots: List[str] = []
+        self._files: Dict[str, FileSignature] = {}
+        self._new_roots: List[str] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._inotify: Inotify | None = None
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+            except (OSError, AttributeError):
+                # no inotify (not Linux or libc without it), fall back to polling
+                pass
+
+        self._thread = threading.Thread(
+            target=self._run, name="LibraryWatcher", daemon=True
+        )
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def add_root(self, root: Path | str) -> None:
+        """Starts watching `root` directory; it is scanned in watcher thread"""
+        root = os.fspath(root)
+        with self._lock:
+            if any(_is_within(root, r) for r in self.roots + self._new_roots):
+                return
+            self._new_roots.append(root)
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._register_new_roots()
+
+            if self._inotify is not None:
+                self._watch_events()
+            elif not self._wake.wait(self.poll_interval):
+                self._rescan()
+
+    def _register_new_roots(self) -> None:
+        with self._lock:
+            new_roots, self._new_roots = self._new_roots, []
+
+        for root in new_roots:
+            dirs, files = walk_library(root)
+            self._files.update(files)
+            if self._inotify is not None:
+                for dir_path in dirs:
+                    self._inotify.add_watch(dir_path)
+            with self._lock:
+                self.roots.append(root)
+
+    def _watch_events(self) -> None:
+        assert self._inotify is not None
+        dirty: Set[str] = set()
+        events = self._inotify.read(timeout=0.5)
+        while events:
+            for path, mask in events:
+                if mask & Inotify.IN_Q_OVERFLOW:
+                    # some events were lost
+                    self._rescan()
+                    return
+                self._mark_dirty(path, mask, dirty)
+            if self._stop.is_set():
+                return
+            events = self._inotify.read(timeout=self.DEBOUNCE)
+
+        if dirty:
+            self._check_files(dirty)
+
+    def _mark_dirty(self, path: str, mask: int, dirty: Set[str]) -> None:
+        assert self._inotify is not None
+        if mask & Inotify.IN_ISDIR or mask & (
+            Inotify.IN_DELETE_SELF | Inotify.IN_MOVE_SELF
+        ):
+            if mask & (Inotify.IN_CREATE | Inotify.IN_MOVED_TO):
+                # directory with files can be moved into library at once
+                dirs, files = walk_library(path)
+                for dir_path in dirs:
+                    self._inotify.add_watch(dir_path)
+                dirty.update(files)
+            else:
+                prefix = path + os.sep
+                dirty.update(p for p in self._files if p.startswith(prefix))
+        elif is_supported_audio_file(path):
+            dirty.add(path)
+
+    def _rescan(self) -> None:
+        """Scans all roots and reports files that changed since last scan"""
+        with self._lock:
+            roots = list(self.roots)
+
+        current: Dict[str, FileSignature] = {}
+        for root in roots:
+            current.update(walk_library(root)[1])
+
+        dirty = {
+            p for p, signature in current.items() if self._files.get(p) != signature
+        }
+        dirty.update(p for p in self._files if p not in current)
+        if dirty:
+            self._check_files(dirty)
+
+    def _check_files(self, paths: Set[str]) -> None:
+        added: List[PlaylistItem] = []
+        updated: List[PlaylistItem] = []
+        removed: List[str] = []
+
+        for path in sorted(paths):
+            signature = file_signature(path)
+            old_signature = self._files.get(path)
+            if signature == old_signature:
+                continue
+
+            if signature is None:
+                del self._files[path]
+                removed.append(path)
+                continue
+
+            self._files[path] = signature
+            item = self._load_item(path)
+            if item is None:
+                continue
+            (added if old_signature is None else updated).append(item)
+
+        if added or updated or removed:
+            self._emit(LIBRARY_CHANGES_EVENT, LibraryChanges(added, updated, removed))
+
+    def _load_item(self, path: str) -> PlaylistItem | None:
+        try:
+            if self._cache is not None:
+                meta = self._cache.load(Path(path))
+            else:
+                meta = AudioMetaData.from_file(Path(path))
+        except Exception:
+            # file can be still being written or its not valid audio file
+            return None
+        return PlaylistItem(path, meta)
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class PathIndex:
+    """Maps file paths to playlist items, kept up to date by subscribing to playlist"""
+
+    def __init__(self, playlist: Playlist) -> None:
+        self._items: Dict[str, List[PlaylistItem]] = {}
+        for item in playlist:
+            self.on_add(item)
+        playlist.subscribe(self)
+
+    def get(self, path: str) -> List[PlaylistItem]:
+        return list(self._items.get(path, ()))
+
+    def on_add(self, item: PlaylistItem) -> None:
+        self._items.setdefault(item._path, []).append(item)
+
+    def on_remove(self, item: PlaylistItem) -> None:
+        items = self._items.get(item._path)
+        if items is None:
+            return
+        items.remove(item)
+        if not items:
+            del self._items[item._path]
+
+
+def apply_library_changes(
+    playlist: Playlist, paths: PathIndex, changes: LibraryChanges
+) -> None:
+    """
+    Applies changes to playlist: songs of removed files are removed, songs of changed files are replaced
+    with updated ones at the same position; new files (and changed ones not in playlist yet) are added.
+    """
+    for path in changes.removed:
+        for item in paths.get(path):
+            if item in playlist:
+                playlist.remove_item(item.id)
+
+    for new_item in changes.updated:
+        old_items = [item for item in paths.get(new_item._path) if item in playlist]
+        if not old_items:
+            playlist.add(new_item)
+        for old_item in old_items:
+            playlist[playlist.index(old_item.id)] = new_item
+
+    for item in changes.added:
+        if not paths.get(item._path):
+            playlist.add(item)
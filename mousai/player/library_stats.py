@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional
+
+from .playlist import Playlist, PlaylistItem
+
+# Fields songs are grouped by, `AudioMetaData` attribute names
+GROUP_FIELDS = ("artist", "album", "genre")
+
+
+class GroupStats(NamedTuple):
+    # `None` groups songs without value of the field
+    name: Optional[str]
+    songs: int
+    # seconds, songs with unknown duration count as 0
+    duration: float
+
+
+class _Group:
+    __slots__ = ("songs", "duration_ms", "items")
+
+    def __init__(self) -> None:
+        self.songs = 0
+        # summed as integer milliseconds, so adding and removing songs doesnt accumulate rounding errors
+        self.duration_ms = 0
+        # item id -> number of its copies in playlist
+        self.items: Dict[int, int] = {}
+
+    def add(self, item_id: int, duration_ms: int) -> None:
+        self.songs += 1
+        self.duration_ms += duration_ms
+        self.items[item_id] = self.items.get(item_id, 0) + 1
+
+    def remove(self, item_id: int, duration_ms: int) -> None:
+        self.songs -= 1
+        self.duration_ms -= duration_ms
+        copies = self.items.pop(item_id) - 1
+        if copies:
+            self.items[item_id] = copies
+
+    def to_stats(self, name: Optional[str]) -> GroupStats:
+        return GroupStats(name, self.songs, self.duration_ms / 1000)
+
+
+def _duration_ms(item: PlaylistItem) -> int:
+    playtime = item.meta.playtime
+    return round(playtime * 1000) if playtime else 0
+
+
+def _group_name(item: PlaylistItem, field: str) -> Optional[str]:
+    value = getattr(item.meta, field)
+    return (value.strip() or None) if value else None
+
+
+class LibraryStats:
+    """
+    Number of songs and their total duration - of whole playlist and of every artist, album and genre.
+
+    Subscribes to `playlist` like `SearchIndex`; every added or removed song updates counters
+    of its groups in O(1), so totals are never computed by walking the playlist.
+    Every copy of a song in playlist is counted, like `len(playlist)` does.
+    Lists of groups are built (and sorted) only when they are asked for, see `groups`.
+    """
+
+    def __init__(self, playlist: Playlist | None = None) -> None:
+        self._total = _Group()
+        self._groups: Dict[str, Dict[Optional[str], _Group]] = {
+            field: {} for field in GROUP_FIELDS
+        }
+        # number of songs with unknown duration
+        self.unknown_duration = 0
+
+        if playlist is not None:
+            for item in playlist:
+                self.on_add(item)
+            playlist.subscribe(self)
+
+    def on_add(self, item: PlaylistItem) -> None:
+        duration_ms = _duration_ms(item)
+        if not duration_ms:
+            self.unknown_duration += 1
+
+        self._total.add(item.id, duration_ms)
+        for field, groups in self._groups.items():
+            name = _group_name(item, field)
+            group = groups.get(name)
+            if group is None:
+                group = groups[name] = _Group()
+            group.add(item.id, duration_ms)
+
+    def on_remove(self, item: PlaylistItem) -> None:
+        if item.id not in self._total.items:
+            return
+
+        duration_ms = _duration_ms(item)
+        if not duration_ms:
+            self.unknown_duration -= 1
+
+        self._total.remove(item.id, duration_ms)
+        for field, groups in self._groups.items():
+            name = _group_name(item, field)
+            group = groups[name]
+            group.remove(item.id, duration_ms)
+            if not group.songs:
+                del groups[name]
+
+    @property
+    def total(self) -> GroupStats:
+        """Stats of whole playlist"""
+        return self._total.to_stats(None)
+
+    def count(self, field: str) -> int:
+        """Number of groups of `field` (e.g. number of artists), songs without its value are not counted"""
+        groups = self._get_groups(field)
+        return len(groups) - (None in groups)
+
+    def group(self, field: str, name: Optional[str]) -> Optional[GroupStats]:
+        """Returns stats of one group, `None` if no song has that value"""
+        group = self._get_groups(field).get(name)
+        return group.to_stats(name) if group is not None else None
+
+    def groups(self, field: str) -> List[GroupStats]:
+        """Returns stats of every group of `field` sorted by name, songs without its value are last"""
+        groups = self._get_groups(field)
+        names = sorted((name for name in groups if name is not None), key=str.casefold)
+        if None in groups:
+            names.append(None)  # type: ignore
+        return [groups[name].to_stats(name) for name in names]
+
+    def item_ids(self, field: str, name: Optional[str]) -> List[int]:
+        """Returns ids of songs in group, e.g. to show songs of an artist"""
+        group = self._get_groups(field).get(name)
+        return list(group.items) if group is not None else []
+
+    def _get_groups(self, field: str) -> Dict[Optional[str], _Group]:
+        try:
+            return self._groups[field]
+        except KeyError:
+            raise ValueError(f"Songs cant be grouped by {field!r}")
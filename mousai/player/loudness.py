@@ -0,0 +1,236 @@
+"""
+Loudness analysis used to play every song at similar loudness (ReplayGain-like normalization).
+
+Songs are decoded to PCM and measured with NumPy: signal is split into `BLOCK_SECONDS` long blocks,
+mean square of every block is computed at once and loudness is the `LOUD_PERCENTILE` percentile
+of block energies, so quiet intros and silence dont make a song look quieter than it sounds.
+Silent blocks (below `SILENCE_DB`) are left out. Result approximates integrated loudness
+well enough to even out jumps in volume between songs.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Set,
+    Tuple,
+)
+
+from pygame import mixer
+
+from .importer import ImportProgress
+from .playlist import PlaylistItem
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .metadata_cache import MetadataCache
+
+LOUDNESS_PROGRESS_EVENT = "-LOUDNESS_PROGRESS-"
+LOUDNESS_DONE_EVENT = "-LOUDNESS_DONE-"
+
+# Loudness songs are brought to, in dBFS of RMS (full scale sine wave is -3 dBFS)
+REFERENCE_LOUDNESS = -18.0
+# Gain is limited so broken or almost silent files dont get boosted to full volume
+MAX_GAIN = 18.0
+SILENCE_DB = -70.0
+BLOCK_SECONDS = 0.05
+LOUD_PERCENTILE = 95
+# Songs are decoded at lower sample rate, it is enough to measure loudness and halves memory used
+SAMPLE_RATE = 22050
+
+EmitFunc = Callable[[str, object], None]
+
+
+class TrackLoudness(NamedTuple):
+    # dBFS, `SILENCE_DB` for silent songs
+    loudness: float
+    # highest absolute sample value, 0-1
+    peak: float
+
+    def gain(self, reference: float = REFERENCE_LOUDNESS) -> float:
+        """Gain in dB that brings song to `reference` loudness; silent songs are left as they are"""
+        if self.loudness <= SILENCE_DB:
+            return 0.0
+        return round(max(-MAX_GAIN, min(MAX_GAIN, reference - self.loudness)), 2)
+
+
+class LoudnessResult(NamedTuple):
+    # item id -> gain
+    gains: Dict[int, float]
+    failed: List[Tuple[str, str]]
+    cancelled: bool = False
+
+
+def measure(samples: np.ndarray, sample_rate: int) -> TrackLoudness:
+    """Measures loudness of `samples` - float array of (frames, channels) shape with values in -1..1"""
+    import numpy as np
+
+    if samples.size == 0:
+        return TrackLoudness(SILENCE_DB, 0.0)
+
+    peak = float(np.abs(samples).max())
+
+    # Song is cut to whole blocks, shorter songs are one block
+    block = max(1, int(sample_rate * BLOCK_SECONDS))
+    frames = len(samples) // block * block or len(samples)
+    blocks = samples[:frames].reshape(max(1, frames // block), -1)
+    energy = np.square(blocks, dtype=np.float64).mean(axis=1)
+
+    energy = energy[energy > 10 ** (SILENCE_DB / 10)]
+    if energy.size == 0:
+        return TrackLoudness(SILENCE_DB, peak)
+
+    loudness = 10 * math.log10(float(np.percentile(energy, LOUD_PERCENTILE)))
+    return TrackLoudness(round(loudness, 2), peak)
+
+
+def _init_decoder() -> None:
+    # Decoding doesnt need audio device, workers must not open one next to the player
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    mixer.init(SAMPLE_RATE, -16, 2)
+
+
+def decode(path: str) -> np.ndarray:
+    """Decodes audio file with pygame mixer (see `_init_decoder`) to float array of (frames, channels) shape"""
+    import numpy as np
+
+    if not mixer.get_init():
+        _init_decoder()
+
+    _, size, channels = mixer.get_init()
+    if size != -16:
+        raise ValueError(f"Mixer must be initialized with 16 bit samples, not {size}")
+
+    sound = mixer.Sound(file=path)
+    samples = np.frombuffer(sound.get_raw(), dtype=np.int16).reshape(-1, channels)
+    return samples.astype(np.float32) / 32768
+
+
+def analyze_file(path: str) -> TrackLoudness:
+    # module level function so it can be pickled and sent to `ProcessPoolExecutor` workers
+    try:
+        samples = decode(path)
+    except Exception as e:
+        # pygame errors are raised as `ValueError` so they can be sent back from worker process
+        raise ValueError(f"Cant decode: {e}") from None
+    return measure(samples, SAMPLE_RATE)
+
+
+class LoudnessAnalyzer:
+    """
+    Measures loudness of songs on process pool in the background (decoding is CPU bound)
+    and computes gain that brings them to `reference` loudness.
+
+    Works like `LibraryImporter`: results are delivered through `emit(event, value)` called from analyzer thread -
+    `LOUDNESS_PROGRESS_EVENT` with `ImportProgress` and `LOUDNESS_DONE_EVENT` with `LoudnessResult`.
+    Analyzed items are not modified, its up to the receiver to set `gain` in their metadata;
+    when `cache` is passed gain is saved there right away, so songs are analyzed once.
+
+    Workers are started with "spawn" so they dont inherit mixer and audio device of the player process.
+    """
+
+    PROGRESS_EVERY = 20
+
+    def __init__(
+        self,
+        items: Iterable[PlaylistItem],
+        emit: EmitFunc,
+        *,
+        max_workers: int | None = None,
+        reference: float = REFERENCE_LOUDNESS,
+        cache: MetadataCache | None = None,
+    ) -> None:
+        self._items = list(items)
+        self._emit = emit
+        self._cache = cache
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.reference = reference
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="LoudnessAnalyzer", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        total = len(self._items)
+        gains: Dict[int, float] = {}
+        failed: List[Tuple[str, str]] = []
+        reported = 0
+
+        # Decoded songs take a lot of memory, so only few more are submitted than there are workers
+        max_pending = self.max_workers * 2
+        items = iter(self._items)
+        pending: Set[Future] = set()
+        futures_items: Dict[Future, PlaylistItem] = {}
+
+        with ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_decoder,
+        ) as executor:
+            while not self.cancelled:
+                for item in items:
+                    future = executor.submit(analyze_file, item._path)
+                    futures_items[future] = item
+                    pending.add(future)
+                    if len(pending) >= max_pending:
+                        break
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures_items.pop(future)
+                    try:
+                        gain = future.result().gain(self.reference)
+                    except Exception as e:
+                        failed.append((item._path, str(e)))
+                        continue
+
+                    gains[item.id] = gain
+                    if self._cache is not None:
+                        self._cache.set_gain(item.path, gain)
+
+                finished = len(gains) + len(failed)
+                if finished - reported >= self.PROGRESS_EVERY or finished == total:
+                    reported = finished
+                    self._emit(
+                        LOUDNESS_PROGRESS_EVENT,
+                        ImportProgress(finished, total, len(failed)),
+                    )
+
+            for future in pending:
+                future.cancel()
+
+        if self._cache is not None:
+            self._cache.flush()
+        self._emit(
+            LOUDNESS_DONE_EVENT, LoudnessResult(gains, failed, cancelled=self.cancelled)
+        )
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from .playlist import ArtRef, AudioMetaData
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    stale: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MetadataCache:
+    """
+    Persistent cache of `AudioMetaData` stored in SQLite database.
+
+    Entries are keyed by resolved file path and validated with file size and modification time,
+    so cache hit does not need to open the audio file at all. Entries of files that changed on disk
+    are counted as `stale`, parsed again and replaced.
+    Only digests of art covers are stored, images are read from audio files on demand (see `ArtStore`).
+    Loudness gain is stored with the rest of metadata, so it is measured again when file changes.
+
+    Can be shared between threads.
+    """
+
+    SCHEMA_VERSION = 4
+    # Committing after every insert is slow when importing thousands of files
+    COMMIT_EVERY = 100
+
+    def __init__(self, db_path: Path | str = ":memory:") -> None:
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.fspath(db_path), check_same_thread=False)
+        self._uncommitted = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version != self.SCHEMA_VERSION:
+                self._conn.executescript("""
+                    DROP TABLE IF EXISTS metadata;
+                    DROP TABLE IF EXISTS art;
+                    """)
+            self._conn.executescript(f"""
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+                CREATE TABLE IF NOT EXISTS metadata (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    file_name TEXT NOT NULL,
+                    playtime REAL NOT NULL,
+                    artist TEXT,
+                    album TEXT,
+                    title TEXT,
+                    genre TEXT,
+                    release_date TEXT,
+                    art_digest TEXT,
+                    gain REAL
+                );
+                """)
+            self._conn.commit()
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, self._stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()
+        return count
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(path.resolve())
+
+    def get(self, path: Path) -> AudioMetaData | None:
+        """
+        Returns cached metadata of `path` or `None` if file is not cached or changed since it was cached.
+        Raises `FileNotFoundError` if file does not exist.
+        """
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT size, mtime_ns, file_name, playtime, artist, album, title, genre,
+                    release_date, art_digest, gain
+                FROM metadata WHERE path = ?
+                """,
+                (self._key(path),),
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            (
+                size,
+                mtime_ns,
+                file_name,
+                playtime,
+                artist,
+                album,
+                title,
+                genre,
+                release_date,
+                art_digest,
+                gain,
+            ) = row
+            if size != st.st_size or mtime_ns != st.st_mtime_ns:
+                self._misses += 1
+                self._stale += 1
+                return None
+
+            self._hits += 1
+
+        art = ArtRef(str(path), art_digest) if art_digest is not None else None
+        return AudioMetaData(
+            file_name, playtime, artist, album, title, genre, release_date, art, gain
+        )
+
+    def put(self, path: Path, meta: AudioMetaData) -> None:
+        st = os.stat(path)
+        art_digest = meta.art.digest if meta.art is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(path),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    *meta[:-2],
+                    art_digest,
+                    meta.gain,
+                ),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.COMMIT_EVERY:
+                self._commit()
+
+    def set_gain(self, path: Path, gain: float | None) -> bool:
+        """
+        Sets loudness gain of cached file; returns `False` if file is not cached
+        or changed since it was cached (its metadata has to be parsed again anyway)
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE metadata SET gain = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (gain, self._key(path), st.st_size, st.st_mtime_ns),
+            ).rowcount
+            self._uncommitted += 1
+            if self._uncommitted >= self.COMMIT_EVERY:
+                self._commit()
+        return updated > 0
+
+    def load(self, path: Path) -> AudioMetaData:
+        """Returns cached metadata of `path`; parses file and caches result on cache miss"""
+        meta = self.get(path)
+        if meta is None:
+            meta = AudioMetaData.from_file(path)
+            self.put(path, meta)
+        return meta
+
+    def _commit(self) -> None:
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def flush(self) -> None:
+        """Writes pending entries to disk"""
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._conn.close()
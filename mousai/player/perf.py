@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+# Recording is turned on at start when this environment variable is set to non-empty value
+PERF_ENV = "MOUSAI_PERF"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets, values in milliseconds.
+
+    Bucket `i` counts values up to `BOUNDS_MS[i]`, the last one counts everything bigger;
+    percentiles are upper bounds of buckets they fall in (capped by max value).
+    """
+
+    BOUNDS_MS: Tuple[float, ...] = (
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        16,
+        25,
+        33,
+        50,
+        100,
+        250,
+        500,
+        1000,
+        2500,
+        5000,
+    )
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Returns upper bound of bucket with `p` percentile (0-100) value"""
+        if not self.count:
+            return 0.0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 4),
+            "mean_ms": round(self.mean, 4),
+            "min_ms": round(self.min, 4) if self.count else 0.0,
+            "max_ms": round(self.max, 4),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            # {upper bound: count}, only non empty buckets
+            "buckets": {
+                (str(self.BOUNDS_MS[i]) if i < len(self.BOUNDS_MS) else "inf"): n
+                for i, n in enumerate(self.buckets)
+                if n
+            },
+        }
+
+
+class PerfStats:
+    """
+    Counts and latency histograms of hot paths (song loading, metadata parsing, UI loop...).
+
+    Functions are wrapped with `timed`, other spans are measured with `start`/`stop`;
+    `mark`/`record_since` measure time between two places, e.g. click and start of playback.
+    When recording is disabled every hook costs one attribute check, nothing is stored.
+    Safe to use from worker threads; stats of worker processes are not collected.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._marks: Dict[str, float] = {}
+
+    def record(self, name: str, ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+
+    def start(self) -> float | None:
+        """Returns start time of a span, `None` when recording is disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name: str, started: float | None) -> None:
+        """Records span that started at `started` (returned by `start`)"""
+        if started is not None:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator recording run time of every call of decorated function under `name`"""
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - started) * 1000)
+
+            return wrapper  # type: ignore
+
+        return decorator
+
+    def mark(self, name: str) -> None:
+        """Remembers current time as `name`, replacing previous mark with that name"""
+        if self.enabled:
+            self._marks[name] = time.perf_counter()
+
+    def record_since(self, name: str, mark: str) -> None:
+        """Records time elapsed since `mark` and removes the mark, does nothing if it is not set"""
+        started = self._marks.pop(mark, None)
+        if started is not None:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def get(self, name: str) -> Histogram | None:
+        return self._histograms.get(name)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._marks.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self._histograms.items())
+            }
+        return {"enabled": self.enabled, "time": time.time(), "metrics": metrics}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def export(self, path: Path) -> None:
+        path.write_text(self.to_json(), encoding="utf-8")
+
+    def summary(self) -> List[str]:
+        """Returns one line per metric: name, count, mean, p50, p90, p99 and max in milliseconds"""
+        lines = [
+            f"{'metric':32} {'count':>7} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+        ]
+        for name, m in self.snapshot()["metrics"].items():
+            lines.append(
+                f"{name:32} {m['count']:>7} {m['mean_ms']:>9.3f} {m['p50_ms']:>9.3f}"
+                f" {m['p90_ms']:>9.3f} {m['p99_ms']:>9.3f} {m['max_ms']:>9.3f}"
+            )
+        return lines
+
+
+# Stats of the whole app
+stats = PerfStats(enabled=bool(os.environ.get(PERF_ENV)))
+timed = stats.timed
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List
+
+from .playlist import PlaylistItem
+
+
+class PlayQueue:
+    """
+    Ordered songs - queue of songs to play or history of played ones.
+
+    Works like `deque` of items (both ends, iteration, `maxlen` dropping items from the other end)
+    and additionally removes or moves to the front every copy of an item by its id in O(1).
+    Entries are kept in `OrderedDict` under unique keys, so the same item can be in it more than once;
+    positions of entries are computed when they are accessed by index and cached until next change,
+    so e.g. queue can be shown page by page without walking it from start for every page.
+    """
+
+    def __init__(self, maxlen: int | None = None) -> None:
+        self.maxlen = maxlen
+        self._entries: OrderedDict[int, PlaylistItem] = OrderedDict()
+        # item id -> keys of its entries
+        self._keys: Dict[int, Dict[int, None]] = {}
+        self._next_key = 0
+        self._positions: List[int] | None = None
+        # incremented with every change, tells views that show entries to refresh
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[PlaylistItem]:
+        return iter(self._entries.values())
+
+    def __reversed__(self) -> Iterator[PlaylistItem]:
+        return reversed(self._entries.values())
+
+    def __contains__(self, item: object) -> bool:
+        return isinstance(item, PlaylistItem) and item.id in self._keys
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._entries[key] for key in self._get_positions()[index]]
+        # ends are used the most (next song, last queued song), they dont need positions
+        if index == 0 and self._entries:
+            return next(iter(self._entries.values()))
+        if index == -1 and self._entries:
+            return next(reversed(self._entries.values()))
+        return self._entries[self._get_positions()[index]]
+
+    def __repr__(self) -> str:
+        return f"PlayQueue({list(self)!r}, maxlen={self.maxlen})"
+
+    def _get_positions(self) -> List[int]:
+        if self._positions is None:
+            self._positions = list(self._entries)
+        return self._positions
+
+    def _changed(self) -> None:
+        self._positions = None
+        self.version += 1
+
+    def _add(self, item: PlaylistItem) -> int:
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = item
+        self._keys.setdefault(item.id, {})[key] = None
+        self._changed()
+        return key
+
+    def _discard(self, key: int) -> PlaylistItem:
+        item = self._entries.pop(key)
+        keys = self._keys[item.id]
+        del keys[key]
+        if not keys:
+            del self._keys[item.id]
+        self._changed()
+        return item
+
+    def append(self, item: PlaylistItem) -> None:
+        self._add(item)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.popleft()
+
+    def appendleft(self, item: PlaylistItem) -> None:
+        self._entries.move_to_end(self._add(item), last=False)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.pop()
+
+    def popleft(self) -> PlaylistItem:
+        """Removes and returns first item, raises `IndexError` if its empty"""
+        if not self._entries:
+            raise IndexError("pop from an empty queue")
+        return self._discard(next(iter(self._entries)))
+
+    def pop(self) -> PlaylistItem:
+        """Removes and returns last item, raises `IndexError` if its empty"""
+        if not self._entries:
+            raise IndexError("pop from an empty queue")
+        return self._discard(next(reversed(self._entries)))
+
+    def remove(self, item_id: int) -> int:
+        """Removes every copy of item, returns how many were removed"""
+        keys = list(self._keys.get(item_id, ()))
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def move_to_front(self, item_id: int) -> PlaylistItem:
+        """
+        Moves item to the front, other copies of it are removed.
+        Raises `KeyError` if item is not in queue.
+        """
+        keys = list(self._keys[item_id])
+        for key in keys[1:]:
+            self._discard(key)
+        self._entries.move_to_end(keys[0], last=False)
+        self._changed()
+        return self._entries[keys[0]]
+
+    def page(self, start: int, count: int) -> List[PlaylistItem]:
+        """Returns `count` items from position `start`"""
+        return self[start : start + count]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+        self._changed()
@@ -1,11 +1,20 @@
-import io
+import bisect
+import hashlib
+import itertools
+import os
 import random
 import reprlib
-from datetime import datetime
+import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterator, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Set
 
-import eyed3  # type: ignore
+from .duplicates import DuplicateFinder
+from .perf import timed
+
+if TYPE_CHECKING:
+    from .metadata_cache import MetadataCache
 
 # TODO ANNOTATIONS
 
@@ -13,6 +22,66 @@ import eyed3  # type: ignore
 SUPPORTED_AUDIO_FILES = (".mp3", ".ogg", ".wav")
 
 
+class ArtRef(NamedTuple):
+    """
+    Reference to art cover embedded in audio file.
+
+    Image data itself is not kept in memory, it is read from `path` when needed;
+    `digest` identifies image content so identical covers can be stored once (see `ArtStore`).
+    """
+
+    path: str
+    digest: str
+
+    def read(self) -> Optional[bytes]:
+        """Reads image data from audio file, returns `None` if its no longer there"""
+        from .tag_reader import TagError, read_art
+
+        try:
+            return read_art(self.path)
+        except OSError:
+            return None
+        except TagError:
+            if not self.path.lower().endswith(".mp3"):
+                return None
+
+        # MP3 tags `tag_reader` cant parse (e.g. unsynchronised ID3 tag)
+        import eyed3  # type: ignore
+
+        try:
+            audiofile = eyed3.load(self.path)
+        except OSError:
+            return None
+
+        if audiofile is None or audiofile.tag is None or not audiofile.tag.images:
+            return None
+
+        return audiofile.tag.images[0].image_data
+
+
+# Art digest covers image size and its first and last bytes, so it can be computed
+# without reading whole image from audio file (see `tag_reader`)
+ART_DIGEST_SAMPLE = 4096
+
+
+def art_digest(data: bytes) -> str:
+    sample = ART_DIGEST_SAMPLE
+    return art_digest_parts(
+        len(data), data[:sample], data[max(sample, len(data) - sample) :]
+    )
+
+
+def art_digest_parts(size: int, head: bytes, tail: bytes) -> str:
+    """
+    Digest of image of `size` bytes from its first `ART_DIGEST_SAMPLE` bytes (`head`) and last ones (`tail`);
+    images up to twice the sample size are covered whole - `tail` is the rest after `head`.
+    """
+    digest = hashlib.sha1(size.to_bytes(8, "little"))
+    digest.update(head)
+    digest.update(tail)
+    return digest.hexdigest()
+
+
 class AudioMetaData(NamedTuple):
     file_name: str
     playtime: float = 0
@@ -20,11 +89,34 @@ class AudioMetaData(NamedTuple):
     album: Optional[str] = None
     title: Optional[str] = None
     genre: Optional[str] = None
-    release_date: Optional[datetime] = None
-    art: Optional[io.BytesIO] = None
+    release_date: Optional[str] = None
+    art: Optional[ArtRef] = None
+    # Gain in dB that brings song to reference loudness, set by loudness analysis (see `LoudnessAnalyzer`)
+    gain: Optional[float] = None
 
     @classmethod
+    @timed("metadata.from_file")
     def from_file(cls, path: Path) -> "AudioMetaData":
+        """
+        Reads metadata with `tag_reader`, which reads only headers of file;
+        MP3 files it cant parse are read with eyed3.
+        """
+        from .tag_reader import TagError, read_metadata
+
+        try:
+            return read_metadata(path)
+        except OSError:
+            raise FileNotFoundError(f"File not found: {path!r}")
+        except TagError:
+            if path.suffix.lower() != ".mp3":
+                return cls(path.name)
+        return cls.from_eyed3(path)
+
+    @classmethod
+    def from_eyed3(cls, path: Path) -> "AudioMetaData":
+        # eyed3 is imported when first file is parsed, not at app startup
+        import eyed3  # type: ignore
+
         try:
             audiofile = eyed3.load(path)
         except OSError:
@@ -33,10 +125,14 @@ class AudioMetaData(NamedTuple):
             if audiofile is None or audiofile.tag is None:
                 return cls(path.resolve().parts[-1])
 
-        # Check for art cover
+        # Check for art cover; only its digest is kept, image is read again when it has to be displayed
         art = None
         if len(audiofile.tag.images) > 0:
-            art = io.BytesIO(audiofile.tag.images[0].image_data)
+            art = ArtRef(str(path), art_digest(audiofile.tag.images[0].image_data))
+
+        # Genre and date are stored as plain strings so metadata can be cached and pickled
+        genre = audiofile.tag.genre
+        release_date = audiofile.tag.getBestDate()
 
         return cls(
             path.name,
@@ -44,17 +140,71 @@ class AudioMetaData(NamedTuple):
             audiofile.tag.artist,
             audiofile.tag.album,
             audiofile.tag.title,
-            audiofile.tag.genre,
-            audiofile.tag.getBestDate(),
+            genre.name if genre is not None else None,
+            str(release_date) if release_date is not None else None,
             art,
         )
 
 
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def _compact_meta(meta: AudioMetaData, path: str) -> AudioMetaData:
+    """
+    Returns `meta` with values that repeat across many songs (artist, album, genre...) interned
+    so big playlists keep one copy of each of them; art path shares string with item path.
+    """
+    art = meta.art
+    if art is not None:
+        art = ArtRef(path if art.path == path else art.path, sys.intern(art.digest))
+
+    return AudioMetaData(
+        meta.file_name,
+        meta.playtime,
+        _intern(meta.artist),
+        _intern(meta.album),
+        meta.title,
+        _intern(meta.genre),
+        _intern(meta.release_date),
+        art,
+        meta.gain,
+    )
+
+
 class PlaylistItem:
-    def __init__(self, path, meta_data) -> None:
-        self.path: Path = path
-        self.meta: AudioMetaData = meta_data
-        self.added = datetime.utcnow()
+    """
+    Song in playlist.
+
+    Uses `__slots__` and keeps path as a string so even very large playlists stay small in memory.
+    `id` is unique for every item created while app is running, it stays the same when item moves in playlist.
+    """
+
+    __slots__ = ("id", "_path", "meta", "_added")
+
+    _ids = itertools.count()
+
+    def __init__(self, path, meta_data, added: Optional[float] = None) -> None:
+        self.id: int = next(self._ids)
+        self._path: str = os.fspath(path)
+        self.meta: AudioMetaData = _compact_meta(meta_data, self._path)
+        self._added = time.time() if added is None else added
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path)
+
+    @property
+    def added(self) -> datetime:
+        return datetime.fromtimestamp(self._added, timezone.utc)
+
+    def __getstate__(self):
+        return self._path, self.meta, self._added
+
+    def __setstate__(self, state) -> None:
+        # Items unpickled from other process (e.g. import worker) get new id from this process
+        self._path, self.meta, self._added = state
+        self.id = next(self._ids)
 
     def __repr__(self) -> str:
         return f"PlaylistItem.from_file({self.path})"
@@ -68,57 +218,243 @@ class PlaylistItem:
         raise NotImplementedError
 
     @classmethod
-    def from_file(cls, path: Path) -> "PlaylistItem":
+    def from_file(
+        cls, path: Path, cache: Optional["MetadataCache"] = None
+    ) -> "PlaylistItem":
+        """
+        Creates item with metadata read from `path`;
+        if `cache` is passed metadata is taken from it when file did not change since it was cached
+        """
         if not path.exists():
             raise ValueError("File does not exist")
 
-        if path.suffix not in SUPPORTED_AUDIO_FILES:
+        if path.suffix.lower() not in SUPPORTED_AUDIO_FILES:
             raise ValueError(f"{path.suffix!r} files are not supported")
 
-        meta_data = AudioMetaData.from_file(path)
+        if cache is not None:
+            meta_data = cache.load(path)
+        else:
+            meta_data = AudioMetaData.from_file(path)
 
         return cls(path, meta_data)
 
 
 class Playlist:
+    """
+    Ordered collection of `PlaylistItem`s.
+
+    Items can be accessed by position or by `PlaylistItem.id`; the same item can be in playlist more than once.
+    Removing an item only empties its slot, so items after it are not moved; position of item is its slot
+    minus number of empty slots before it, found with binary search of sorted empty slots.
+    Empty slots are dropped in one pass when they are more than half of all slots,
+    so removing by position or by id stays cheap in big playlists.
+
+    Objects registered with `subscribe` (e.g. `SearchIndex`) are notified about every added
+    and removed item through their `on_add(item)` and `on_remove(item)` methods,
+    so they can keep their own data up to date without scanning whole playlist.
+    """
+
     def __init__(self, songs: List[PlaylistItem] = None) -> None:
-        if songs is None:
-            songs = []
-        self.songs: List[PlaylistItem] = songs
+        self._songs: List[Optional[PlaylistItem]] = []
+        # item id -> indices of its copies in `_songs`, in ascending order
+        self._slots: Dict[int, List[int]] = {}
+        # indices of empty slots in `_songs`, in ascending order
+        self._holes: List[int] = []
+        self._listeners: List[Any] = []
+
+        for item in songs or []:
+            self.add(item)
+
+    @property
+    def songs(self) -> List[PlaylistItem]:
+        self._compact()
+        return self._songs  # type: ignore
+
+    def _compact(self) -> None:
+        if not self._holes:
+            return
+
+        self._songs = [item for item in self._songs if item is not None]
+        self._index_slots()
+
+    def _index_slots(self) -> None:
+        self._slots = {}
+        for i, item in enumerate(self._songs):
+            self._slots.setdefault(item.id, []).append(i)  # type: ignore
+        self._holes = []
+
+    def _add_slot(self, item_id: int, slot: int) -> None:
+        slots = self._slots.get(item_id)
+        if slots is None:
+            self._slots[item_id] = [slot]
+        else:
+            bisect.insort(slots, slot)
+
+    def _remove_slot(self, item_id: int, slot: int) -> None:
+        slots = self._slots[item_id]
+        slots.remove(slot)
+        if not slots:
+            del self._slots[item_id]
+
+    def _empty_slot(self, slot: int) -> None:
+        self._songs[slot] = None
+        bisect.insort(self._holes, slot)
+        if len(self._holes) * 2 > len(self._songs):
+            self._compact()
+
+    def _slot(self, position: int) -> int:
+        """Returns index in `_songs` of item at `position`, raises `IndexError` if there is no such item"""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("playlist index out of range")
+
+        holes = self._holes
+        if not holes or position < holes[0]:
+            return position
+        # Number of empty slots before item: `holes[i] - i` items are before i-th empty slot
+        lo, hi = 0, len(holes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if holes[mid] - mid <= position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return position + lo
 
     def __repr__(self) -> str:
         items = reprlib.repr(self.songs)
         return f"Playlist({items})"
 
     def __str__(self) -> str:
-        return f"Playlist_({len(self.songs)})_items"
+        return f"Playlist_({len(self)})_items"
 
     def __iter__(self) -> Iterator[PlaylistItem]:
-        return iter(self.songs)
+        if not self._holes:
+            return iter(self._songs)  # type: ignore
+        return (item for item in self._songs if item is not None)
 
     def __getitem__(self, key) -> PlaylistItem:
-        return self.songs[key]
+        if isinstance(key, slice):
+            return list(self)[key]  # type: ignore
+        return self._songs[self._slot(key)]  # type: ignore
 
     def __setitem__(self, key, value: PlaylistItem) -> None:
-        self.songs[key] = value
+        slot = self._slot(key)
+        old = self._songs[slot]
+
+        self._remove_slot(old.id, slot)  # type: ignore
+        self._songs[slot] = value
+        self._add_slot(value.id, slot)
+
+        for listener in self._listeners:
+            listener.on_remove(old)
+            listener.on_add(value)
 
-    def __len__(self):
-        return self.songs.__len__()
+    def __len__(self) -> int:
+        return len(self._songs) - len(self._holes)
+
+    def __contains__(self, item: PlaylistItem) -> bool:
+        return item.id in self._slots
+
+    def subscribe(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener) -> None:
+        self._listeners.remove(listener)
 
     def add(self, item: PlaylistItem) -> None:
-        self.songs.append(item)
+        self._add_slot(item.id, len(self._songs))
+        self._songs.append(item)
+
+        for listener in self._listeners:
+            listener.on_add(item)
 
     def remove(self, item_index) -> None:
-        del self.songs[item_index]
+        slot = self._slot(item_index)
+        item = self._songs[slot]
+
+        self._remove_slot(item.id, slot)  # type: ignore
+        self._empty_slot(slot)
+
+        for listener in self._listeners:
+            listener.on_remove(item)
+
+    def get(self, item_id: int) -> PlaylistItem:
+        """Returns item by its id, raises `KeyError` if its not in playlist"""
+        return self._songs[self._slots[item_id][0]]  # type: ignore
+
+    def remove_item(self, item_id: int) -> PlaylistItem:
+        """
+        Removes item by its id without moving other items - its last copy when item is in playlist more than once.
+        Raises `KeyError` if its not in playlist.
+        """
+        slots = self._slots[item_id]
+        slot = slots.pop()
+        if not slots:
+            del self._slots[item_id]
+        item = self._songs[slot]
+        self._empty_slot(slot)
+
+        for listener in self._listeners:
+            listener.on_remove(item)
+        return item  # type: ignore
+
+    def index(self, item_id: int) -> int:
+        """Returns current position of item (of its first copy), raises `KeyError` if its not in playlist"""
+        slot = self._slots[item_id][0]
+        return slot - bisect.bisect_left(self._holes, slot)
 
     def get_random_item(self) -> PlaylistItem:
-        if len(self.songs) < 1:
+        if len(self) < 1:
             raise PlayerError("No items in playlist.")
 
-        return random.choice(self.songs)
-
-    def remove_duplicates(self, item) -> None:
-        raise NotImplementedError
+        # Most slots are used (see `_empty_slot`), so empty ones are skipped instead of compacting
+        while True:
+            item = random.choice(self._songs)
+            if item is not None:
+                return item
+
+    def remove_duplicates(
+        self,
+        groups: Optional[List[List[PlaylistItem]]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[List[PlaylistItem]]:
+        """
+        Removes every song that is a duplicate of a song earlier in playlist.
+
+        `groups` are groups of duplicates found by `DuplicateFinder` (e.g. in background thread);
+        when not passed they are found now. Only the first occurrence of first item of each group stays.
+        Returns groups of duplicates.
+        """
+        if groups is None:
+            groups = DuplicateFinder(max_workers).find(self.songs)
+
+        keep = {group[0].id for group in groups}
+        drop = {item.id for group in groups for item in group[1:]}
+        if not drop:
+            return groups
+
+        kept: Set[int] = set()
+        songs = []
+        removed = []
+        for item in self._songs:
+            if item is None:
+                continue
+            if item.id in drop and (item.id not in keep or item.id in kept):
+                removed.append(item)
+                continue
+            if item.id in keep:
+                kept.add(item.id)
+            songs.append(item)
+
+        self._songs = songs  # type: ignore
+        self._index_slots()
+
+        for item in removed:
+            for listener in self._listeners:
+                listener.on_remove(item)
+        return groups
 
 
 class PlayerError(Exception):
@@ -0,0 +1,217 @@
+"""
+Binary playlist file format.
+
+Layout (little endian):
+
+- header: magic, format version, number of records and strings, offsets of record and string sections
+- records: fixed width, one per `PlaylistItem`; every text field is an index into the string table
+- string table: (offset, length) pair for every string followed by UTF-8 encoded strings blob
+
+Each distinct string is stored once, and fixed width records make it possible to read any item
+straight from memory-mapped file without parsing the ones before it.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .playlist import ArtRef, AudioMetaData, PlayerError, PlaylistItem
+
+MAGIC = b"MOUSAIPL"
+VERSION = 2
+FILE_EXTENSION = ".mpl"
+
+HEADER = struct.Struct("<8sHHIIQQ")
+# path, file_name, artist, album, title, genre, release_date, art path, art digest, playtime, added,
+# gain (NaN if song was not analyzed)
+RECORD = struct.Struct("<9Iddd")
+# Records of older versions are still readable, they lack fields at the end
+RECORDS = {1: struct.Struct("<9Idd"), VERSION: RECORD}
+STRING_ENTRY = struct.Struct("<QI")
+NO_STRING = 0xFFFFFFFF
+
+
+class PlaylistFileError(PlayerError):
+    pass
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.indexes: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+        return index
+
+
+def save_playlist(items: Iterable[PlaylistItem], path: Path) -> int:
+    """
+    Writes `items` to playlist file at `path` and returns number of saved items.
+    Records are streamed to disk; file is written to temporary file first and replaced when complete.
+    """
+    strings = _StringTable()
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for item in items:
+            meta = item.meta
+            art = meta.art
+            # raw `_path` and `_added` are used, creating `Path` and `datetime` for every item is slow
+            f.write(
+                RECORD.pack(
+                    strings.add(item._path),
+                    strings.add(meta.file_name),
+                    strings.add(meta.artist),
+                    strings.add(meta.album),
+                    strings.add(meta.title),
+                    strings.add(meta.genre),
+                    strings.add(meta.release_date),
+                    strings.add(art.path if art is not None else None),
+                    strings.add(art.digest if art is not None else None),
+                    meta.playtime or 0,
+                    item._added,
+                    meta.gain if meta.gain is not None else math.nan,
+                )
+            )
+            count += 1
+
+        strings_offset = f.tell()
+        encoded = [
+            value.encode("utf-8", "surrogateescape") for value in strings.indexes
+        ]
+        blob_offset = strings_offset + STRING_ENTRY.size * len(encoded)
+        for value in encoded:
+            f.write(STRING_ENTRY.pack(blob_offset, len(value)))
+            blob_offset += len(value)
+        for value in encoded:
+            f.write(value)
+
+        f.seek(0)
+        f.write(
+            HEADER.pack(
+                MAGIC, VERSION, 0, count, len(encoded), HEADER.size, strings_offset
+            )
+        )
+
+    os.replace(tmp_path, path)
+    return count
+
+
+class PlaylistFileReader:
+    """
+    Reads playlist saved with `save_playlist` through memory-mapped file.
+
+    Opening is O(1) - only header is parsed; items are decoded when they are accessed,
+    so first items are available immediately even for huge playlists.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file can't be mapped
+            self._file.close()
+            raise PlaylistFileError(f"{path} is not a playlist file")
+
+        try:
+            self._read_header()
+        except PlaylistFileError:
+            self.close()
+            raise
+
+        # Decoded strings are reused so items share artist/album/... objects
+        self._strings: List[Optional[str]] = [None] * self._string_count
+
+    def _read_header(self) -> None:
+        if len(self._mmap) < HEADER.size:
+            raise PlaylistFileError(f"{self.path} is not a playlist file")
+
+        (
+            magic,
+            version,
+            _,
+            self._count,
+            self._string_count,
+            self._records_offset,
+            self._strings_offset,
+        ) = HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC:
+            raise PlaylistFileError(f"{self.path} is not a playlist file")
+        if version not in RECORDS:
+            raise PlaylistFileError(f"Unsupported playlist file version: {version}")
+        self._record = RECORDS[version]
+
+        expected_size = self._strings_offset + STRING_ENTRY.size * self._string_count
+        if (
+            self._records_offset + self._record.size * self._count
+            > self._strings_offset
+            or expected_size > len(self._mmap)
+        ):
+            raise PlaylistFileError(f"{self.path} is truncated or damaged")
+
+    def __enter__(self) -> "PlaylistFileReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[PlaylistItem]:
+        return (self.read_item(i) for i in range(self._count))
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+
+        value = self._strings[index]
+        if value is None:
+            offset, length = STRING_ENTRY.unpack_from(
+                self._mmap, self._strings_offset + STRING_ENTRY.size * index
+            )
+            value = self._strings[index] = str(
+                self._mmap[offset : offset + length], "utf-8", "surrogateescape"
+            )
+        return value
+
+    def read_item(self, index: int) -> PlaylistItem:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+
+        values = self._record.unpack_from(
+            self._mmap, self._records_offset + self._record.size * index
+        )
+        string_indexes, (playtime, added, *rest) = values[:9], values[9:]
+        path, file_name, artist, album, title, genre, release_date, art_path, digest = (
+            self._string(i) for i in string_indexes
+        )
+        art = ArtRef(art_path, digest) if art_path and digest else None
+        gain = rest[0] if rest and not math.isnan(rest[0]) else None
+        meta = AudioMetaData(
+            file_name, playtime, artist, album, title, genre, release_date, art, gain  # type: ignore
+        )
+        return PlaylistItem(path, meta, added=added)
+
+    def iter_batches(self, batch_size: int = 500) -> Iterator[List[PlaylistItem]]:
+        for start in range(0, self._count, batch_size):
+            stop = min(start + batch_size, self._count)
+            yield [self.read_item(i) for i in range(start, stop)]
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
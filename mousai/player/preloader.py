@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .playlist import PlaylistItem
+from .seek_index import SeekIndexError
+
+if TYPE_CHECKING:
+    from .seek_index import SeekIndexCache
+    from .track_cache import TrackCache
+
+# Kinds of jobs of worker thread
+PRELOAD = "preload"
+FILL_CACHE = "fill_cache"
+BUILD_SEEK_INDEX = "build_seek_index"
+
+
+class TrackPreloader:
+    """
+    Reads audio file of next song into memory in background worker thread,
+    so it can be handed to the mixer before current song ends without waiting for the disk.
+
+    Only the last requested song is kept; requests for other songs that were not read yet are skipped.
+    With `cache` files are read through it, so preloaded song is also there when its loaded or played again;
+    `fill_cache` reads song into cache only, e.g. song that mixer is streaming from disk.
+    With `seek_indexes` the worker also builds seek indexes of songs (`build_seek_index`), so seeking doesnt wait for it.
+    """
+
+    def __init__(
+        self,
+        cache: TrackCache | None = None,
+        seek_indexes: SeekIndexCache | None = None,
+    ) -> None:
+        self.cache = cache
+        self.seek_indexes = seek_indexes
+        self._lock = threading.Lock()
+        self._item: PlaylistItem | None = None
+        self._data: bytes | None = None
+        # (song, kind of job)
+        self._jobs: queue.Queue[Optional[Tuple[PlaylistItem, str]]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+    def request(self, item: PlaylistItem) -> None:
+        """Starts reading `item` file unless it is already read or being read"""
+        with self._lock:
+            if item is self._item:
+                return
+            self._item = item
+            self._data = None
+
+        self._put_job(item, PRELOAD)
+
+    def fill_cache(self, item: PlaylistItem) -> None:
+        """Starts reading `item` file into `cache` only, preloaded song doesnt change"""
+        if self.cache is not None:
+            self._put_job(item, FILL_CACHE)
+
+    def build_seek_index(self, item: PlaylistItem) -> None:
+        """Starts building seek index of `item` in `seek_indexes` unless its already there"""
+        if self.seek_indexes is not None and self.seek_indexes.peek(item.path) is None:
+            self._put_job(item, BUILD_SEEK_INDEX)
+
+    def _put_job(self, item: PlaylistItem, kind: str) -> None:
+        self._jobs.put((item, kind))
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._work, name="TrackPreloader", daemon=True
+            )
+            self._worker.start()
+
+    def get(self, item: PlaylistItem) -> bytes | None:
+        """Returns file content of `item` if it was preloaded"""
+        with self._lock:
+            return self._data if item is self._item else None
+
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                item, kind = job
+                if kind == FILL_CACHE:
+                    try:
+                        self.cache.fill(item.path)  # type: ignore
+                    except OSError:
+                        pass
+                    continue
+                if kind == BUILD_SEEK_INDEX:
+                    try:
+                        self.seek_indexes.get(item.path)  # type: ignore
+                    except SeekIndexError:
+                        # mixer seeks in song without index
+                        pass
+                    continue
+                if item is not self._item:  # other song was requested in the meantime
+                    continue
+
+                try:
+                    data = None
+                    if self.cache is not None:
+                        # preloading isnt a play, so it doesnt count in cache hit rate
+                        self.cache.fill(item.path)
+                        data = self.cache.get(item.path)
+                    if data is None:  # no cache or file is too big for it
+                        data = item.path.read_bytes()
+                except OSError:
+                    # song will be loaded from disk when its played
+                    continue
+
+                with self._lock:
+                    if item is self._item:
+                        self._data = data
+            finally:
+                self._jobs.task_done()
+
+    def wait_idle(self) -> None:
+        """Blocks until all started jobs are done"""
+        self._jobs.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker.join()
+            self._worker = None
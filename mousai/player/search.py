@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from .playlist import Playlist, PlaylistItem
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Returns `text` without case and diacritics, e.g. "Beyoncé" -> "beyonce" """
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def item_tokens(item: PlaylistItem) -> Set[str]:
+    """Returns search tokens of title (or file name if song has no title), artist, album and genre"""
+    meta = item.meta
+    tokens: Set[str] = set()
+    for value in (meta.title or meta.file_name, meta.artist, meta.album, meta.genre):
+        if value:
+            tokens.update(tokenize(value))
+    return tokens
+
+
+class SearchResults(Sequence[PlaylistItem]):
+    """
+    Items matching search query, ordered by item id.
+
+    Items are looked up by id only when they are accessed, so even query matching most of the library
+    is cheap when only visible part of results is displayed (see `TableModel`).
+    """
+
+    def __init__(self, ids: List[int], items: Dict[int, PlaylistItem]) -> None:
+        self.ids = ids
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._items[item_id] for item_id in self.ids[index]]
+        return self._items[self.ids[index]]
+
+    def __iter__(self) -> Iterator[PlaylistItem]:
+        return (self._items[item_id] for item_id in self.ids)
+
+
+class SearchIndex:
+    """
+    Inverted index of playlist items.
+
+    Every token of item metadata maps to set of ids of items that contain it; distinct tokens are also
+    kept sorted, so all tokens starting with typed prefix are found with binary search.
+    Item matches the query if each query token is a prefix of any of its tokens,
+    e.g. "beat abb" matches "Abbey Road" by The Beatles.
+
+    Index subscribes to `playlist` and is updated when items are added or removed.
+    """
+
+    # rough number of tokens of one item, used to pick cheaper way of filtering candidates
+    TOKENS_PER_ITEM = 8
+
+    def __init__(self, playlist: Playlist | None = None) -> None:
+        self._postings: Dict[str, Set[int]] = {}
+        self._sorted_tokens: List[str] = []
+        self._items: Dict[int, PlaylistItem] = {}
+        self._item_tokens: Dict[int, Tuple[str, ...]] = {}
+        # number of times item is in playlist, only for items added more than once
+        self._copies: Dict[int, int] = {}
+
+        if playlist is not None:
+            for item in playlist:
+                self.on_add(item)
+            playlist.subscribe(self)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def on_add(self, item: PlaylistItem) -> None:
+        if item.id in self._items:
+            self._copies[item.id] = self._copies.get(item.id, 1) + 1
+            return
+
+        tokens = tuple(item_tokens(item))
+        self._items[item.id] = item
+        self._item_tokens[item.id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                insort(self._sorted_tokens, token)
+            ids.add(item.id)
+
+    def on_remove(self, item: PlaylistItem) -> None:
+        if item.id not in self._items:
+            return
+
+        copies = self._copies.pop(item.id, 1)
+        if copies > 1:
+            if copies > 2:
+                self._copies[item.id] = copies - 1
+            return
+
+        del self._items[item.id]
+        for token in self._item_tokens.pop(item.id):
+            ids = self._postings[token]
+            ids.discard(item.id)
+            if not ids:
+                del self._postings[token]
+                del self._sorted_tokens[bisect_left(self._sorted_tokens, token)]
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        """Returns indexed tokens starting with `prefix`"""
+        start = bisect_left(self._sorted_tokens, prefix)
+        stop = start
+        while stop < len(self._sorted_tokens) and self._sorted_tokens[stop].startswith(
+            prefix
+        ):
+            stop += 1
+        return self._sorted_tokens[start:stop]
+
+    def _match_ids(self, query_tokens: Iterable[str]) -> Set[int]:
+        # candidates come from the most selective query token, the rest only filter them
+        terms = []
+        for prefix in set(query_tokens):
+            tokens = self._prefixed(prefix)
+            if not tokens:
+                return set()
+            size = sum(len(self._postings[token]) for token in tokens)
+            terms.append((size, prefix, tokens))
+        terms.sort()
+
+        _, _, tokens = terms[0]
+        if len(tokens) == 1:
+            ids = set(self._postings[tokens[0]])
+        else:
+            ids = set().union(*(self._postings[token] for token in tokens))
+
+        for size, prefix, tokens in terms[1:]:
+            if len(ids) * self.TOKENS_PER_ITEM < size:
+                # cheaper to check tokens of remaining candidates than to merge all matching postings
+                item_tokens = self._item_tokens
+                ids = {
+                    item_id
+                    for item_id in ids
+                    if any(token.startswith(prefix) for token in item_tokens[item_id])
+                }
+            else:
+                ids.intersection_update(
+                    set().union(*(self._postings[token] for token in tokens))
+                )
+            if not ids:
+                break
+
+        return ids
+
+    def search(self, query: str) -> SearchResults:
+        """
+        Returns items matching `query` in order they were created (for items imported into playlist
+        that is order in which they were added); empty query matches nothing.
+        Results should not be used after playlist changes, search has to be repeated.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return SearchResults([], self._items)
+
+        return SearchResults(sorted(self._match_ids(query_tokens)), self._items)
@@ -0,0 +1,596 @@
+"""
+Seek index of audio files: maps play time to byte offset in file where decoding can start.
+
+- MP3: frames are found by walking frame headers (Xing/Info/VBRI frame is skipped, its table of contents
+  has only 100 entries so its not exact). Every frame has the same number of samples, frame playing at any time
+  is found by dividing time by frame duration - works the same for constant and variable bitrate files.
+- Ogg Vorbis: pages are found with their granule positions (number of samples decoded at the end of page).
+  Decoding can start at any page when header pages are put in front of it.
+- WAV: samples have fixed size, offset is computed from sample rate and block align.
+
+Mixer is then given file object that starts at that offset (see `SeekIndex.open_from`), so seeking is exact
+to the MP3 frame / Ogg page / sample and doesnt depend on how decoder seeks.
+Indexes are built once per file and can be stored on disk, see `SeekIndexCache`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import io
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple, Type, Union
+
+from .duplicates import payload_range
+from .playlist import PlayerError
+
+# Samples per frame and sample rates by MPEG version (bits 19-20 of header): 2.5, reserved, 2, 1
+MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+# Layer III bitrates in kbps, index 0 is "free" bitrate which isnt supported
+MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+VBRI_OFFSET = 36
+
+OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+WAV_FORMATS = (1, 3, 0xFFFE)  # PCM, IEEE float, extensible
+
+
+class SeekIndexError(PlayerError):
+    pass
+
+
+class SeekPoint(NamedTuple):
+    # seconds from start of song
+    time: float
+    # offset in file where decoding starts
+    offset: int
+
+
+class SeekIndex(ABC):
+    """
+    Seek points of one audio file; `locate` finds the point playing at given time.
+
+    `format` is file type name for the mixer, `end` - offset where audio data ends (tags and chunks after it are left out).
+    """
+
+    def __init__(self, format: str, duration: float, end: int) -> None:
+        self.format = format
+        self.duration = duration
+        self.end = end
+
+    @abstractmethod
+    def locate(self, seconds: float) -> SeekPoint:
+        """Returns seek point playing at `seconds`, first or last one when `seconds` is out of song"""
+
+    def header(self, length: int) -> bytes:
+        """Data that has to be put before `length` bytes of audio data starting at a seek point"""
+        return b""
+
+    def open_from(
+        self, source: Path | str | bytes, seconds: float
+    ) -> Tuple[float, SeekStream]:
+        """
+        Returns time of seek point playing at `seconds` and file object the mixer can play from it.
+        `source` is path of the file or its content already in memory (see `TrackCache`);
+        nothing is read or copied until the mixer reads it.
+        """
+        point = self.locate(seconds)
+        length = max(0, self.end - point.offset)
+        if isinstance(source, bytes):
+            return point.time, SeekStream(
+                self.header(length), source, point.offset, self.end
+            )
+        return point.time, SeekStream(
+            self.header(length), open(source, "rb"), point.offset, self.end
+        )
+
+    def read_from(self, path: Path | str, seconds: float) -> Tuple[float, bytes]:
+        """Like `open_from`, returns file data from seek point"""
+        time, stream = self.open_from(path, seconds)
+        with stream:
+            return time, stream.read()
+
+    @abstractmethod
+    def to_bytes(self) -> bytes:
+        """Serializes index, see `SeekIndexCache`"""
+
+    @classmethod
+    @abstractmethod
+    def from_bytes(cls, data: bytes) -> SeekIndex:
+        pass
+
+
+class SeekStream(io.RawIOBase):
+    """
+    Read-only file object of `header` followed by bytes `start`:`end` of `source` - open binary file
+    or file content in memory. Mixer reads it while playing, like a file it streams from disk.
+    """
+
+    def __init__(
+        self,
+        header: bytes,
+        source: Union[io.BufferedIOBase, bytes],
+        start: int,
+        end: int,
+    ) -> None:
+        super().__init__()
+        self._header = header
+        self._source = memoryview(source) if isinstance(source, bytes) else source
+        self._start = start
+        self._end = max(start, end)
+        self._size = len(header) + self._end - start
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        read = 0
+        header = self._header
+        if self._pos < len(header):
+            chunk = header[self._pos : self._pos + len(view)]
+            view[: len(chunk)] = chunk
+            read = len(chunk)
+
+        offset = self._start + self._pos + read - len(header)
+        wanted = min(len(view) - read, self._end - offset)
+        if wanted > 0:
+            if isinstance(self._source, memoryview):
+                view[read : read + wanted] = self._source[offset : offset + wanted]
+                read += wanted
+            else:
+                self._source.seek(offset)
+                read += self._source.readinto(view[read : read + wanted]) or 0
+
+        self._pos += read
+        return read
+
+    def close(self) -> None:
+        if not isinstance(self._source, memoryview):
+            self._source.close()
+        super().close()
+
+
+class FrameIndex(SeekIndex):
+    """MP3 frames; frame for any time is found in O(1)"""
+
+    def __init__(self, offsets: array, frame_duration: float, end: int) -> None:
+        super().__init__("mp3", len(offsets) * frame_duration, end)
+        self.offsets = offsets
+        self.frame_duration = frame_duration
+
+    def locate(self, seconds: float) -> SeekPoint:
+        frame = min(max(0, int(seconds / self.frame_duration)), len(self.offsets) - 1)
+        return SeekPoint(frame * self.frame_duration, self.offsets[frame])
+
+    def to_bytes(self) -> bytes:
+        return (
+            struct.pack("<dq", self.frame_duration, self.end) + self.offsets.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> FrameIndex:
+        frame_duration, end = struct.unpack_from("<dq", data)
+        offsets = array("q")
+        offsets.frombytes(data[16:])
+        return cls(offsets, frame_duration, end)
+
+
+class PageIndex(SeekIndex):
+    """Ogg pages; page for a time is found with binary search of start times"""
+
+    def __init__(
+        self, headers: bytes, times: array, offsets: array, duration: float, end: int
+    ) -> None:
+        super().__init__("ogg", duration, end)
+        self.headers = headers
+        self.times = times
+        self.offsets = offsets
+
+    def locate(self, seconds: float) -> SeekPoint:
+        page = max(0, bisect.bisect_right(self.times, seconds) - 1)
+        return SeekPoint(self.times[page], self.offsets[page])
+
+    def header(self, length: int) -> bytes:
+        return self.headers
+
+    def to_bytes(self) -> bytes:
+        return (
+            struct.pack("<dqI", self.duration, self.end, len(self.headers))
+            + self.headers
+            + self.times.tobytes()
+            + self.offsets.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> PageIndex:
+        duration, end, headers_size = struct.unpack_from("<dqI", data)
+        headers = data[20 : 20 + headers_size]
+        points = data[20 + headers_size :]
+        times, offsets = array("d"), array("q")
+        times.frombytes(points[: len(points) // 2])
+        offsets.frombytes(points[len(points) // 2 :])
+        return cls(headers, times, offsets, duration, end)
+
+
+class SampleIndex(SeekIndex):
+    """WAV samples; offset of any sample is computed in O(1)"""
+
+    def __init__(
+        self, fmt: bytes, data_start: int, end: int, sample_rate: int, block_align: int
+    ) -> None:
+        frames = (end - data_start) // block_align
+        super().__init__("wav", frames / sample_rate, end)
+        self.fmt = fmt
+        self.data_start = data_start
+        self.sample_rate = sample_rate
+        self.block_align = block_align
+        self.frames = frames
+
+    def locate(self, seconds: float) -> SeekPoint:
+        frame = min(max(0, int(seconds * self.sample_rate)), max(0, self.frames - 1))
+        return SeekPoint(
+            frame / self.sample_rate, self.data_start + frame * self.block_align
+        )
+
+    def to_bytes(self) -> bytes:
+        return (
+            struct.pack(
+                "<qqIH", self.data_start, self.end, self.sample_rate, self.block_align
+            )
+            + self.fmt
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SampleIndex:
+        data_start, end, sample_rate, block_align = struct.unpack_from("<qqIH", data)
+        return cls(data[22:], data_start, end, sample_rate, block_align)
+
+    def header(self, length: int) -> bytes:
+        fmt_chunk = b"fmt " + struct.pack("<I", len(self.fmt)) + self.fmt
+        riff_size = 4 + len(fmt_chunk) + 8 + length
+        return (
+            b"RIFF"
+            + struct.pack("<I", riff_size)
+            + b"WAVE"
+            + fmt_chunk
+            + b"data"
+            + struct.pack("<I", length)
+        )
+
+
+def mp3_frame(data: bytes, offset: int) -> Optional[Tuple[int, int, int]]:
+    """Returns (length, samples, sample rate) of Layer III frame at `offset` or `None` if there is no valid header"""
+    if offset + 4 > len(data) or data[offset] != 0xFF:
+        return None
+
+    header = int.from_bytes(data[offset : offset + 4], "big")
+    version = (header >> 19) & 3
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    if (
+        (header >> 21) & 0x7FF != 0x7FF
+        or version == 1
+        or (header >> 17) & 3 != 1  # Layer III
+        or bitrate_index in (0, 15)
+        or rate_index == 3
+    ):
+        return None
+
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header >> 9) & 1
+    if version == 3:
+        bitrate = MP3_BITRATES_V1[bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+    bitrate = MP3_BITRATES_V2[bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def is_info_frame(data: bytes, offset: int) -> bool:
+    """Is frame at `offset` Xing/Info or VBRI header frame (it has no audio)"""
+    version = (data[offset + 1] >> 3) & 3
+    mono = (data[offset + 3] >> 6) & 3 == 3
+    if version == 3:
+        xing = offset + (21 if mono else 36)
+    else:
+        xing = offset + (13 if mono else 21)
+
+    vbri = offset + VBRI_OFFSET
+    return (
+        data[xing : xing + 4] in (b"Xing", b"Info") or data[vbri : vbri + 4] == b"VBRI"
+    )
+
+
+def build_mp3_index(path: Path | str) -> FrameIndex:
+    payload = payload_range(os.fspath(path))
+    if payload is None:
+        raise SeekIndexError(f"Cant read {path}")
+    start, end = payload
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    offsets = array("q")
+    first: Optional[Tuple[int, int]] = None  # samples and rate of first frame
+    synced = False
+    offset = 0
+    while offset + 4 <= len(data):
+        frame = mp3_frame(data, offset)
+        if frame is not None and first is not None and frame[1:] != first:
+            frame = None
+        # after garbage next frame has to be valid too, so sync bits in garbage are not taken for a frame
+        if frame is not None and not synced:
+            next_offset = offset + frame[0]
+            if next_offset < len(data) and mp3_frame(data, next_offset) is None:
+                frame = None
+
+        if frame is None:
+            synced = False
+            offset = data.find(b"\xff", offset + 1)
+            if offset < 0:
+                break
+            continue
+
+        synced = True
+        if first is None:
+            first = frame[1:]
+            if is_info_frame(data, offset):
+                offset += frame[0]
+                continue
+
+        offsets.append(start + offset)
+        offset += frame[0]
+
+    if first is None or not offsets:
+        raise SeekIndexError(f"No MP3 frames found in {path}")
+    return FrameIndex(offsets, first[0] / first[1], end)
+
+
+def build_ogg_index(path: Path | str) -> PageIndex:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    pages = []  # (offset, granule)
+    serial = None
+    offset = 0
+    while offset + OGG_PAGE_HEADER.size <= len(data):
+        capture, _, _, granule, page_serial, _, _, segments = (
+            OGG_PAGE_HEADER.unpack_from(data, offset)
+        )
+        if capture != b"OggS":
+            raise SeekIndexError(f"Damaged Ogg page at {offset} in {path}")
+
+        body = OGG_PAGE_HEADER.size + segments
+        size = body + sum(data[offset + OGG_PAGE_HEADER.size : offset + body])
+        if serial is None:
+            serial = page_serial
+            identification = data[offset + body : offset + size]
+        # pages of other multiplexed streams are skipped
+        if page_serial == serial:
+            pages.append((offset, granule))
+        offset += size
+
+    if not pages or identification[:7] != b"\x01vorbis":
+        raise SeekIndexError(f"{path} is not Ogg Vorbis file")
+    (sample_rate,) = struct.unpack_from("<I", identification, 12)
+    if not sample_rate:
+        raise SeekIndexError(f"Invalid sample rate in {path}")
+
+    # Header pages end with the last page with granule 0, audio starts after it
+    audio = 0
+    for i, (_, granule) in enumerate(pages):
+        if granule > 0:
+            break
+        if granule == 0:
+            audio = i + 1
+    if audio >= len(pages):
+        raise SeekIndexError(f"No audio pages in {path}")
+
+    headers = data[: pages[audio][0]]
+    times = array("d", [0.0])
+    offsets = array("q", [pages[audio][0]])
+    for (_, granule), (page_offset, _) in zip(pages[audio:], pages[audio + 1 :]):
+        # page where no packet ends has granule -1, time of page after it is unknown
+        if granule >= 0:
+            times.append(granule / sample_rate)
+            offsets.append(page_offset)
+
+    last_granule = max(granule for _, granule in pages)
+    return PageIndex(headers, times, offsets, last_granule / sample_rate, len(data))
+
+
+def build_wav_index(path: Path | str) -> SampleIndex:
+    with open(path, "rb") as f:
+        data = f.read(12)
+        if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+            raise SeekIndexError(f"{path} is not WAV file")
+
+        size = os.fstat(f.fileno()).st_size
+        fmt = None
+        offset = 12
+        while offset + 8 <= size:
+            f.seek(offset)
+            chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+            elif chunk_id == b"data":
+                break
+            offset += 8 + chunk_size + (chunk_size & 1)
+        else:
+            raise SeekIndexError(f"No audio data in {path}")
+
+    if fmt is None or len(fmt) < 16:
+        raise SeekIndexError(f"No format chunk in {path}")
+    audio_format, _, sample_rate, _, block_align = struct.unpack_from("<HHIIH", fmt)
+    if audio_format not in WAV_FORMATS or not sample_rate or not block_align:
+        raise SeekIndexError(f"Unsupported WAV format {audio_format} in {path}")
+
+    data_start = offset + 8
+    return SampleIndex(
+        fmt, data_start, min(size, data_start + chunk_size), sample_rate, block_align
+    )
+
+
+INDEX_BUILDERS = {
+    ".mp3": build_mp3_index,
+    ".ogg": build_ogg_index,
+    ".wav": build_wav_index,
+}
+
+
+def build_seek_index(path: Path | str) -> SeekIndex:
+    """Reads seek points of audio file; raises `SeekIndexError` if it isnt supported or cant be parsed"""
+    builder = INDEX_BUILDERS.get(os.path.splitext(path)[1].lower())
+    if builder is None:
+        raise SeekIndexError(f"Seeking in {path} is not supported")
+
+    try:
+        return builder(path)
+    except (OSError, struct.error) as e:
+        raise SeekIndexError(f"Cant read {path}: {e}")
+
+
+INDEX_TYPES: Dict[str, Type[SeekIndex]] = {
+    "mp3": FrameIndex,
+    "ogg": PageIndex,
+    "wav": SampleIndex,
+}
+
+
+class SeekIndexCache:
+    """
+    Keeps seek indexes of recently played songs in memory and every built index in SQLite database
+    at `db_path` (in memory by default), so index of a song is built once, not after every restart.
+    Entries are validated with file size and modification time.
+
+    Can be shared between threads; `get` builds missing index (reads the file),
+    `peek` only returns index that is already in memory.
+    """
+
+    MAX_ENTRIES = 32
+    SCHEMA_VERSION = 1
+
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, db_path: Path | str = ":memory:"
+    ) -> None:
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.max_entries = max_entries
+        self._indexes: OrderedDict[str, Tuple[int, int, SeekIndex]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.fspath(db_path), check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS seek_index")
+            self._conn.executescript(f"""
+                PRAGMA journal_mode = WAL;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+                CREATE TABLE IF NOT EXISTS seek_index (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    data BLOB NOT NULL
+                );
+                """)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    @staticmethod
+    def _stat(key: str) -> os.stat_result:
+        try:
+            return os.stat(key)
+        except OSError as e:
+            raise SeekIndexError(f"Cant read {key}: {e}")
+
+    def peek(self, path: Path | str) -> SeekIndex | None:
+        """Returns index of `path` if its in memory and file didnt change, never reads the file"""
+        key = os.fspath(path)
+        with self._lock:
+            entry = self._indexes.get(key)
+        if entry is None:
+            return None
+
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        if entry[:2] != (st.st_size, st.st_mtime_ns):
+            return None
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+        return entry[2]
+
+    def get(self, path: Path | str) -> SeekIndex:
+        """Returns index of `path` from memory or database, builds it if its not there"""
+        key = os.fspath(path)
+        st = self._stat(key)
+        version = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._indexes.get(key)
+            if entry is not None and entry[:2] == version:
+                self._indexes.move_to_end(key)
+                return entry[2]
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, format, data FROM seek_index WHERE path = ?",
+                (key,),
+            ).fetchone()
+
+        if row is not None and tuple(row[:2]) == version and row[2] in INDEX_TYPES:
+            index = INDEX_TYPES[row[2]].from_bytes(zlib.decompress(row[3]))
+        else:
+            index = build_seek_index(key)
+            data = zlib.compress(index.to_bytes())
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO seek_index VALUES (?, ?, ?, ?, ?)",
+                    (key, *version, index.format, data),
+                )
+                self._conn.commit()
+
+        with self._lock:
+            self._indexes[key] = (*version, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List
+
+from .playlist import PlayerError, Playlist, PlaylistItem
+
+WEIGHT_NONE = "none"
+# songs played fewer times are picked earlier
+WEIGHT_PLAY_COUNT = "play_count"
+# songs not played for a long time are picked earlier
+WEIGHT_RECENCY = "recency"
+WEIGHTINGS = (WEIGHT_NONE, WEIGHT_PLAY_COUNT, WEIGHT_RECENCY)
+
+
+class ShuffleEngine:
+    """
+    Picks random songs from playlist without repeats.
+
+    Songs are drawn from a "bag" holding every song that was not picked in current cycle;
+    when the bag is empty new cycle starts with all songs of the playlist.
+    Drawing swaps picked song with the last one in the bag, so every pick is O(1).
+
+    `weighting` makes some songs more likely to be picked first (see `WEIGHTINGS`) and `artist_spacing`
+    avoids picking song of any of the last `artist_spacing` picked artists. Both use rejection sampling
+    limited to `MAX_TRIES` draws, so they never make pick slower than O(1).
+
+    Engine subscribes to the playlist; songs added mid-cycle go to the bag, removed ones are taken out of it.
+    Play counts and times are kept per file path for as long as the app is running.
+    """
+
+    MAX_TRIES = 16
+    # songs played within this many seconds get lower weight with `WEIGHT_RECENCY`
+    RECENCY_WINDOW = 60 * 60
+    MIN_WEIGHT = 0.05
+
+    def __init__(
+        self,
+        playlist: Playlist | None = None,
+        weighting: str = WEIGHT_NONE,
+        artist_spacing: int = 0,
+        rng: random.Random | None = None,
+    ) -> None:
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting!r}")
+
+        self.weighting = weighting
+        self.rng = rng or random.Random()
+        self.playlist: Playlist | None = None
+
+        self._items: Dict[int, PlaylistItem] = {}
+        # number of times item is in playlist, only for items added more than once
+        self._copies: Dict[int, int] = {}
+        self._bag: List[int] = []
+        self._bag_slots: Dict[int, int] = {}  # item id -> index in `_bag`
+        self._recent_artists: Deque[str] = deque(maxlen=artist_spacing)
+
+        self._play_counts: Dict[str, int] = {}
+        self._last_played: Dict[str, float] = {}
+
+        if playlist is not None:
+            self.set_playlist(playlist)
+
+    @property
+    def artist_spacing(self) -> int:
+        return self._recent_artists.maxlen or 0
+
+    @artist_spacing.setter
+    def artist_spacing(self, value: int) -> None:
+        self._recent_artists = deque(self._recent_artists, maxlen=value)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def remaining(self) -> int:
+        """Number of songs that were not picked in current cycle"""
+        return len(self._bag)
+
+    def set_playlist(self, playlist: Playlist) -> None:
+        if self.playlist is not None:
+            self.playlist.unsubscribe(self)
+
+        self.playlist = playlist
+        self._items.clear()
+        self._copies.clear()
+        self._bag.clear()
+        self._bag_slots.clear()
+        for item in playlist:
+            self.on_add(item)
+        playlist.subscribe(self)
+
+    def on_add(self, item: PlaylistItem) -> None:
+        if item.id in self._items:
+            self._copies[item.id] = self._copies.get(item.id, 1) + 1
+            return
+
+        self._items[item.id] = item
+        self._put_in_bag(item.id)
+
+    def on_remove(self, item: PlaylistItem) -> None:
+        if item.id not in self._items:
+            return
+
+        copies = self._copies.pop(item.id, 1)
+        if copies > 1:
+            if copies > 2:
+                self._copies[item.id] = copies - 1
+            return
+
+        del self._items[item.id]
+        if item.id in self._bag_slots:
+            self._take_from_bag(self._bag_slots[item.id])
+
+    def _put_in_bag(self, item_id: int) -> None:
+        self._bag_slots[item_id] = len(self._bag)
+        self._bag.append(item_id)
+
+    def _take_from_bag(self, slot: int) -> int:
+        item_id = self._bag[slot]
+        last = self._bag.pop()
+        if last != item_id:
+            self._bag[slot] = last
+            self._bag_slots[last] = slot
+        del self._bag_slots[item_id]
+        return item_id
+
+    def put_back(self, item: PlaylistItem) -> None:
+        """Returns picked but not played song to the bag (e.g. when queue is cleared)"""
+        if item.id in self._items and item.id not in self._bag_slots:
+            self._put_in_bag(item.id)
+
+    def reset_cycle(self) -> None:
+        """Starts new cycle - every song in playlist can be picked again"""
+        self._bag = list(self._items)
+        self._bag_slots = {item_id: i for i, item_id in enumerate(self._bag)}
+
+    def weight(self, item: PlaylistItem) -> float:
+        """Returns value in (0, 1] range; pick is accepted with this probability"""
+        if self.weighting == WEIGHT_PLAY_COUNT:
+            return 1 / (1 + self._play_counts.get(item._path, 0))
+
+        if self.weighting == WEIGHT_RECENCY:
+            last_played = self._last_played.get(item._path)
+            if last_played is None:
+                return 1.0
+            age = time.time() - last_played
+            return max(self.MIN_WEIGHT, min(1.0, age / self.RECENCY_WINDOW))
+
+        return 1.0
+
+    def _spaced(self, item: PlaylistItem) -> bool:
+        artist = item.meta.artist
+        return artist is None or artist not in self._recent_artists
+
+    def pick(self) -> PlaylistItem:
+        """Returns random song that was not picked in current cycle; raises `PlayerError` if playlist is empty"""
+        if not self._items:
+            raise PlayerError("No items in playlist.")
+
+        if not self._bag:
+            self.reset_cycle()
+
+        # Fall back to the first song that keeps artist spacing if no draw was accepted
+        fallback = None
+        for _ in range(self.MAX_TRIES):
+            slot = self.rng.randrange(len(self._bag))
+            item = self._items[self._bag[slot]]
+            if not self._spaced(item):
+                continue
+            if fallback is None:
+                fallback = slot
+            if self.weighting == WEIGHT_NONE or self.rng.random() < self.weight(item):
+                break
+        else:
+            slot = fallback if fallback is not None else slot
+
+        item = self._items[self._take_from_bag(slot)]
+        if item.meta.artist is not None and self.artist_spacing:
+            self._recent_artists.append(item.meta.artist)
+        return item
+
+    def record_play(self, item: PlaylistItem) -> None:
+        """Updates play count and last play time used by weighting"""
+        self._play_counts[item._path] = self._play_counts.get(item._path, 0) + 1
+        self._last_played[item._path] = time.time()
+
+    def play_count(self, item: PlaylistItem) -> int:
+        return self._play_counts.get(item._path, 0)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import math
+from array import array
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .playlist import Playlist, PlaylistItem
+from .search import fold
+
+# Missing text values are sorted after every other value
+MISSING = "\U0010ffff"
+
+# Fields of sort key computed for every item, in this order
+SORT_FIELDS = ("title", "artist", "album", "duration", "added")
+# Sort order name -> fields compared one after another
+SORT_ORDERS: Dict[str, Tuple[str, ...]] = {
+    "title": ("title", "artist", "album"),
+    "artist": ("artist", "album", "title"),
+    "album": ("album", "title"),
+    "duration": ("duration", "artist", "title"),
+    "added": ("added",),
+}
+
+FieldKeys = Tuple[str, str, str, float, float]
+
+
+def _text_key(value: str | None) -> str:
+    return fold(value) if value else MISSING
+
+
+def field_keys(item: PlaylistItem) -> FieldKeys:
+    """Returns values of `SORT_FIELDS` of item; text is folded like search tokens, so case and accents are ignored"""
+    meta = item.meta
+    return (
+        _text_key(meta.title or meta.file_name),
+        _text_key(meta.artist),
+        _text_key(meta.album),
+        meta.playtime if meta.playtime else math.inf,
+        item._added,
+    )
+
+
+class SortedItems(Sequence[PlaylistItem]):
+    """
+    Items in order of a permutation of their ids, read from the end if `reverse`.
+    Like `SearchResults` items are looked up only when they are accessed.
+    """
+
+    def __init__(
+        self, ids: Sequence[int], items: Dict[int, PlaylistItem], reverse: bool = False
+    ) -> None:
+        self.ids = ids
+        self.reverse = reverse
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self.reverse:
+            index = len(self.ids) - 1 - index if index >= 0 else -1 - index
+        return self._items[self.ids[index]]
+
+    def __iter__(self) -> Iterator[PlaylistItem]:
+        ids = reversed(self.ids) if self.reverse else self.ids
+        return (self._items[item_id] for item_id in ids)
+
+
+class SortIndex:
+    """
+    Sorted orders of playlist items.
+
+    Sort keys of every item are computed once, when it is added to playlist (see `field_keys`).
+    Items sorted in each order are kept as array of ids that is built the first time the order is used;
+    descending order is the same array read backwards, so switching between orders doesnt sort anything again.
+
+    Index subscribes to `playlist`. Added and removed items are collected and merged into cached orders
+    next time one of them is used - each item is inserted/removed with binary search,
+    or order is sorted again if more than `RESORT_RATIO` of items changed (e.g. during import).
+    """
+
+    RESORT_RATIO = 0.1
+
+    def __init__(self, playlist: Playlist | None = None) -> None:
+        self._items: Dict[int, PlaylistItem] = {}
+        self._keys: Dict[int, FieldKeys] = {}
+        # number of times item is in playlist, only for items added more than once
+        self._copies: Dict[int, int] = {}
+        self._orders: Dict[str, array] = {}
+        # changes not merged into `_orders` yet; keys of removed items are needed to find them
+        self._added: Dict[int, None] = {}
+        self._removed: Dict[int, FieldKeys] = {}
+
+        if playlist is not None:
+            for item in playlist:
+                self.on_add(item)
+            playlist.subscribe(self)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def on_add(self, item: PlaylistItem) -> None:
+        if item.id in self._items:
+            self._copies[item.id] = self._copies.get(item.id, 1) + 1
+            return
+
+        self._items[item.id] = item
+        self._keys[item.id] = field_keys(item)
+        if self._orders:
+            self._added[item.id] = None
+
+    def on_remove(self, item: PlaylistItem) -> None:
+        if item.id not in self._items:
+            return
+
+        copies = self._copies.pop(item.id, 1)
+        if copies > 1:
+            if copies > 2:
+                self._copies[item.id] = copies - 1
+            return
+
+        del self._items[item.id]
+        keys = self._keys.pop(item.id)
+        if item.id in self._added:
+            del self._added[item.id]
+        elif self._orders:
+            self._removed[item.id] = keys
+
+    @staticmethod
+    def _key_func(
+        order: str, keys: Dict[int, FieldKeys]
+    ) -> Callable[[int], Tuple[object, int]]:
+        try:
+            fields = SORT_ORDERS[order]
+        except KeyError:
+            raise ValueError(f"Unknown sort order: {order!r}")
+
+        getter = itemgetter(*(SORT_FIELDS.index(field) for field in fields))
+        # id makes keys unique, items with equal fields stay in order they were created
+        return lambda item_id: (getter(keys[item_id]), item_id)
+
+    def sorted(self, order: str, reverse: bool = False) -> SortedItems:
+        """
+        Returns all items sorted in `order` (one of `SORT_ORDERS`), descending if `reverse`.
+        Like search results, returned items should not be used after playlist changes.
+        """
+        self._merge_changes()
+        ids = self._orders.get(order)
+        if ids is None:
+            key = self._key_func(order, self._keys)
+            ids = self._orders[order] = array("q", sorted(self._keys, key=key))
+        return SortedItems(ids, self._items, reverse)
+
+    def sort(
+        self, ids: Iterable[int], order: str, reverse: bool = False
+    ) -> SortedItems:
+        """Returns items with `ids` (e.g. search results) sorted in `order`"""
+        key = self._key_func(order, self._keys)
+        return SortedItems(sorted(ids, key=key), self._items, reverse)
+
+    def _merge_changes(self) -> None:
+        if not (self._added or self._removed):
+            return
+
+        if len(self._added) + len(self._removed) > len(self._items) * self.RESORT_RATIO:
+            self._orders.clear()
+        else:
+            keys = {**self._keys, **self._removed}
+            for order, ids in self._orders.items():
+                key = self._key_func(order, keys)
+                for item_id in self._removed:
+                    del ids[_bisect(ids, key(item_id), key)]
+                for item_id in self._added:
+                    ids.insert(_bisect(ids, key(item_id), key), item_id)
+
+        self._added.clear()
+        self._removed.clear()
+
+
+def _bisect(ids: array, value: Tuple[object, int], key: Callable) -> int:
+    """Returns position of first id in sorted `ids` which key is not lower than `value`"""
+    low, high = 0, len(ids)
+    while low < high:
+        middle = (low + high) // 2
+        if key(ids[middle]) < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
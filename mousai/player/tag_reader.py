@@ -0,0 +1,669 @@
+"""
+Metadata reader that reads only the parts of audio file it needs.
+
+- MP3: ID3v2 frames are read one by one, other frames and art images are skipped by their size
+  (art digest is computed from image size and its first and last bytes, see `art_digest_parts`).
+  Duration is taken from Xing/Info or VBRI header, or computed from bitrate of the first frame.
+- Ogg Vorbis: Vorbis comments are read from header pages, `METADATA_BLOCK_PICTURE` is skipped
+  the same way; duration is the last granule position, found in the last page of file.
+- WAV: `fmt ` and `LIST/INFO` chunks are read, `data` chunk is skipped - its size gives duration.
+
+Files it cant parse raise `TagError`, `AudioMetaData.from_file` reads MP3 files with eyed3 then.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from .duplicates import mp3_payload_range
+from .playlist import (
+    ART_DIGEST_SAMPLE,
+    ArtRef,
+    AudioMetaData,
+    PlayerError,
+    art_digest,
+    art_digest_parts,
+)
+from .seek_index import (
+    MP3_BITRATES_V1,
+    MP3_BITRATES_V2,
+    OGG_PAGE_HEADER,
+    VBRI_OFFSET,
+    is_info_frame,
+    mp3_frame,
+)
+
+# Reads are small and far apart, bigger buffer would read mostly bytes that are skipped
+READ_BUFFER_SIZE = 1024
+# MP3 frame is looked for in this many bytes after ID3 tag, in the bigger window if its not in the first one
+MP3_SYNC_WINDOWS = (4096, 64 * 1024)
+# Last Ogg page is looked for in this many bytes at the end of file (page is at most 65307 bytes)
+OGG_TAIL_WINDOWS = (8192, 65536 + 1024)
+# Mime type and description of picture are expected to fit in this many bytes at the start of picture block
+PICTURE_HEADER_SIZE = 4096
+# Comments and RIFF chunks longer than this are skipped without reading them
+MAX_TEXT_SIZE = 64 * 1024
+
+ID3V1_GENRES = (
+    "Blues|Classic Rock|Country|Dance|Disco|Funk|Grunge|Hip-Hop|Jazz|Metal|"
+    "New Age|Oldies|Other|Pop|R&B|Rap|Reggae|Rock|Techno|Industrial|"
+    "Alternative|Ska|Death Metal|Pranks|Soundtrack|Euro-Techno|Ambient|"
+    "Trip-Hop|Vocal|Jazz+Funk|Fusion|Trance|Classical|Instrumental|Acid|House|"
+    "Game|Sound Clip|Gospel|Noise|AlternRock|Bass|Soul|Punk|Space|Meditative|"
+    "Instrumental Pop|Instrumental Rock|Ethnic|Gothic|Darkwave|"
+    "Techno-Industrial|Electronic|Pop-Folk|Eurodance|Dream|Southern Rock|"
+    "Comedy|Cult|Gangsta Rap|Top 40|Christian Rap|Pop / Funk|Jungle|"
+    "Native American|Cabaret|New Wave|Psychedelic|Rave|Showtunes|Trailer|"
+    "Lo-Fi|Tribal|Acid Punk|Acid Jazz|Polka|Retro|Musical|Rock & Roll|"
+    "Hard Rock|Folk|Folk-Rock|National Folk|Swing|Fast-Fusion|Bebob|Latin|"
+    "Revival|Celtic|Bluegrass|Avantgarde|Gothic Rock|Progressive Rock|"
+    "Psychedelic Rock|Symphonic Rock|Slow Rock|Big Band|Chorus|Easy Listening|"
+    "Acoustic|Humour|Speech|Chanson|Opera|Chamber Music|Sonata|Symphony|"
+    "Booty Bass|Primus|Porn Groove|Satire|Slow Jam|Club|Tango|Samba|Folklore|"
+    "Ballad|Power Ballad|Rhythmic Soul|Freestyle|Duet|Punk Rock|Drum Solo|"
+    "A Cappella|Euro-House|Dance Hall|Goa|Drum & Bass|Club-House|Hardcore|"
+    "Terror|Indie|BritPop|Afro-Punk|Polsk Punk|Beat|Christian Gangsta Rap|"
+    "Heavy Metal|Black Metal|Crossover|Contemporary Christian|Christian Rock|"
+    "Merengue|Salsa|Thrash Metal|Anime|JPop|Synthpop|Abstract|Art Rock|"
+    "Baroque|Bhangra|Big Beat|Breakbeat|Chillout|Downtempo|Dub|EBM|Eclectic|"
+    "Electro|Electroclash|Emo|Experimental|Garage|Global|IDM|Illbient|"
+    "Industro-Goth|Jam Band|Krautrock|Leftfield|Lounge|Math Rock|New Romantic|"
+    "Nu-Breakz|Post-Punk|Post-Rock|Psytrance|Shoegaze|Space Rock|Trop Rock|"
+    "World Music|Neoclassical|Audiobook|Audio Theatre|Neue Deutsche Welle|"
+    "Podcast|Indie Rock|G-Funk|Dubstep|Garage Rock|Psybient"
+).split("|")
+
+# ID3v2.3/2.4 and v2.2 frame id -> field; dates are in order of preference
+ID3_FIELDS = {
+    "TPE1": "artist",
+    "TALB": "album",
+    "TIT2": "title",
+    "TCON": "genre",
+    "TDOR": "date0",
+    "TORY": "date0",
+    "TDRL": "date1",
+    "TDRC": "date2",
+    "TYER": "date2",
+    "TP1": "artist",
+    "TAL": "album",
+    "TT2": "title",
+    "TCO": "genre",
+    "TOR": "date0",
+    "TYE": "date2",
+}
+ID3_ART_FRAMES = ("APIC", "PIC")
+ID3_ENCODINGS = ("latin-1", "utf-16", "utf-16-be", "utf-8")
+
+VORBIS_FIELDS = {
+    "ARTIST": "artist",
+    "ALBUM": "album",
+    "TITLE": "title",
+    "GENRE": "genre",
+    "DATE": "date2",
+    "YEAR": "date2",
+}
+VORBIS_PICTURE = "METADATA_BLOCK_PICTURE"
+
+RIFF_INFO_FIELDS = {
+    b"IART": "artist",
+    b"IPRD": "album",
+    b"INAM": "title",
+    b"IGNR": "genre",
+    b"ICRD": "date2",
+}
+
+
+class TagError(PlayerError):
+    pass
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise TagError("Unexpected end of file")
+    return data
+
+
+def _image_digest(f: BinaryIO, start: int, size: int) -> str:
+    """Digest of image stored in file at `start`, only its first and last bytes are read"""
+    f.seek(start)
+    if size <= 2 * ART_DIGEST_SAMPLE:
+        return art_digest(_read_exact(f, size))
+
+    head = _read_exact(f, ART_DIGEST_SAMPLE)
+    f.seek(start + size - ART_DIGEST_SAMPLE)
+    return art_digest_parts(size, head, _read_exact(f, ART_DIGEST_SAMPLE))
+
+
+class _Fields:
+    """Collects text fields, first value of each field is kept"""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.art: Optional[str] = None
+
+    def set(self, field: str, value: Optional[str]) -> None:
+        if value and field not in self.values:
+            self.values[field] = value
+
+    def to_meta(self, path: Path, playtime: float) -> AudioMetaData:
+        get = self.values.get
+        date = get("date0") or get("date1") or get("date2")
+        art = ArtRef(str(path), self.art) if self.art is not None else None
+        return AudioMetaData(
+            path.name,
+            playtime,
+            get("artist"),
+            get("album"),
+            get("title"),
+            get("genre"),
+            date,
+            art,
+        )
+
+
+# ID3
+
+
+def _id3_text(data: bytes) -> Optional[str]:
+    if not data or data[0] >= len(ID3_ENCODINGS):
+        return None
+
+    text = data[1:].decode(ID3_ENCODINGS[data[0]], "replace")
+    # v2.4 frames can have more values separated with null, first one is used
+    return text.split("\0", 1)[0].strip() or None
+
+
+def _id3_genre(text: str) -> str:
+    """Genre can be name, ID3v1 genre number or both, e.g. "(17)Rock" """
+    number = None
+    if text.startswith("(") and ")" in text:
+        number, text = text[1 : text.index(")")], text[text.index(")") + 1 :]
+    elif text.isdigit():
+        number, text = text, ""
+
+    if text:
+        return text
+    if number is not None and number.isdigit() and int(number) < len(ID3V1_GENRES):
+        return ID3V1_GENRES[int(number)]
+    return {"RX": "Remix", "CR": "Cover"}.get(number or "", number or "")
+
+
+def _id3_picture_start(data: bytes, v22: bool) -> int:
+    """Returns offset of image data in (beginning of) APIC/PIC frame `data`"""
+    encoding = data[0]
+    if v22:
+        offset = 1 + 3 + 1  # encoding, image format, picture type
+    else:
+        mime_end = data.find(b"\0", 1)
+        if mime_end < 0:
+            raise TagError("Picture frame header is too long")
+        offset = mime_end + 2  # picture type follows mime
+
+    # description is terminated with null in its encoding
+    if encoding in (1, 2):
+        end = offset
+        while True:
+            end = data.find(b"\0\0", end)
+            if end < 0 or (end - offset) % 2 == 0:
+                break
+            end += 1
+        terminator = 2
+    else:
+        end = data.find(b"\0", offset)
+        terminator = 1
+    if end < 0:
+        raise TagError("Picture frame header is too long")
+    return end + terminator
+
+
+class _ID3Frame:
+    __slots__ = ("id", "start", "size")
+
+    def __init__(self, frame_id: str, start: int, size: int) -> None:
+        self.id = frame_id
+        self.start = start
+        self.size = size
+
+
+def _id3_frames(f: BinaryIO) -> Tuple[List[_ID3Frame], int, bool]:
+    """
+    Reads ID3v2 tag header and headers of its frames (frame content is not read);
+    returns frames, offset where tag ends and whether its v2.2 tag.
+    """
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return [], 0, False
+
+    version, flags = header[3], header[5]
+    if version not in (2, 3, 4):
+        raise TagError(f"Unsupported ID3 version 2.{version}")
+    if flags & 0x80 and version < 4:
+        # whole tag is unsynchronised, frames cant be read in place
+        raise TagError("Unsynchronised ID3 tag")
+
+    end = 10 + _syncsafe(header[6:10])
+    offset = 10
+    if flags & 0x40 and version > 2:
+        extended = _read_exact(f, 4)
+        offset += (
+            _syncsafe(extended) if version == 4 else 4 + int.from_bytes(extended, "big")
+        )
+
+    v22 = version == 2
+    header_size = 6 if v22 else 10
+    frames = []
+    while offset + header_size <= end:
+        f.seek(offset)
+        frame_header = _read_exact(f, header_size)
+        if frame_header[0] == 0:  # padding
+            break
+
+        if v22:
+            frame_id = frame_header[:3]
+            size = int.from_bytes(frame_header[3:6], "big")
+        else:
+            frame_id = frame_header[:4]
+            if version == 4:
+                size = _syncsafe(frame_header[4:8])
+            else:
+                size = int.from_bytes(frame_header[4:8], "big")
+            frame_flags = frame_header[9]
+
+        start = offset + header_size
+        offset = start + size
+        if version == 4:
+            if frame_flags & 0x0E:  # compressed, encrypted or unsynchronised
+                continue
+            if frame_flags & 0x01:  # data length indicator
+                start, size = start + 4, size - 4
+        elif version == 3:
+            if frame_flags & 0xC0:  # compressed or encrypted
+                continue
+            if frame_flags & 0x20:  # grouping identity
+                start, size = start + 1, size - 1
+
+        if size > 0:
+            frames.append(_ID3Frame(frame_id.decode("latin-1"), start, size))
+
+    if flags & 0x10 and version == 4:  # footer
+        end += 10
+    return frames, end, v22
+
+
+def _read_id3(f: BinaryIO, fields: _Fields) -> int:
+    """Reads ID3v2 tag into `fields`, returns offset where tag ends"""
+    frames, end, v22 = _id3_frames(f)
+    for frame in frames:
+        field = ID3_FIELDS.get(frame.id)
+        if field is not None and frame.size <= MAX_TEXT_SIZE:
+            f.seek(frame.start)
+            text = _id3_text(_read_exact(f, frame.size))
+            if text and field == "genre":
+                text = _id3_genre(text)
+            fields.set(field, text)
+        elif frame.id in ID3_ART_FRAMES and fields.art is None:
+            f.seek(frame.start)
+            image = _id3_picture_start(
+                f.read(min(frame.size, PICTURE_HEADER_SIZE)), v22
+            )
+            fields.art = _image_digest(f, frame.start + image, frame.size - image)
+    return end
+
+
+def _mp3_bitrate(header: bytes) -> int:
+    version = (header[1] >> 3) & 3
+    bitrates = MP3_BITRATES_V1 if version == 3 else MP3_BITRATES_V2
+    return bitrates[header[2] >> 4] * 1000
+
+
+def _find_mp3_frame(data: bytes) -> Tuple[int, Optional[Tuple[int, int, int]]]:
+    offset = data.find(b"\xff")
+    while offset >= 0:
+        frame = mp3_frame(data, offset)
+        # next frame has to be valid too, so sync bits in garbage are not taken for a frame
+        if frame is not None and (
+            offset + frame[0] + 4 > len(data)
+            or mp3_frame(data, offset + frame[0]) is not None
+        ):
+            return offset, frame
+        offset = data.find(b"\xff", offset + 1)
+    return -1, None
+
+
+def _mp3_duration(f: BinaryIO, start: int, size: int) -> float:
+    """Duration of MP3 frames that follow ID3 tag at `start`"""
+    for window in MP3_SYNC_WINDOWS:
+        f.seek(start)
+        data = f.read(window)
+        offset, frame = _find_mp3_frame(data)
+        if frame is not None:
+            break
+    else:
+        raise TagError("No MP3 frames found")
+
+    length, samples, sample_rate = frame
+    if is_info_frame(data, offset):
+        version = (data[offset + 1] >> 3) & 3
+        mono = (data[offset + 3] >> 6) & 3 == 3
+        if version == 3:
+            xing = offset + (21 if mono else 36)
+        else:
+            xing = offset + (13 if mono else 21)
+        if data[xing : xing + 4] in (b"Xing", b"Info"):
+            (flags,) = struct.unpack_from(">I", data, xing + 4)
+            if flags & 1:  # frame count is present
+                (frames,) = struct.unpack_from(">I", data, xing + 8)
+                return frames * samples / sample_rate
+        else:
+            vbri = offset + VBRI_OFFSET
+            (frames,) = struct.unpack_from(">I", data, vbri + 14)
+            return frames * samples / sample_rate
+        # Info frame without frame count, it doesnt count as audio
+        offset += length
+
+    # constant bitrate, tags at the end of file are not audio
+    f.seek(0)
+    _, end = mp3_payload_range(f, size)
+    bitrate = _mp3_bitrate(data[offset : offset + 4])
+    return max(0, end - start - offset) * 8 / bitrate
+
+
+def read_mp3(path: Path) -> AudioMetaData:
+    fields = _Fields()
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        size = os.fstat(f.fileno()).st_size
+        audio_start = _read_id3(f, fields)
+        playtime = _mp3_duration(f, audio_start, size)
+    return fields.to_meta(path, playtime)
+
+
+def _read_id3_art(f: BinaryIO) -> Optional[bytes]:
+    frames, _, v22 = _id3_frames(f)
+    for frame in frames:
+        if frame.id in ID3_ART_FRAMES:
+            f.seek(frame.start)
+            data = _read_exact(f, frame.size)
+            return data[_id3_picture_start(data, v22) :]
+    return None
+
+
+# Ogg Vorbis
+
+
+class _OggStream:
+    """
+    Reads bytes of packets of the first logical stream in Ogg file, page headers are left out.
+    Bytes can be skipped without reading them - pages are found from their headers.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._f = f
+        self.serial: Optional[int] = None
+        # bytes left in current page body
+        self._left = 0
+
+    def read_page(self) -> bytes:
+        """Reads next page of the stream whole, returns its body"""
+        self._next_page()
+        return self.read(self._left)
+
+    def _next_page(self) -> None:
+        while True:
+            header = _read_exact(self._f, OGG_PAGE_HEADER.size)
+            capture, _, _, _, serial, _, _, segments = OGG_PAGE_HEADER.unpack(header)
+            if capture != b"OggS":
+                raise TagError("Damaged Ogg page")
+
+            size = sum(_read_exact(self._f, segments))
+            if self.serial is None:
+                self.serial = serial
+            if serial == self.serial:
+                self._left = size
+                return
+            # page of other multiplexed stream
+            self._f.seek(size, os.SEEK_CUR)
+
+    def read(self, size: int) -> bytes:
+        chunks = []
+        while size > 0:
+            if not self._left:
+                self._next_page()
+            chunk = _read_exact(self._f, min(size, self._left))
+            self._left -= len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def skip(self, size: int) -> None:
+        while size > 0:
+            if not self._left:
+                self._next_page()
+            step = min(size, self._left)
+            self._f.seek(step, os.SEEK_CUR)
+            self._left -= step
+            size -= step
+
+    def read_uint(self) -> int:
+        return int.from_bytes(self.read(4), "little")
+
+
+def _picture_start(block: bytes) -> Tuple[int, int]:
+    """Returns offset and size of image in FLAC picture block (its beginning is enough)"""
+    try:
+        (mime_length,) = struct.unpack_from(">I", block, 4)
+        (description_length,) = struct.unpack_from(">I", block, 8 + mime_length)
+        offset = 12 + mime_length + description_length + 16
+        (size,) = struct.unpack_from(">I", block, offset)
+    except struct.error:
+        raise TagError("Picture header is too long")
+    return offset + 4, size
+
+
+def _vorbis_picture_digest(stream: _OggStream, length: int) -> str:
+    """
+    Digest of image in base64 encoded picture block of `length` characters.
+    Every 4 characters are 3 bytes, so the end of image is decoded from the last characters alone.
+    """
+    head_chars = min(length, (PICTURE_HEADER_SIZE + ART_DIGEST_SAMPLE) // 3 * 4)
+    head = base64.b64decode(stream.read(head_chars))
+    start, size = _picture_start(head)
+    tail_start = start + size - ART_DIGEST_SAMPLE
+    tail_chars = tail_start // 3 * 4
+    if size <= 2 * ART_DIGEST_SAMPLE or tail_chars < head_chars:
+        block = head + base64.b64decode(stream.read(length - head_chars))
+        return art_digest(block[start : start + size])
+
+    stream.skip(tail_chars - head_chars)
+    tail = base64.b64decode(stream.read(length - tail_chars))
+    return art_digest_parts(
+        size,
+        head[start : start + ART_DIGEST_SAMPLE],
+        tail[tail_start % 3 : tail_start % 3 + ART_DIGEST_SAMPLE],
+    )
+
+
+def _vorbis_comments(
+    stream: _OggStream, on_picture: Callable[[int], bool], fields: _Fields
+) -> None:
+    """
+    Reads Vorbis comment header into `fields`; `on_picture(length)` is called for picture comments,
+    it reads (or skips) value of the comment and returns `True` if rest of comments is not needed.
+    """
+    if stream.read(7) != b"\x03vorbis":
+        raise TagError("No Vorbis comment header")
+
+    stream.skip(stream.read_uint())  # vendor
+    for _ in range(stream.read_uint()):
+        length = stream.read_uint()
+        # name is read first, so pictures are not decoded and long comments can be skipped
+        prefix = stream.read(min(length, len(VORBIS_PICTURE) + 1))
+        length -= len(prefix)
+        if prefix.upper() == VORBIS_PICTURE.encode() + b"=":
+            if on_picture(length):
+                return
+        elif length + len(prefix) <= MAX_TEXT_SIZE:
+            comment = (prefix + stream.read(length)).decode("utf-8", "replace")
+            name, _, value = comment.partition("=")
+            field = VORBIS_FIELDS.get(name.upper())
+            if field is not None:
+                fields.set(field, value.strip())
+        else:
+            stream.skip(length)
+
+
+def _ogg_sample_rate(stream: _OggStream) -> int:
+    identification = stream.read_page()
+    if identification[:7] != b"\x01vorbis" or len(identification) < 16:
+        raise TagError("Not Ogg Vorbis file")
+    (sample_rate,) = struct.unpack_from("<I", identification, 12)
+    return sample_rate
+
+
+def _ogg_duration(f: BinaryIO, size: int, serial: int, sample_rate: int) -> float:
+    """Granule position of the last page of stream is number of its samples"""
+    for window in OGG_TAIL_WINDOWS:
+        f.seek(max(0, size - window))
+        data = f.read()
+        offset = data.rfind(b"OggS")
+        while offset >= 0:
+            if offset + OGG_PAGE_HEADER.size <= len(data):
+                _, _, _, granule, page_serial, *_ = OGG_PAGE_HEADER.unpack_from(
+                    data, offset
+                )
+                if page_serial == serial and granule >= 0:
+                    return granule / sample_rate if sample_rate else 0.0
+            offset = data.rfind(b"OggS", 0, offset)
+        if window >= size:
+            break
+    return 0.0
+
+
+def read_ogg(path: Path) -> AudioMetaData:
+    fields = _Fields()
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        size = os.fstat(f.fileno()).st_size
+        stream = _OggStream(f)
+        sample_rate = _ogg_sample_rate(stream)
+
+        def on_picture(length: int) -> bool:
+            if fields.art is None:
+                fields.art = _vorbis_picture_digest(stream, length)
+            else:
+                stream.skip(length)
+            # comments after picture are read too
+            return False
+
+        _vorbis_comments(stream, on_picture, fields)
+        playtime = _ogg_duration(f, size, stream.serial, sample_rate)  # type: ignore
+    return fields.to_meta(path, playtime)
+
+
+def _read_ogg_art(f: BinaryIO) -> Optional[bytes]:
+    stream = _OggStream(f)
+    _ogg_sample_rate(stream)
+    art: List[bytes] = []
+
+    def on_picture(length: int) -> bool:
+        block = base64.b64decode(stream.read(length))
+        start, size = _picture_start(block)
+        art.append(block[start : start + size])
+        return True
+
+    _vorbis_comments(stream, on_picture, _Fields())
+    return art[0] if art else None
+
+
+# WAV
+
+
+def _riff_text(data: bytes) -> Optional[str]:
+    data = data.split(b"\0", 1)[0]
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    return text.strip() or None
+
+
+def read_wav(path: Path) -> AudioMetaData:
+    fields = _Fields()
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise TagError("Not WAV file")
+
+        byte_rate = 0
+        data_size = 0
+        offset = 12
+        while offset + 8 <= size:
+            f.seek(offset)
+            chunk_id, chunk_size = struct.unpack("<4sI", _read_exact(f, 8))
+            if chunk_id == b"fmt " and chunk_size >= 16:
+                _, _, sample_rate, _, block_align = struct.unpack(
+                    "<HHIIH", _read_exact(f, 14)
+                )
+                byte_rate = sample_rate * block_align
+            elif chunk_id == b"data":
+                # size of data written while streaming can be left unset
+                data_size = min(chunk_size, size - offset - 8)
+            elif chunk_id == b"LIST" and chunk_size <= MAX_TEXT_SIZE:
+                info = f.read(chunk_size)
+                if info[:4] == b"INFO":
+                    position = 4
+                    while position + 8 <= len(info):
+                        sub_id, sub_size = struct.unpack_from("<4sI", info, position)
+                        value = info[position + 8 : position + 8 + sub_size]
+                        if sub_id in RIFF_INFO_FIELDS:
+                            fields.set(RIFF_INFO_FIELDS[sub_id], _riff_text(value))
+                        position += 8 + sub_size + (sub_size & 1)
+            offset += 8 + chunk_size + (chunk_size & 1)
+
+    if not byte_rate:
+        raise TagError("No format chunk")
+    return fields.to_meta(path, data_size / byte_rate)
+
+
+READERS: Dict[str, Callable[[Path], AudioMetaData]] = {
+    ".mp3": read_mp3,
+    ".ogg": read_ogg,
+    ".wav": read_wav,
+}
+
+
+def read_metadata(path: Path) -> AudioMetaData:
+    """
+    Reads tags and duration of audio file; raises `OSError` if file cant be read
+    and `TagError` if its format is not supported or file cant be parsed.
+    """
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise TagError(f"{path.suffix!r} files are not supported")
+
+    try:
+        return reader(path)
+    except (struct.error, IndexError, ValueError) as e:
+        raise TagError(f"Cant parse {path.name}: {e}")
+
+
+def read_art(path: Path | str) -> Optional[bytes]:
+    """Reads art image embedded in MP3 (first ID3 picture) or Ogg Vorbis file; WAV files have no art"""
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+            if suffix == ".mp3":
+                return _read_id3_art(f)
+            if suffix == ".ogg":
+                return _read_ogg_art(f)
+    except (struct.error, IndexError, ValueError) as e:
+        raise TagError(f"Cant read art of {path}: {e}")
+    return None
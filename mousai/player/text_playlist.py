@@ -0,0 +1,312 @@
+"""
+M3U/M3U8 and PLS playlists, to exchange playlists with other players.
+
+Playlists are read line by line and entries are yielded as they are parsed, so huge playlists
+are never loaded into memory at once; relative paths are resolved against playlist directory.
+Title and duration stored in playlist (`#EXTINF`, `TitleN`/`LengthN`) are kept with entry,
+so songs can be added without parsing their files (see `playlist_items`).
+Saving streams items to disk the same way as `save_playlist`.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import unquote, urlparse
+
+from .importer import is_supported_audio_file
+from .playlist import AudioMetaData, PlaylistItem
+from .playlist_file import PlaylistFileError
+
+if TYPE_CHECKING:
+    from .metadata_cache import MetadataCache
+
+M3U_EXTENSIONS = (".m3u", ".m3u8")
+PLS_EXTENSION = ".pls"
+TEXT_PLAYLIST_EXTENSIONS = (*M3U_EXTENSIONS, PLS_EXTENSION)
+
+# Entries of PLS file can be in any order, not finished ones are kept until this many are waiting
+PLS_MAX_PENDING = 1000
+
+
+class PlaylistEntry(NamedTuple):
+    path: Path
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    # seconds, `None` if unknown
+    duration: Optional[float] = None
+
+
+def _open(path: Path, mode: str = "r") -> IO[str]:
+    # .m3u files have no declared encoding; undecodable bytes are kept as they are (like in file names)
+    encoding = "utf-8-sig" if mode == "r" else "utf-8"
+    return open(path, mode, encoding=encoding, errors="surrogateescape")
+
+
+def _resolve(location: str, base: str) -> Optional[Path]:
+    """Returns path of playlist entry; `None` for remote streams"""
+    if "://" in location:
+        url = urlparse(location)
+        if url.scheme != "file":
+            return None
+        location = unquote(url.path)
+        # file:///C:/Music/song.mp3
+        if len(location) > 2 and location[0] == "/" and location[2] == ":":
+            location = location[1:]
+
+    if os.sep == "/":
+        # playlists made on Windows
+        location = location.replace("\\", "/")
+    # joined as strings, creating two `Path`s for every entry makes reading huge playlists much slower
+    if not os.path.isabs(location):
+        location = os.path.join(base, location)
+    return Path(location)
+
+
+def _parse_title(value: str) -> Tuple[Optional[str], Optional[str]]:
+    """Splits "Artist - Title" used by most players; returns (title, artist)"""
+    value = value.strip()
+    if not value:
+        return None, None
+
+    artist, sep, title = value.partition(" - ")
+    if sep and artist and title:
+        return title.strip(), artist.strip()
+    return value, None
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    try:
+        duration = float(value)
+    except ValueError:
+        return None
+    # -1 means unknown length (e.g. streams)
+    return duration if duration > 0 else None
+
+
+def read_m3u(path: Path) -> Iterator[PlaylistEntry]:
+    """Yields entries of M3U/M3U8 playlist; `#EXTINF` info applies to the entry after it"""
+    base = os.fspath(path.parent)
+    title = artist = duration = None
+
+    with _open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith("#"):
+                if line.startswith("#EXTINF:"):
+                    length, _, name = line[len("#EXTINF:") :].partition(",")
+                    # attributes like tvg-id="..." can follow duration
+                    duration = _parse_duration(length.split(" ", 1)[0])
+                    title, artist = _parse_title(name)
+                continue
+
+            entry_path = _resolve(line, base)
+            if entry_path is not None:
+                yield PlaylistEntry(entry_path, title, artist, duration)
+            title = artist = duration = None
+
+
+def _read_header(f: IO[str]) -> str:
+    return next((line.strip() for line in f if line.strip()), "")
+
+
+def read_pls(path: Path) -> Iterator[PlaylistEntry]:
+    """
+    Returns iterator of entries of PLS playlist, raises `PlaylistFileError` right away if its not one.
+
+    `FileN`, `TitleN` and `LengthN` keys of one entry are usually next to each other, entry is yielded
+    once it has all of them (or when `PLS_MAX_PENDING` entries are waiting, or at the end of file).
+    """
+    with _open(path) as f:
+        if _read_header(f).lower() != "[playlist]":
+            raise PlaylistFileError(f"{path} is not a PLS playlist")
+    return _read_pls_entries(path)
+
+
+def _read_pls_entries(path: Path) -> Iterator[PlaylistEntry]:
+    base = os.fspath(path.parent)
+    # entry number -> its keys, in order entries appeared
+    pending: OrderedDict[int, Dict[str, str]] = OrderedDict()
+
+    def finished(fields: Dict[str, str]) -> bool:
+        return len(fields) == 3 or len(pending) > PLS_MAX_PENDING
+
+    def entry(fields: Dict[str, str]) -> Optional[PlaylistEntry]:
+        if "file" not in fields:
+            return None
+        entry_path = _resolve(fields["file"], base)
+        if entry_path is None:
+            return None
+
+        title, artist = _parse_title(fields.get("title", ""))
+        return PlaylistEntry(
+            entry_path, title, artist, _parse_duration(fields.get("length", ""))
+        )
+
+    with _open(path) as f:
+        _read_header(f)
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            name = key.rstrip("0123456789").lower()
+            number = key[len(name) :]
+            if not sep or not number or name not in ("file", "title", "length"):
+                continue
+
+            pending.setdefault(int(number), {})[name] = value.strip()
+            while pending and finished(next(iter(pending.values()))):
+                item = entry(pending.popitem(last=False)[1])
+                if item is not None:
+                    yield item
+
+    for fields in pending.values():
+        item = entry(fields)
+        if item is not None:
+            yield item
+
+
+def read_text_playlist(path: Path) -> Iterator[PlaylistEntry]:
+    """Reads M3U/M3U8 or PLS playlist depending on file extension"""
+    suffix = path.suffix.lower()
+    if suffix in M3U_EXTENSIONS:
+        return read_m3u(path)
+    if suffix == PLS_EXTENSION:
+        return read_pls(path)
+    raise PlaylistFileError(f"{path.suffix!r} playlists are not supported")
+
+
+def count_entries(path: Path) -> int:
+    """
+    Counts entries of playlist without keeping them, used as import total.
+    Remote streams are counted too, so it can be a bit more than number of imported songs.
+    """
+    if path.suffix.lower() == PLS_EXTENSION:
+        with _open(path) as f:
+            return sum(1 for line in f if line[:4].lower() == "file")
+
+    with _open(path) as f:
+        return sum(1 for line in f if line.strip() and not line.startswith("#"))
+
+
+def playlist_items(
+    entries: Iterable[PlaylistEntry], cache: MetadataCache | None = None
+) -> Iterator[Union[Path, PlaylistItem]]:
+    """
+    Turns playlist entries into input of `LibraryImporter`: entries with title and duration become
+    `PlaylistItem`s right away (metadata from `cache` is used when its there, it has album, art etc.),
+    other entries are passed as paths to be parsed.
+    """
+    for entry in entries:
+        if entry.title is None or entry.duration is None:
+            yield entry.path
+            continue
+        if not is_supported_audio_file(entry.path.name):
+            # importer reports it as not supported
+            yield entry.path
+            continue
+
+        meta = None
+        if cache is not None:
+            try:
+                meta = cache.get(entry.path)
+            except OSError:
+                yield entry.path
+                continue
+
+        if meta is None:
+            meta = AudioMetaData(
+                entry.path.name, entry.duration, entry.artist, title=entry.title
+            )
+        yield PlaylistItem(entry.path, meta)
+
+
+def _entry_location(item: PlaylistItem, base: Path | None) -> str:
+    if base is None:
+        return item._path
+    try:
+        location = os.path.relpath(item._path, base)
+    except ValueError:  # other drive on Windows
+        return item._path
+    # only songs in playlist directory are stored relative to it
+    return item._path if location.startswith(os.pardir) else location
+
+
+def _entry_title(item: PlaylistItem) -> str:
+    meta = item.meta
+    title = meta.title or Path(meta.file_name).stem
+    return f"{meta.artist} - {title}" if meta.artist else title
+
+
+def _save_stream(path: Path, write: Callable[[IO[str]], int]) -> int:
+    """Writes playlist with `write` to temporary file first and replaces `path` when its complete"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with _open(tmp_path, "w") as f:
+        count = write(f)
+    os.replace(tmp_path, path)
+    return count
+
+
+def save_m3u(items: Iterable[PlaylistItem], path: Path, relative: bool = True) -> int:
+    """
+    Writes extended M3U playlist and returns number of saved items.
+    With `relative` songs in playlist directory are stored with paths relative to it, so both can be moved together.
+    """
+    base = path.parent.resolve() if relative else None
+
+    def write(f: IO[str]) -> int:
+        count = 0
+        f.write("#EXTM3U\n")
+        for item in items:
+            duration = round(item.meta.playtime) if item.meta.playtime else -1
+            f.write(f"#EXTINF:{duration},{_entry_title(item)}\n")
+            f.write(_entry_location(item, base) + "\n")
+            count += 1
+        return count
+
+    return _save_stream(path, write)
+
+
+def save_pls(items: Iterable[PlaylistItem], path: Path, relative: bool = True) -> int:
+    """Writes PLS playlist and returns number of saved items; see `save_m3u`"""
+    base = path.parent.resolve() if relative else None
+
+    def write(f: IO[str]) -> int:
+        count = 0
+        f.write("[playlist]\n")
+        for count, item in enumerate(items, start=1):
+            duration = round(item.meta.playtime) if item.meta.playtime else -1
+            f.write(f"File{count}={_entry_location(item, base)}\n")
+            f.write(f"Title{count}={_entry_title(item)}\n")
+            f.write(f"Length{count}={duration}\n")
+        # number of entries is known only at the end, players accept it there
+        f.write(f"NumberOfEntries={count}\nVersion=2\n")
+        return count
+
+    return _save_stream(path, write)
+
+
+def save_text_playlist(
+    items: Iterable[PlaylistItem], path: Path, relative: bool = True
+) -> int:
+    """Saves M3U/M3U8 or PLS playlist depending on file extension"""
+    suffix = path.suffix.lower()
+    if suffix in M3U_EXTENSIONS:
+        return save_m3u(items, path, relative)
+    if suffix == PLS_EXTENSION:
+        return save_pls(items, path, relative)
+    raise PlaylistFileError(f"{path.suffix!r} playlists are not supported")
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional, Set
+
+from .art_store import ArtStore
+from .playlist import ArtRef
+
+RenderFunc = Callable[[bytes], bytes]
+
+
+class ThumbnailStats(NamedTuple):
+    memory_hits: int
+    disk_hits: int
+    renders: int
+
+
+class ThumbnailCache:
+    """
+    Two-level cache of rendered art cover thumbnails.
+
+    Thumbnails are kept in in-memory LRU and as PNG files in `cache_dir` (if passed);
+    both are keyed by digest of source image so tracks sharing a cover share the thumbnail.
+    `render` turns source image into thumbnail, e.g. `utils.resize_img`.
+
+    `prefetch` renders thumbnails in background worker thread so they are ready before they are displayed.
+    """
+
+    MAX_ITEMS = 64
+
+    def __init__(
+        self,
+        art_store: ArtStore,
+        render: RenderFunc,
+        cache_dir: Path | None = None,
+        max_items: int = MAX_ITEMS,
+    ) -> None:
+        self.art_store = art_store
+        self.render = render
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._renders = 0
+
+        self._pending: Set[str] = set()
+        self._jobs: queue.Queue[Optional[ArtRef]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def stats(self) -> ThumbnailStats:
+        return ThumbnailStats(self._memory_hits, self._disk_hits, self._renders)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._memory
+
+    def _disk_path(self, digest: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{digest}.png"
+
+    def _remember(self, digest: str, thumbnail: bytes) -> None:
+        with self._lock:
+            self._memory[digest] = thumbnail
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, ref: ArtRef | None) -> bytes | None:
+        """Returns thumbnail of `ref` art; `None` if there is no art"""
+        if ref is None:
+            return None
+
+        with self._lock:
+            thumbnail = self._memory.get(ref.digest)
+            if thumbnail is not None:
+                self._memory.move_to_end(ref.digest)
+                self._memory_hits += 1
+                return thumbnail
+
+        disk_path = self._disk_path(ref.digest)
+        if disk_path is not None:
+            try:
+                thumbnail = disk_path.read_bytes()
+            except OSError:
+                pass
+            else:
+                self._disk_hits += 1
+                self._remember(ref.digest, thumbnail)
+                return thumbnail
+
+        source = self.art_store.get(ref)
+        if source is None:
+            return None
+
+        thumbnail = self.render(source)
+        self._renders += 1
+        self._remember(ref.digest, thumbnail)
+
+        if disk_path is not None:
+            # write to temp file first so other instance never reads half written thumbnail
+            tmp_path = disk_path.with_suffix(f".{threading.get_ident()}.tmp")
+            try:
+                tmp_path.write_bytes(thumbnail)
+                os.replace(tmp_path, disk_path)
+            except OSError:
+                pass
+
+        return thumbnail
+
+    def prefetch(self, refs: Iterable[ArtRef | None]) -> None:
+        """Schedules rendering of thumbnails that are not in memory yet"""
+        for ref in refs:
+            if ref is None or ref.digest in self._memory or ref.digest in self._pending:
+                continue
+            self._pending.add(ref.digest)
+            self._jobs.put(ref)
+
+        if self._worker is None and not self._jobs.empty():
+            self._worker = threading.Thread(
+                target=self._work, name="ThumbnailCache", daemon=True
+            )
+            self._worker.start()
+
+    def _work(self) -> None:
+        while True:
+            ref = self._jobs.get()
+            try:
+                if ref is None:
+                    return
+                self.get(ref)
+            except Exception:
+                # failing to prerender is not critical, `get` will try again when its displayed
+                pass
+            finally:
+                if ref is not None:
+                    self._pending.discard(ref.digest)
+                self._jobs.task_done()
+
+    def wait_idle(self) -> None:
+        """Blocks until all prefetched thumbnails are rendered"""
+        self._jobs.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
+
+class TrackCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    items: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of loads served from memory, 0 before first load"""
+        loads = self.hits + self.misses
+        return self.hits / loads if loads else 0.0
+
+
+class TrackCache:
+    """
+    In-memory cache of audio files of recently played and preloaded songs, so restarting a song,
+    going back to previous one or seeking doesnt read its file from disk again.
+
+    Files are kept whole, as the mixer gets them; entries are validated with file size and modification time
+    (like `SeekIndexCache`), so retagged or replaced files are read again. Least recently used files are evicted
+    when total size exceeds `max_bytes`; files bigger than `max_bytes * MAX_ENTRY_RATIO` are never cached,
+    mixer streams them from disk.
+
+    Can be shared between threads (`TrackPreloader` fills it from its worker).
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    MAX_ENTRY_RATIO = 0.25
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        # path -> (file size, modification time, file content)
+        self._files: OrderedDict[str, Tuple[int, int, bytes]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, path: Path | str) -> bool:
+        return os.fspath(path) in self._files
+
+    @property
+    def size(self) -> int:
+        """Total size of cached files in bytes"""
+        return self._size
+
+    @property
+    def stats(self) -> TrackCacheStats:
+        return TrackCacheStats(self._hits, self._misses, len(self._files), self._size)
+
+    def fits(self, size: int) -> bool:
+        return size <= self.max_bytes * self.MAX_ENTRY_RATIO
+
+    def get(self, path: Path | str, record: bool = False) -> bytes | None:
+        """
+        Returns cached content of file if it didnt change since it was cached, never reads the file.
+        Counts as load (hit or miss) only with `record`.
+        """
+        key = os.fspath(path)
+        with self._lock:
+            entry = self._files.get(key)
+        data = None
+        if entry is not None:
+            try:
+                st = os.stat(key)
+            except OSError:
+                pass
+            else:
+                if entry[:2] == (st.st_size, st.st_mtime_ns):
+                    data = entry[2]
+
+        if record:
+            with self._lock:
+                if data is None:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+                    if key in self._files:
+                        self._files.move_to_end(key)
+        return data
+
+    def load(self, path: Path | str) -> bytes | None:
+        """
+        Returns content of file from cache or reads it and caches it;
+        `None` if file is too big to be cached. Raises `OSError` if file cant be read.
+        """
+        key = os.fspath(path)
+        st = os.stat(key)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+                self._files.move_to_end(key)
+                self._hits += 1
+                return entry[2]
+            self._misses += 1
+
+        if not self.fits(st.st_size):
+            return None
+        return self._read(key)
+
+    def fill(self, path: Path | str) -> None:
+        """
+        Reads file into cache unless its already there or too big for it; doesnt count as load.
+        Raises `OSError` if file cant be read.
+        """
+        if self.get(path) is not None:
+            return
+        key = os.fspath(path)
+        if self.fits(os.stat(key).st_size):
+            self._read(key)
+
+    def _read(self, key: str) -> bytes:
+        with open(key, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        self.put(key, data, st.st_size, st.st_mtime_ns)
+        return data
+
+    def put(self, path: Path | str, data: bytes, size: int, mtime_ns: int) -> None:
+        """Stores `data` read from file with `size` and `mtime_ns`"""
+        if not self.fits(len(data)):
+            return
+
+        key = os.fspath(path)
+        with self._lock:
+            old = self._files.pop(key, None)
+            if old is not None:
+                self._size -= len(old[2])
+            self._files[key] = (size, mtime_ns, data)
+            self._size += len(data)
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        """Changes memory budget, evicting files over it"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            too_big = [
+                k for k, entry in self._files.items() if not self.fits(len(entry[2]))
+            ]
+            for key in too_big:
+                self._size -= len(self._files.pop(key)[2])
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._files:
+            _, (_, _, evicted) = self._files.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._size = 0
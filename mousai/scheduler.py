@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+
+class TickScheduler:
+    """
+    Picks timeout for `window.read` in main loop.
+
+    Nothing has to be refreshed while nothing is playing, so loop waits for window events only.
+    During playback it wakes up when displayed play time changes (once per second),
+    or more often close to the end of the song, so next song starts without noticeable delay.
+    When window is not visible only end of song has to be detected.
+    """
+
+    MIN_TIMEOUT = 20
+    HIDDEN_TIMEOUT = 1000
+    # used when song duration is unknown and end of song can come any time
+    UNKNOWN_DURATION_TIMEOUT = 250
+    # how early before end of song loop starts checking with `MIN_TIMEOUT`
+    END_OF_SONG_WINDOW = 1000
+
+    def next_timeout(
+        self,
+        playing: bool,
+        visible: bool = True,
+        playtime_ms: float = 0,
+        duration_ms: float = 0,
+    ) -> int | None:
+        """Returns timeout in milliseconds or `None` if loop should block until next window event"""
+        if not playing:
+            return None
+
+        if duration_ms <= 0:
+            return self.UNKNOWN_DURATION_TIMEOUT
+
+        remaining = duration_ms - playtime_ms
+        if remaining <= self.END_OF_SONG_WINDOW:
+            return self.MIN_TIMEOUT
+
+        if visible:
+            # wake up right after displayed second changes
+            timeout = 1000 - playtime_ms % 1000 + self.MIN_TIMEOUT
+        else:
+            timeout = self.HIDDEN_TIMEOUT
+
+        timeout = min(timeout, remaining - self.END_OF_SONG_WINDOW)
+        return int(max(self.MIN_TIMEOUT, timeout))
@@ -1,37 +1,106 @@
-from io import BytesIO
 from pathlib import Path
-from typing import Any, Generator, List, Union
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple, Union
 
 import PySimpleGUI as sg
+from scheduler import TickScheduler
+from table_model import TableModel
 
-from player.playlist import PlaylistItem
-
-WINDOW_TIMEOUT: int
-
-class CustomTable(sg.Table):
-    RowHeaderText: str
-    def __init__(self, *args, **kwargs) -> None: ...
+from player.importer import ImportProgress, ImportResult
+from player.library import LibraryWatcher, PathIndex
+from player.library_stats import LibraryStats
+from player.loudness import LoudnessResult
+from player.metadata_cache import MetadataCache
+from player.art_store import ArtStore
+from player.playlist import ArtRef, PlaylistItem
+from player.search import SearchIndex
+from player.sorting import SortIndex
+from player.thumbnails import ThumbnailCache
 
 class MousaiGUI:
     PLAY_BTN_SYMBOL: str
     PAUSE_BTN_SYMBOL: str
+    IMPORT_MAX_WORKERS: Optional[int]
+    IMPORT_USE_PROCESSES: bool
+    IMPORT_PROGRESS_METER_KEY: str
+    TRACK_CACHE_BYTES: int
+    NORMALIZE_VOLUME: bool
+    LOUDNESS_MAX_WORKERS: Optional[int]
+    LOUDNESS_PROGRESS_METER_KEY: str
+    THUMBNAIL_PREFETCH_COUNT: int
+    SHUFFLE_WEIGHTING: str
+    SHUFFLE_ARTIST_SPACING: int
+    TABLE_HEADINGS: List[str]
+    TABLE_SORT_ORDERS: Dict[int, str]
+    SEEK_STEP: int
+    QUEUE_PAGE_SIZE: int
+    BROWSE_HEADINGS: List[str]
+    BROWSE_VIEWS: Dict[str, str]
     audio_file_types: Any
+    playlist_file_types: Any
     menu_layout: Any
     theme: Any
     player: Any
+    metadata_cache: MetadataCache
+    art_store: ArtStore
+    scheduler: TickScheduler
+    search_index: SearchIndex
+    search_query: str
+    sort_index: SortIndex
+    sort_order: Optional[str]
+    sort_reverse: bool
+    library_stats: LibraryStats
+    browse_filter: Optional[Tuple[str, Optional[str]]]
+    table_model: TableModel
+    thumbnails: ThumbnailCache
     layout: Any
     window: Any
+    library_paths: PathIndex
+    library: LibraryWatcher
     def __init__(self, theme: str = ...) -> None: ...
-    def get_song_art(self, song_meta_art: Union[BytesIO, None]) -> bytes: ...
+    def get_song_art(self, song_meta_art: Union[ArtRef, None]) -> bytes: ...
     def set_current_song(self, song: PlaylistItem) -> None: ...
+    def current_song_changed(self) -> None: ...
     def create_layout(self) -> List[List[sg.Pane]]: ...
+    def random_btn_text(self) -> str: ...
+    def toggle_shuffle(self) -> None: ...
+    def play_selected_song(self, song: PlaylistItem) -> None: ...
     def get_audio_file_paths(self) -> Union[None, Generator[Path, None, None]]: ...
-    def get_audio_files_from_directory(
-        self,
-    ) -> Union[None, Generator[Path, None, None]]: ...
+    def get_audio_files_from_directory(self) -> Union[None, Iterator[Path]]: ...
+    def import_in_progress(self) -> bool: ...
+    def start_import(
+        self, paths: Iterator[Union[Path, PlaylistItem]], total: Optional[int] = ...
+    ) -> None: ...
+    def save_playlist_file(self) -> None: ...
+    def load_playlist_file(self) -> None: ...
+    def find_duplicates(self) -> None: ...
+    def handle_duplicates_found(self, groups: List[List[PlaylistItem]]) -> None: ...
+    def analyze_loudness(self) -> None: ...
+    def handle_loudness_progress(self, progress: ImportProgress) -> None: ...
+    def handle_loudness_finished(self, result: LoudnessResult) -> None: ...
+    def show_perf_stats(self) -> None: ...
+    def export_perf_stats(self) -> None: ...
+    def handle_import_progress(self, progress: ImportProgress) -> None: ...
+    def handle_import_finished(self, result: ImportResult) -> None: ...
+    def song_to_row(self, song: PlaylistItem) -> List[str]: ...
     def playlist_to_table(self) -> List[List[str]]: ...
+    def apply_search(self, query: str, keep_offset: bool = ...) -> None: ...
+    def sort_table(self, column: int) -> None: ...
+    def typing_in_search(self) -> bool: ...
+    def refresh_table(self) -> None: ...
+    def scroll_table(self, rows: int) -> None: ...
     def set_metadata_frame(self) -> None: ...
     def set_timers(self, start: str = ...) -> None: ...
+    def update_widget(self, key: str, value: Any) -> None: ...
+    def window_visible(self) -> bool: ...
+    def update_playback(self) -> None: ...
+    def next_read_timeout(self) -> Optional[int]: ...
     def restart_current_song(self) -> None: ...
+    def play_previous_song(self) -> None: ...
+    def show_queue(self, source: str) -> None: ...
+    def status_text(self) -> str: ...
+    def update_status_bar(self) -> None: ...
+    def show_browser(self) -> None: ...
+    def seek(self, seconds: float) -> None: ...
+    def seek_to_click(self) -> None: ...
     def handle_volume_change(self, value: float) -> None: ...
     def run(self) -> None: ...
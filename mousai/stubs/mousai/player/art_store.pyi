@@ -0,0 +1,23 @@
+from typing import NamedTuple, Optional
+
+from .playlist import ArtRef as ArtRef
+
+class ArtStoreStats(NamedTuple):
+    hits: int
+    misses: int
+    items: int
+    size: int
+
+class ArtStore:
+    DEFAULT_MAX_BYTES: int
+    max_bytes: int
+    def __init__(self, max_bytes: int = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, digest: str) -> bool: ...
+    @property
+    def size(self) -> int: ...
+    @property
+    def stats(self) -> ArtStoreStats: ...
+    def get(self, ref: Optional[ArtRef]) -> Optional[bytes]: ...
+    def put(self, data: bytes) -> str: ...
+    def clear(self) -> None: ...
@@ -3,26 +3,68 @@ from .playlist import (
     Playlist as Playlist,
     PlaylistItem as PlaylistItem,
 )
-from typing import Any, Generator
+from .play_queue import PlayQueue
+from .preloader import TrackPreloader
+from .seek_index import SeekIndexCache
+from .shuffle import ShuffleEngine
+from .track_cache import TrackCache
+from pathlib import Path
+from typing import Any, Deque, Generator, Optional, Union
+
+MUSIC_END_EVENT: int
+FIRST_AUDIO_MARK: str
 
 class AudioPlayer:
     QUEUE_MAX_LEN: int
     HISTORY_MAX_LEN: int
-    playlist: Any
+    QUEUE_PREFILL: int
+    TRANSITION_GAPS_MAX_LEN: int
+    shuffle: ShuffleEngine
+    shuffle_enabled: bool
+    playlist: Playlist
     current_song: Any
     volume: float
+    normalize_volume: bool
+    seek_indexes: SeekIndexCache
     playback_paused: bool
-    def __init__(self) -> None: ...
+    track_cache: TrackCache
+    gapless: bool
+    preloader: TrackPreloader
+    transition_gaps: Deque[float]
+    def __init__(
+        self,
+        init_mixer: bool = ...,
+        track_cache_bytes: int = ...,
+        seek_index_path: Union[Path, str] = ...,
+    ) -> None: ...
+    def init_mixer(self, background: bool = ...) -> None: ...
+    def wait_ready(self) -> None: ...
+    @property
+    def ready(self) -> bool: ...
     def init_queue(self) -> None: ...
     def add_to_history(self, item: PlaylistItem) -> None: ...
     def add_to_queue(self, item: PlaylistItem = ..., next: bool = ...) -> None: ...
+    def remove_from_queue(self, item_id: int) -> int: ...
+    def play_next(self, item: PlaylistItem) -> None: ...
+    def rebuild_queue(self) -> None: ...
+    def set_shuffle(self, enabled: bool) -> None: ...
     def get_playlistitems_gen(
         self, source: str
     ) -> Generator[PlaylistItem, None, None]: ...
+    def get_play_queue(self, source: str) -> PlayQueue: ...
+    def change_song(self, song: PlaylistItem, to_history: bool = ...) -> None: ...
     def get_next_song(self) -> PlaylistItem: ...
+    def play_previous(self) -> PlaylistItem: ...
+    def song_ended(self) -> bool: ...
+    def started_gaplessly(self, item: PlaylistItem) -> bool: ...
+    def queue_next(self) -> None: ...
+    @property
+    def last_transition_gap_ms(self) -> Optional[float]: ...
     def is_playing(self) -> bool: ...
+    def seek(self, seconds: float) -> float: ...
     def set_playtime(self, value: float) -> None: ...
     def get_playtime(self) -> float: ...
+    def get_mixer_volume(self) -> float: ...
     def set_volume(self, value: float) -> None: ...
     def play(self) -> None: ...
     def stop(self) -> None: ...
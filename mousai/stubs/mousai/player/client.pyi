@@ -0,0 +1,35 @@
+import argparse
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+class PlayerClient:
+    socket_path: Path
+    def __init__(self, socket_path: Optional[Path] = ...) -> None: ...
+    async def connect(self) -> None: ...
+    async def close(self) -> None: ...
+    async def __aenter__(self) -> PlayerClient: ...
+    async def __aexit__(self, *exc_info: Any) -> None: ...
+    async def request(self, cmd: str, **args: Any) -> Any: ...
+    async def status(self) -> Dict[str, Any]: ...
+    async def play(
+        self, path: Optional[str] = ..., id: Optional[int] = ...
+    ) -> Dict[str, Any]: ...
+    async def pause(self) -> Dict[str, Any]: ...
+    async def next(self) -> Dict[str, Any]: ...
+    async def previous(self) -> Dict[str, Any]: ...
+    async def seek(self, position: float) -> Dict[str, Any]: ...
+    async def queue(
+        self,
+        path: Optional[str] = ...,
+        id: Optional[int] = ...,
+        next: bool = ...,
+        remove: Optional[int] = ...,
+    ) -> List[Dict[str, Any]]: ...
+    async def volume(self, value: Optional[float] = ...) -> float: ...
+    async def add(self, paths: List[str]) -> Dict[str, Any]: ...
+    async def shutdown(self) -> None: ...
+    def subscribe(self) -> AsyncIterator[Dict[str, Any]]: ...
+
+async def run_command(client: PlayerClient, args: argparse.Namespace) -> Any: ...
+def parse_args(argv: List[str]) -> argparse.Namespace: ...
+def main(argv: List[str]) -> int: ...
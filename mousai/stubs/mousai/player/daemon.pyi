@@ -0,0 +1,55 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .audio_player import AudioPlayer
+from .playlist import PlaylistItem
+
+SOCKET_ENV: str
+
+Message = Dict[str, Any]
+Command = Callable[..., Awaitable[Any]]
+
+def default_socket_path() -> Path: ...
+def encode(message: Message) -> bytes: ...
+def expand_paths(paths: List[str]) -> List[Path]: ...
+def song_info(item: Optional[PlaylistItem]) -> Optional[Dict[str, Any]]: ...
+
+class PlayerDaemon:
+    POLL_INTERVAL: float
+    STATUS_INTERVAL: float
+    MAX_PENDING_BYTES: int
+    MAX_SKIPS: int
+    player: AudioPlayer
+    socket_path: Path
+    def __init__(
+        self,
+        player: AudioPlayer,
+        socket_path: Optional[Path] = ...,
+        load_item: Callable[[Path], PlaylistItem] = ...,
+    ) -> None: ...
+    def status(self) -> Dict[str, Any]: ...
+    async def serve(self) -> None: ...
+    def stop(self) -> None: ...
+    def broadcast(self) -> None: ...
+    async def cmd_status(self) -> Dict[str, Any]: ...
+    async def cmd_play(
+        self, path: Optional[str] = ..., id: Optional[int] = ...
+    ) -> Dict[str, Any]: ...
+    async def cmd_pause(self) -> Dict[str, Any]: ...
+    async def cmd_next(self) -> Dict[str, Any]: ...
+    async def cmd_previous(self) -> Dict[str, Any]: ...
+    async def cmd_seek(self, position: float) -> Dict[str, Any]: ...
+    async def cmd_queue(
+        self,
+        path: Optional[str] = ...,
+        id: Optional[int] = ...,
+        next: bool = ...,
+        remove: Optional[int] = ...,
+    ) -> List[Optional[Dict[str, Any]]]: ...
+    async def cmd_volume(self, value: Optional[float] = ...) -> float: ...
+    async def cmd_add(self, paths: List[str]) -> Dict[str, Any]: ...
+    async def cmd_subscribe(self, writer: asyncio.StreamWriter) -> Dict[str, Any]: ...
+    async def cmd_shutdown(self) -> None: ...
+
+def main(argv: List[str]) -> int: ...
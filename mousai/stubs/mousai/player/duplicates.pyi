@@ -0,0 +1,32 @@
+from typing import BinaryIO, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .playlist import PlaylistItem
+
+DUPLICATES_FOUND_EVENT: str
+PayloadRange = Tuple[int, int]
+ID3V1_SIZE: int
+APE_FOOTER_SIZE: int
+
+def mp3_payload_range(f: BinaryIO, size: int) -> PayloadRange: ...
+def payload_range(path: str) -> Optional[PayloadRange]: ...
+def edge_digest(path: str, payload: PayloadRange, edge_size: int) -> Optional[str]: ...
+def payload_digest(
+    path: str, payload: PayloadRange, chunk_size: int
+) -> Optional[str]: ...
+
+class DuplicateStats(NamedTuple):
+    payload_checked: int
+    edges_hashed: int
+    fully_hashed: int
+
+class DuplicateFinder:
+    EDGE_SIZE: int
+    CHUNK_SIZE: int
+    max_workers: Optional[int]
+    stats: DuplicateStats
+    def __init__(self, max_workers: Optional[int] = ...) -> None: ...
+    def find(self, items: Iterable[PlaylistItem]) -> List[List[PlaylistItem]]: ...
+
+def find_duplicates(
+    items: Sequence[PlaylistItem], max_workers: Optional[int] = ...
+) -> List[List[PlaylistItem]]: ...
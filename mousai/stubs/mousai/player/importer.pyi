@@ -0,0 +1,57 @@
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .metadata_cache import MetadataCache
+from .playlist import PlaylistItem as PlaylistItem
+
+IMPORT_BATCH_EVENT: str
+IMPORT_PROGRESS_EVENT: str
+IMPORT_DONE_EVENT: str
+IMPORT_CANCELLED_EVENT: str
+EmitFunc = Callable[[str, Any], None]
+
+class ImportProgress(NamedTuple):
+    done: int
+    total: int
+    failed: int
+
+class ImportResult(NamedTuple):
+    added: int
+    failed: List[Tuple[Path, str]]
+    cancelled: bool
+
+def is_supported_audio_file(name: str) -> bool: ...
+def scan_audio_files(directory: Union[Path, str]) -> Iterator[Path]: ...
+
+class LibraryImporter:
+    BATCH_SIZE: int
+    max_workers: int
+    use_processes: bool
+    batch_size: int
+    def __init__(
+        self,
+        paths: Iterable[Union[Path, PlaylistItem]],
+        emit: EmitFunc,
+        *,
+        total: Optional[int] = ...,
+        max_workers: Optional[int] = ...,
+        use_processes: bool = ...,
+        batch_size: int = ...,
+        cache: Optional[MetadataCache] = ...,
+    ) -> None: ...
+    def start(self) -> None: ...
+    def cancel(self) -> None: ...
+    @property
+    def cancelled(self) -> bool: ...
+    def is_running(self) -> bool: ...
+    def join(self, timeout: Optional[float] = ...) -> None: ...
@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .importer import EmitFunc
+from .metadata_cache import MetadataCache
+from .playlist import Playlist, PlaylistItem
+
+LIBRARY_CHANGES_EVENT: str
+FileSignature = Tuple[int, int]
+
+class LibraryChanges(NamedTuple):
+    added: List[PlaylistItem]
+    updated: List[PlaylistItem]
+    removed: List[str]
+
+def file_signature(path: str) -> Optional[FileSignature]: ...
+def walk_library(root: str) -> Tuple[List[str], Dict[str, FileSignature]]: ...
+
+class Inotify:
+    WATCH_MASK: int
+    fd: int
+    dirs: Dict[int, str]
+    def __init__(self) -> None: ...
+    def add_watch(self, path: str) -> None: ...
+    def read(self, timeout: float) -> List[Tuple[str, int]]: ...
+    def close(self) -> None: ...
+
+class LibraryWatcher:
+    POLL_INTERVAL: float
+    DEBOUNCE: float
+    poll_interval: float
+    roots: List[str]
+    def __init__(
+        self,
+        emit: EmitFunc,
+        *,
+        cache: Optional[MetadataCache] = ...,
+        poll_interval: float = ...,
+        use_inotify: bool = ...,
+    ) -> None: ...
+    @property
+    def uses_inotify(self) -> bool: ...
+    def start(self) -> None: ...
+    def stop(self) -> None: ...
+    def add_root(self, root: Union[Path, str]) -> None: ...
+
+class PathIndex:
+    def __init__(self, playlist: Playlist) -> None: ...
+    def get(self, path: str) -> List[PlaylistItem]: ...
+    def on_add(self, item: PlaylistItem) -> None: ...
+    def on_remove(self, item: PlaylistItem) -> None: ...
+
+def apply_library_changes(
+    playlist: Playlist, paths: PathIndex, changes: LibraryChanges
+) -> None: ...
@@ -0,0 +1,22 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from .playlist import Playlist, PlaylistItem
+
+GROUP_FIELDS: Tuple[str, ...]
+
+class GroupStats(NamedTuple):
+    name: Optional[str]
+    songs: int
+    duration: float
+
+class LibraryStats:
+    unknown_duration: int
+    def __init__(self, playlist: Optional[Playlist] = ...) -> None: ...
+    def on_add(self, item: PlaylistItem) -> None: ...
+    def on_remove(self, item: PlaylistItem) -> None: ...
+    @property
+    def total(self) -> GroupStats: ...
+    def count(self, field: str) -> int: ...
+    def group(self, field: str, name: Optional[str]) -> Optional[GroupStats]: ...
+    def groups(self, field: str) -> List[GroupStats]: ...
+    def item_ids(self, field: str, name: Optional[str]) -> List[int]: ...
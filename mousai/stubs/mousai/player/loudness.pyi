@@ -0,0 +1,50 @@
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .metadata_cache import MetadataCache
+from .playlist import PlaylistItem
+
+LOUDNESS_PROGRESS_EVENT: str
+LOUDNESS_DONE_EVENT: str
+REFERENCE_LOUDNESS: float
+MAX_GAIN: float
+SILENCE_DB: float
+BLOCK_SECONDS: float
+LOUD_PERCENTILE: int
+SAMPLE_RATE: int
+EmitFunc = Callable[[str, Any], None]
+
+class TrackLoudness(NamedTuple):
+    loudness: float
+    peak: float
+    def gain(self, reference: float = ...) -> float: ...
+
+class LoudnessResult(NamedTuple):
+    gains: Dict[int, float]
+    failed: List[Tuple[str, str]]
+    cancelled: bool
+
+def measure(samples: np.ndarray, sample_rate: int) -> TrackLoudness: ...
+def decode(path: str) -> np.ndarray: ...
+def analyze_file(path: str) -> TrackLoudness: ...
+
+class LoudnessAnalyzer:
+    PROGRESS_EVERY: int
+    max_workers: int
+    reference: float
+    def __init__(
+        self,
+        items: Iterable[PlaylistItem],
+        emit: EmitFunc,
+        *,
+        max_workers: Optional[int] = ...,
+        reference: float = ...,
+        cache: Optional[MetadataCache] = ...,
+    ) -> None: ...
+    def start(self) -> None: ...
+    def cancel(self) -> None: ...
+    @property
+    def cancelled(self) -> bool: ...
+    def is_running(self) -> bool: ...
+    def join(self, timeout: Optional[float] = ...) -> None: ...
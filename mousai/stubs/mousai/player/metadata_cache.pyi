@@ -0,0 +1,26 @@
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from .playlist import AudioMetaData as AudioMetaData
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    stale: int
+    @property
+    def hit_rate(self) -> float: ...
+
+class MetadataCache:
+    SCHEMA_VERSION: int
+    COMMIT_EVERY: int
+    db_path: Union[Path, str]
+    def __init__(self, db_path: Union[Path, str] = ...) -> None: ...
+    @property
+    def stats(self) -> CacheStats: ...
+    def __len__(self) -> int: ...
+    def get(self, path: Path) -> Optional[AudioMetaData]: ...
+    def put(self, path: Path, meta: AudioMetaData) -> None: ...
+    def set_gain(self, path: Path, gain: Optional[float]) -> bool: ...
+    def load(self, path: Path) -> AudioMetaData: ...
+    def flush(self) -> None: ...
+    def close(self) -> None: ...
@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+PERF_ENV: str
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+class Histogram:
+    BOUNDS_MS: Tuple[float, ...]
+    count: int
+    total: float
+    min: float
+    max: float
+    buckets: List[int]
+    def __init__(self) -> None: ...
+    def add(self, ms: float) -> None: ...
+    @property
+    def mean(self) -> float: ...
+    def percentile(self, p: float) -> float: ...
+    def to_dict(self) -> Dict[str, Any]: ...
+
+class PerfStats:
+    enabled: bool
+    def __init__(self, enabled: bool = ...) -> None: ...
+    def record(self, name: str, ms: float) -> None: ...
+    def start(self) -> Optional[float]: ...
+    def stop(self, name: str, started: Optional[float]) -> None: ...
+    def timed(self, name: str) -> Callable[[F], F]: ...
+    def mark(self, name: str) -> None: ...
+    def record_since(self, name: str, mark: str) -> None: ...
+    def get(self, name: str) -> Optional[Histogram]: ...
+    def reset(self) -> None: ...
+    def snapshot(self) -> Dict[str, Any]: ...
+    def to_json(self) -> str: ...
+    def export(self, path: Path) -> None: ...
+    def summary(self) -> List[str]: ...
+
+stats: PerfStats
+
+def timed(name: str) -> Callable[[F], F]: ...
@@ -0,0 +1,21 @@
+from typing import Iterator, List, Optional
+
+from .playlist import PlaylistItem
+
+class PlayQueue:
+    maxlen: Optional[int]
+    version: int
+    def __init__(self, maxlen: Optional[int] = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[PlaylistItem]: ...
+    def __reversed__(self) -> Iterator[PlaylistItem]: ...
+    def __contains__(self, item: object) -> bool: ...
+    def __getitem__(self, index): ...
+    def append(self, item: PlaylistItem) -> None: ...
+    def appendleft(self, item: PlaylistItem) -> None: ...
+    def popleft(self) -> PlaylistItem: ...
+    def pop(self) -> PlaylistItem: ...
+    def remove(self, item_id: int) -> int: ...
+    def move_to_front(self, item_id: int) -> PlaylistItem: ...
+    def page(self, start: int, count: int) -> List[PlaylistItem]: ...
+    def clear(self) -> None: ...
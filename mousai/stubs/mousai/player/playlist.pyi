@@ -1,10 +1,21 @@
-import io
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterator, List, NamedTuple, Optional
 
+from .metadata_cache import MetadataCache
+
 SUPPORTED_AUDIO_FILES: Any
 
+class ArtRef(NamedTuple):
+    path: str
+    digest: str
+    def read(self) -> Optional[bytes]: ...
+
+ART_DIGEST_SAMPLE: int
+
+def art_digest(data: bytes) -> str: ...
+def art_digest_parts(size: int, head: bytes, tail: bytes) -> str: ...
+
 class AudioMetaData(NamedTuple):
     file_name: str
     playtime: int
@@ -12,29 +23,48 @@ class AudioMetaData(NamedTuple):
     album: Optional[str]
     title: Optional[str]
     genre: Optional[str]
-    release_date: Optional[datetime]
-    art: Optional[io.BytesIO]
+    release_date: Optional[str]
+    art: Optional[ArtRef]
+    gain: Optional[float]
     @classmethod
     def from_file(cls, path: Path) -> AudioMetaData: ...
+    @classmethod
+    def from_eyed3(cls, path: Path) -> AudioMetaData: ...
 
 class PlaylistItem:
-    path: Any
-    meta: Any
-    added: Any
-    def __init__(self, path, meta_data) -> None: ...
+    id: int
+    meta: AudioMetaData
+    def __init__(self, path, meta_data, added: Optional[float] = ...) -> None: ...
+    @property
+    def path(self) -> Path: ...
+    @property
+    def added(self) -> datetime: ...
     @classmethod
-    def from_file(cls, path: Path) -> PlaylistItem: ...
+    def from_file(
+        cls, path: Path, cache: Optional[MetadataCache] = ...
+    ) -> PlaylistItem: ...
 
 class Playlist:
-    songs: Any
     def __init__(self, songs: List[PlaylistItem] = ...) -> None: ...
+    @property
+    def songs(self) -> List[PlaylistItem]: ...
     def __iter__(self) -> Iterator[PlaylistItem]: ...
     def __getitem__(self, key) -> PlaylistItem: ...
     def __setitem__(self, key, value: PlaylistItem) -> None: ...
-    def __len__(self): ...
+    def __len__(self) -> int: ...
+    def __contains__(self, item: PlaylistItem) -> bool: ...
+    def subscribe(self, listener: Any) -> None: ...
+    def unsubscribe(self, listener: Any) -> None: ...
     def add(self, item: PlaylistItem) -> None: ...
     def remove(self, item_index) -> None: ...
+    def get(self, item_id: int) -> PlaylistItem: ...
+    def remove_item(self, item_id: int) -> PlaylistItem: ...
+    def index(self, item_id: int) -> int: ...
     def get_random_item(self) -> PlaylistItem: ...
-    def remove_duplicates(self, item) -> None: ...
+    def remove_duplicates(
+        self,
+        groups: Optional[List[List[PlaylistItem]]] = ...,
+        max_workers: Optional[int] = ...,
+    ) -> List[List[PlaylistItem]]: ...
 
 class PlayerError(Exception): ...
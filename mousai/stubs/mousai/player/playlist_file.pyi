@@ -0,0 +1,28 @@
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from .playlist import PlayerError as PlayerError, PlaylistItem as PlaylistItem
+
+MAGIC: bytes
+VERSION: int
+FILE_EXTENSION: str
+HEADER: struct.Struct
+RECORD: struct.Struct
+STRING_ENTRY: struct.Struct
+NO_STRING: int
+
+class PlaylistFileError(PlayerError): ...
+
+def save_playlist(items: Iterable[PlaylistItem], path: Path) -> int: ...
+
+class PlaylistFileReader:
+    path: Path
+    def __init__(self, path: Path) -> None: ...
+    def __enter__(self) -> PlaylistFileReader: ...
+    def __exit__(self, *exc) -> None: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[PlaylistItem]: ...
+    def read_item(self, index: int) -> PlaylistItem: ...
+    def iter_batches(self, batch_size: int = ...) -> Iterator[List[PlaylistItem]]: ...
+    def close(self) -> None: ...
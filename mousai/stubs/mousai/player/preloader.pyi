@@ -0,0 +1,24 @@
+from typing import Optional
+
+from .playlist import PlaylistItem
+from .seek_index import SeekIndexCache
+from .track_cache import TrackCache
+
+PRELOAD: str
+FILL_CACHE: str
+BUILD_SEEK_INDEX: str
+
+class TrackPreloader:
+    cache: Optional[TrackCache]
+    seek_indexes: Optional[SeekIndexCache]
+    def __init__(
+        self,
+        cache: Optional[TrackCache] = ...,
+        seek_indexes: Optional[SeekIndexCache] = ...,
+    ) -> None: ...
+    def request(self, item: PlaylistItem) -> None: ...
+    def fill_cache(self, item: PlaylistItem) -> None: ...
+    def build_seek_index(self, item: PlaylistItem) -> None: ...
+    def get(self, item: PlaylistItem) -> Optional[bytes]: ...
+    def wait_idle(self) -> None: ...
+    def close(self) -> None: ...
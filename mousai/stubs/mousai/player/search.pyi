@@ -0,0 +1,22 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from .playlist import Playlist, PlaylistItem
+
+def fold(text: str) -> str: ...
+def tokenize(text: str) -> List[str]: ...
+def item_tokens(item: PlaylistItem) -> Set[str]: ...
+
+class SearchResults(Sequence[PlaylistItem]):
+    ids: List[int]
+    def __init__(self, ids: List[int], items: Dict[int, PlaylistItem]) -> None: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, index): ...
+    def __iter__(self) -> Iterator[PlaylistItem]: ...
+
+class SearchIndex:
+    TOKENS_PER_ITEM: int
+    def __init__(self, playlist: Optional[Playlist] = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def on_add(self, item: PlaylistItem) -> None: ...
+    def on_remove(self, item: PlaylistItem) -> None: ...
+    def search(self, query: str) -> SearchResults: ...
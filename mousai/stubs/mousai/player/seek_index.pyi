@@ -0,0 +1,113 @@
+import io
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type, Union
+
+from .playlist import PlayerError
+
+MP3_SAMPLE_RATES: Dict[int, Tuple[int, int, int]]
+MP3_BITRATES_V1: Tuple[int, ...]
+MP3_BITRATES_V2: Tuple[int, ...]
+VBRI_OFFSET: int
+OGG_PAGE_HEADER: Any
+WAV_FORMATS: Tuple[int, ...]
+
+class SeekIndexError(PlayerError): ...
+
+class SeekPoint(NamedTuple):
+    time: float
+    offset: int
+
+class SeekIndex(ABC):
+    format: str
+    duration: float
+    end: int
+    def __init__(self, format: str, duration: float, end: int) -> None: ...
+    @abstractmethod
+    def locate(self, seconds: float) -> SeekPoint: ...
+    def header(self, length: int) -> bytes: ...
+    def open_from(
+        self, source: Union[Path, str, bytes], seconds: float
+    ) -> Tuple[float, SeekStream]: ...
+    def read_from(
+        self, path: Union[Path, str], seconds: float
+    ) -> Tuple[float, bytes]: ...
+    @abstractmethod
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    @abstractmethod
+    def from_bytes(cls, data: bytes) -> SeekIndex: ...
+
+class SeekStream(io.RawIOBase):
+    def __init__(
+        self,
+        header: bytes,
+        source: Union[io.BufferedIOBase, bytes],
+        start: int,
+        end: int,
+    ) -> None: ...
+    def readable(self) -> bool: ...
+    def seekable(self) -> bool: ...
+    def tell(self) -> int: ...
+    def seek(self, offset: int, whence: int = ...) -> int: ...
+    def readinto(self, buffer: Any) -> int: ...
+    def close(self) -> None: ...
+
+class FrameIndex(SeekIndex):
+    offsets: array
+    frame_duration: float
+    def __init__(self, offsets: array, frame_duration: float, end: int) -> None: ...
+    def locate(self, seconds: float) -> SeekPoint: ...
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    def from_bytes(cls, data: bytes) -> FrameIndex: ...
+
+class PageIndex(SeekIndex):
+    headers: bytes
+    times: array
+    offsets: array
+    def __init__(
+        self, headers: bytes, times: array, offsets: array, duration: float, end: int
+    ) -> None: ...
+    def locate(self, seconds: float) -> SeekPoint: ...
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    def from_bytes(cls, data: bytes) -> PageIndex: ...
+    def header(self, length: int) -> bytes: ...
+
+class SampleIndex(SeekIndex):
+    fmt: bytes
+    data_start: int
+    sample_rate: int
+    block_align: int
+    frames: int
+    def __init__(
+        self, fmt: bytes, data_start: int, end: int, sample_rate: int, block_align: int
+    ) -> None: ...
+    def locate(self, seconds: float) -> SeekPoint: ...
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SampleIndex: ...
+    def header(self, length: int) -> bytes: ...
+
+def mp3_frame(data: bytes, offset: int) -> Optional[Tuple[int, int, int]]: ...
+def is_info_frame(data: bytes, offset: int) -> bool: ...
+def build_mp3_index(path: Union[Path, str]) -> FrameIndex: ...
+def build_ogg_index(path: Union[Path, str]) -> PageIndex: ...
+def build_wav_index(path: Union[Path, str]) -> SampleIndex: ...
+def build_seek_index(path: Union[Path, str]) -> SeekIndex: ...
+
+INDEX_TYPES: Dict[str, Type[SeekIndex]]
+
+class SeekIndexCache:
+    MAX_ENTRIES: int
+    SCHEMA_VERSION: int
+    max_entries: int
+    def __init__(
+        self, max_entries: int = ..., db_path: Union[Path, str] = ...
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def peek(self, path: Union[Path, str]) -> Optional[SeekIndex]: ...
+    def get(self, path: Union[Path, str]) -> SeekIndex: ...
+    def close(self) -> None: ...
@@ -0,0 +1,40 @@
+import random
+from typing import Optional, Tuple
+
+from .playlist import Playlist, PlaylistItem
+
+WEIGHT_NONE: str
+WEIGHT_PLAY_COUNT: str
+WEIGHT_RECENCY: str
+WEIGHTINGS: Tuple[str, ...]
+
+class ShuffleEngine:
+    MAX_TRIES: int
+    RECENCY_WINDOW: int
+    MIN_WEIGHT: float
+    weighting: str
+    rng: random.Random
+    playlist: Optional[Playlist]
+    def __init__(
+        self,
+        playlist: Optional[Playlist] = ...,
+        weighting: str = ...,
+        artist_spacing: int = ...,
+        rng: Optional[random.Random] = ...,
+    ) -> None: ...
+    @property
+    def artist_spacing(self) -> int: ...
+    @artist_spacing.setter
+    def artist_spacing(self, value: int) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def remaining(self) -> int: ...
+    def set_playlist(self, playlist: Playlist) -> None: ...
+    def on_add(self, item: PlaylistItem) -> None: ...
+    def on_remove(self, item: PlaylistItem) -> None: ...
+    def put_back(self, item: PlaylistItem) -> None: ...
+    def reset_cycle(self) -> None: ...
+    def weight(self, item: PlaylistItem) -> float: ...
+    def pick(self) -> PlaylistItem: ...
+    def record_play(self, item: PlaylistItem) -> None: ...
+    def play_count(self, item: PlaylistItem) -> int: ...
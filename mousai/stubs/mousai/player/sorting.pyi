@@ -0,0 +1,32 @@
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .playlist import Playlist, PlaylistItem
+
+MISSING: str
+SORT_FIELDS: Tuple[str, ...]
+SORT_ORDERS: Dict[str, Tuple[str, ...]]
+FieldKeys = Tuple[str, str, str, float, float]
+
+def field_keys(item: PlaylistItem) -> FieldKeys: ...
+
+class SortedItems(Sequence[PlaylistItem]):
+    ids: Sequence[int]
+    reverse: bool
+    def __init__(
+        self, ids: Sequence[int], items: Dict[int, PlaylistItem], reverse: bool = ...
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, index): ...
+    def __iter__(self) -> Iterator[PlaylistItem]: ...
+
+class SortIndex:
+    RESORT_RATIO: float
+    def __init__(self, playlist: Optional[Playlist] = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def on_add(self, item: PlaylistItem) -> None: ...
+    def on_remove(self, item: PlaylistItem) -> None: ...
+    def sorted(self, order: str, reverse: bool = ...) -> SortedItems: ...
+    def sort(
+        self, ids: Iterable[int], order: str, reverse: bool = ...
+    ) -> SortedItems: ...
@@ -0,0 +1,20 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from .playlist import AudioMetaData, PlayerError
+
+READ_BUFFER_SIZE: int
+MP3_SYNC_WINDOWS: tuple
+OGG_TAIL_WINDOWS: tuple
+PICTURE_HEADER_SIZE: int
+MAX_TEXT_SIZE: int
+ID3V1_GENRES: List[str]
+READERS: Dict[str, Callable[[Path], AudioMetaData]]
+
+class TagError(PlayerError): ...
+
+def read_mp3(path: Path) -> AudioMetaData: ...
+def read_ogg(path: Path) -> AudioMetaData: ...
+def read_wav(path: Path) -> AudioMetaData: ...
+def read_metadata(path: Path) -> AudioMetaData: ...
+def read_art(path: Union[Path, str]) -> Optional[bytes]: ...
@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .metadata_cache import MetadataCache
+from .playlist import PlaylistItem
+
+M3U_EXTENSIONS: Tuple[str, ...]
+PLS_EXTENSION: str
+TEXT_PLAYLIST_EXTENSIONS: Tuple[str, ...]
+PLS_MAX_PENDING: int
+
+class PlaylistEntry(NamedTuple):
+    path: Path
+    title: Optional[str] = ...
+    artist: Optional[str] = ...
+    duration: Optional[float] = ...
+
+def read_m3u(path: Path) -> Iterator[PlaylistEntry]: ...
+def read_pls(path: Path) -> Iterator[PlaylistEntry]: ...
+def read_text_playlist(path: Path) -> Iterator[PlaylistEntry]: ...
+def count_entries(path: Path) -> int: ...
+def playlist_items(
+    entries: Iterable[PlaylistEntry], cache: Optional[MetadataCache] = ...
+) -> Iterator[Union[Path, PlaylistItem]]: ...
+def save_m3u(
+    items: Iterable[PlaylistItem], path: Path, relative: bool = ...
+) -> int: ...
+def save_pls(
+    items: Iterable[PlaylistItem], path: Path, relative: bool = ...
+) -> int: ...
+def save_text_playlist(
+    items: Iterable[PlaylistItem], path: Path, relative: bool = ...
+) -> int: ...
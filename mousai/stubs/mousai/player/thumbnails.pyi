@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from .art_store import ArtStore as ArtStore
+from .playlist import ArtRef as ArtRef
+
+RenderFunc = Callable[[bytes], bytes]
+
+class ThumbnailStats(NamedTuple):
+    memory_hits: int
+    disk_hits: int
+    renders: int
+
+class ThumbnailCache:
+    MAX_ITEMS: int
+    art_store: ArtStore
+    render: RenderFunc
+    cache_dir: Optional[Path]
+    max_items: int
+    def __init__(
+        self,
+        art_store: ArtStore,
+        render: RenderFunc,
+        cache_dir: Optional[Path] = ...,
+        max_items: int = ...,
+    ) -> None: ...
+    @property
+    def stats(self) -> ThumbnailStats: ...
+    def __contains__(self, digest: str) -> bool: ...
+    def get(self, ref: Optional[ArtRef]) -> Optional[bytes]: ...
+    def prefetch(self, refs: Iterable[Optional[ArtRef]]) -> None: ...
+    def wait_idle(self) -> None: ...
+    def close(self) -> None: ...
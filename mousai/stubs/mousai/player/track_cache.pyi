@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+class TrackCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    items: int
+    size: int
+    @property
+    def hit_rate(self) -> float: ...
+
+class TrackCache:
+    DEFAULT_MAX_BYTES: int
+    MAX_ENTRY_RATIO: float
+    max_bytes: int
+    def __init__(self, max_bytes: int = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, path: Union[Path, str]) -> bool: ...
+    @property
+    def size(self) -> int: ...
+    @property
+    def stats(self) -> TrackCacheStats: ...
+    def fits(self, size: int) -> bool: ...
+    def get(
+        self, path: Union[Path, str], record: bool = ...
+    ) -> Optional[bytes]: ...
+    def load(self, path: Union[Path, str]) -> Optional[bytes]: ...
+    def fill(self, path: Union[Path, str]) -> None: ...
+    def put(
+        self, path: Union[Path, str], data: bytes, size: int, mtime_ns: int
+    ) -> None: ...
+    def resize(self, max_bytes: int) -> None: ...
+    def clear(self) -> None: ...
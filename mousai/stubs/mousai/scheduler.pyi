@@ -0,0 +1,14 @@
+from typing import Optional
+
+class TickScheduler:
+    MIN_TIMEOUT: int
+    HIDDEN_TIMEOUT: int
+    UNKNOWN_DURATION_TIMEOUT: int
+    END_OF_SONG_WINDOW: int
+    def next_timeout(
+        self,
+        playing: bool,
+        visible: bool = ...,
+        playtime_ms: float = ...,
+        duration_ms: float = ...,
+    ) -> Optional[int]: ...
@@ -0,0 +1,33 @@
+from typing import Any, Callable, List, Optional, Sequence
+
+FormatRowFunc = Callable[[Any], List[str]]
+
+class TableModel:
+    VISIBLE_ROWS: int
+    CACHE_SIZE: int
+    source: Sequence
+    format_row: FormatRowFunc
+    visible_rows: int
+    cache_size: int
+    offset: int
+    def __init__(
+        self,
+        source: Sequence,
+        format_row: FormatRowFunc,
+        visible_rows: int = ...,
+        cache_size: int = ...,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def dirty(self) -> bool: ...
+    @property
+    def max_offset(self) -> int: ...
+    def set_source(self, source: Sequence, offset: int = ...) -> None: ...
+    def scroll_to(self, offset: int) -> None: ...
+    def scroll_by(self, rows: int) -> None: ...
+    def items_changed(self, start: int, stop: Optional[int] = ...) -> None: ...
+    def invalidate(self, item: Any) -> None: ...
+    def invalidate_all(self) -> None: ...
+    def row(self, item: Any) -> List[str]: ...
+    def get_visible_rows(self) -> List[List[str]]: ...
+    def item_at(self, row: int) -> Any: ...
@@ -1,5 +1,9 @@
 from io import BytesIO
+from pathlib import Path
+from typing import Union
 
 def get_default_art_cover() -> bytes: ...
+def get_data_dir() -> Path: ...
 def playtime_to_str(value: int): ...
-def resize_img(image: BytesIO) -> bytes: ...
+def total_time_to_str(value: Union[int, float]) -> str: ...
+def resize_img(image: Union[BytesIO, bytes]) -> bytes: ...
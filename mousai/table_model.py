@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, List, Sequence
+
+FormatRowFunc = Callable[[Any], List[str]]
+
+
+class TableModel:
+    """
+    Virtual view of a big sequence of items (e.g. `Playlist`) in a table that shows `visible_rows` rows at a time.
+
+    Rows are formatted by `format_row` only when they become visible and formatted rows are cached by item id,
+    so cost of refreshing table depends on number of visible rows, not on number of items.
+    Items have to have `id` attribute.
+    """
+
+    VISIBLE_ROWS = 20
+    # Max number of formatted rows kept in cache
+    CACHE_SIZE = 5000
+
+    def __init__(
+        self,
+        source: Sequence,
+        format_row: FormatRowFunc,
+        visible_rows: int = VISIBLE_ROWS,
+        cache_size: int = CACHE_SIZE,
+    ) -> None:
+        self.source = source
+        self.format_row = format_row
+        self.visible_rows = visible_rows
+        self.cache_size = cache_size
+        self.offset = 0
+        self._rows: OrderedDict[int, List[str]] = OrderedDict()
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    @property
+    def dirty(self) -> bool:
+        """Is table showing outdated rows"""
+        return self._dirty
+
+    @property
+    def max_offset(self) -> int:
+        return max(0, len(self.source) - self.visible_rows)
+
+    def set_source(self, source: Sequence, offset: int = 0) -> None:
+        """Shows items from other sequence (e.g. filtered or sorted view of playlist)"""
+        self.source = source
+        self.offset = min(max(0, offset), self.max_offset)
+        self._dirty = True
+
+    def scroll_to(self, offset: int) -> None:
+        offset = min(max(0, offset), self.max_offset)
+        if offset != self.offset:
+            self.offset = offset
+            self._dirty = True
+
+    def scroll_by(self, rows: int) -> None:
+        self.scroll_to(self.offset + rows)
+
+    def _is_visible(self, start: int, stop: int) -> bool:
+        return start < self.offset + self.visible_rows and stop > self.offset
+
+    def items_changed(self, start: int, stop: int | None = None) -> None:
+        """
+        Lets model know that items at positions `start`:`stop` were added, removed or replaced;
+        `stop=None` means everything from `start` to the end (e.g. when items after removed one moved).
+        Table has to be refreshed only if any of them is visible.
+        """
+        if stop is None:
+            stop = max(start + 1, len(self.source))
+
+        if self.offset > self.max_offset:
+            self.offset = self.max_offset
+            self._dirty = True
+        elif self._is_visible(start, stop):
+            self._dirty = True
+
+    def invalidate(self, item: Any) -> None:
+        """Drops cached row of `item`, e.g. when its metadata changed"""
+        self._rows.pop(item.id, None)
+        self._dirty = True
+
+    def invalidate_all(self) -> None:
+        """Drops all cached rows, e.g. when format of rows changed"""
+        self._rows.clear()
+        self._dirty = True
+
+    def row(self, item: Any) -> List[str]:
+        row = self._rows.get(item.id)
+        if row is None:
+            row = self._rows[item.id] = self.format_row(item)
+            if len(self._rows) > self.cache_size:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(item.id)
+        return row
+
+    def get_visible_rows(self) -> List[List[str]]:
+        """Returns rows to display with their position numbers and marks table as up to date"""
+        stop = min(self.offset + self.visible_rows, len(self.source))
+        rows = [
+            [str(i + 1), *self.row(self.source[i])] for i in range(self.offset, stop)
+        ]
+        self._dirty = False
+        return rows
+
+    def item_at(self, row: int) -> Any:
+        """Returns item displayed in table `row`"""
+        return self.source[self.offset + row]
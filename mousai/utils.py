@@ -1,23 +1,46 @@
 from __future__ import annotations
 
+import os
+import sys
 from io import BytesIO
 from pathlib import Path
 
-from PIL import Image  # type: ignore
-
 
 def get_default_art_cover() -> bytes:
     p = Path(__file__).parent.resolve() / "assets/default.png"
     return p.read_bytes()
 
 
+def get_data_dir() -> Path:
+    """Returns per-user directory for mousai data files (caches, saved state), creating it if needed"""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData/Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library/Application Support"
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local/share")
+
+    data_dir = base / "mousai"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
 def playtime_to_str(value: int | float):
     """Returns string in `M:S` format from playtime in seconds"""
     m, s = divmod(round(value), 60)
     return f"{m}:{s:02}"
 
 
-def resize_img(image: BytesIO) -> bytes:
+def total_time_to_str(value: int | float) -> str:
+    """Returns string in `H:MM:SS` format from seconds, with days in front when its longer, e.g. `2 d 3:04:05`"""
+    m, s = divmod(round(value), 60)
+    h, m = divmod(m, 60)
+    d, h = divmod(h, 24)
+    text = f"{h}:{m:02}:{s:02}"
+    return f"{d} d {text}" if d else text
+
+
+def resize_img(image: BytesIO | bytes) -> bytes:
     """Resizes song cover art to fit into `Metadata` frame.
 
     Args:
@@ -26,10 +49,16 @@ def resize_img(image: BytesIO) -> bytes:
     Returns:
         Resized image
     """
+    # PIL is imported when first art is resized, it slows down app startup otherwise
+    from PIL import Image  # type: ignore
+
+    if isinstance(image, bytes):
+        image = BytesIO(image)
+
     img = Image.open(image)
     width, height = img.size
     scale = min(256 / height, 256 / width)
-    img = img.resize((int(width * scale), int(height * scale)), Image.ANTIALIAS)
+    img = img.resize((int(width * scale), int(height * scale)), Image.LANCZOS)
     b_img = BytesIO()
     img.save(b_img, format="PNG")
 
@@ -0,0 +1,42 @@
+import shutil
+
+from mousai.player.art_store import ArtStore
+from mousai.player.playlist import ArtRef, AudioMetaData, art_digest
+
+from conftest import TEST_FILE_PATH
+
+
+def test_art_is_read_on_demand(tmp_path):
+    copy_path = tmp_path / "copy.mp3"
+    shutil.copy(TEST_FILE_PATH, copy_path)
+    store = ArtStore()
+    refs = [AudioMetaData.from_file(p).art for p in (TEST_FILE_PATH, copy_path)]
+
+    assert len(store) == 0
+    assert refs[0].digest == refs[1].digest
+
+    data = [store.get(ref) for ref in refs]
+
+    # Same image from two files is stored once
+    assert data[0] == data[1]
+    assert art_digest(data[0]) == refs[0].digest
+    assert store.stats == (1, 1, 1, len(data[0]))
+
+
+def test_lru_eviction():
+    store = ArtStore(max_bytes=10)
+    first = store.put(b"a" * 4)
+    second = store.put(b"b" * 4)
+    store.get(ArtRef("", first))  # `first` is now most recently used
+    store.put(b"c" * 4)
+
+    assert first in store
+    assert second not in store
+    assert store.size == 8
+
+
+def test_missing_file():
+    store = ArtStore()
+
+    assert store.get(ArtRef("/does/not/exist.mp3", "digest")) is None
+    assert store.get(None) is None
@@ -1,6 +1,35 @@
+from types import SimpleNamespace
+
 import pytest
-from mousai.player.audio_player import AudioPlayer
-from mousai.player.playlist import PlaylistItem
+from mousai.player.audio_player import MUSIC_END_EVENT, AudioPlayer
+from mousai.player.playlist import PlayerError, Playlist, PlaylistItem
+from mousai.player.seek_index import build_seek_index
+
+from conftest import TEST_FILE_PATH
+
+
+class FakeMusic:
+    """Records `mixer.music` calls, mixer is not initialized in tests"""
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.data = None
+        self.pos = 0
+        self.volume = None
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append(name)
+
+    def load(self, source, format=None) -> None:
+        self.calls.append("load")
+        self.data = source.read()
+
+    def get_pos(self) -> int:
+        return self.pos
+
+    def set_volume(self, value: float) -> None:
+        self.calls.append("set_volume")
+        self.volume = value
 
 
 def test_add_to_history(audioplayer: AudioPlayer, test_file: PlaylistItem):
@@ -36,3 +65,149 @@ def test_get_next_song(audioplayer: AudioPlayer):
     last_item = audioplayer._queue[0]
 
     assert last_item is audioplayer.get_next_song()
+
+
+def test_queue_in_playlist_order(test_file: PlaylistItem):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(3)]
+    ap = AudioPlayer()
+    ap.playlist = Playlist(songs=items)
+    ap.current_song = items[1]
+
+    ap.set_shuffle(False)
+    ap.init_queue()
+
+    assert list(ap._queue)[:4] == [items[2], items[0], items[1], items[2]]
+
+
+def test_mixer_init_error_is_raised_when_waiting(monkeypatch):
+    def init():
+        raise RuntimeError("No audio device")
+
+    monkeypatch.setattr("mousai.player.audio_player.mixer.init", init)
+    player = AudioPlayer()
+    monkeypatch.setattr(player, "_enable_end_event", lambda: None)
+    player.init_mixer(background=True)
+
+    with pytest.raises(RuntimeError, match="No audio device"):
+        player.wait_ready()
+    assert player.ready
+
+
+def test_mixer_volume_includes_song_gain(test_file: PlaylistItem):
+    player = AudioPlayer()
+    player.volume = 0.1
+    player.current_song = PlaylistItem(
+        test_file.path, test_file.meta._replace(gain=6.0)
+    )
+
+    assert player.get_mixer_volume() == pytest.approx(0.2, abs=0.01)
+    player.normalize_volume = False
+    assert player.get_mixer_volume() == 0.1
+
+
+def test_play_previous(test_file: PlaylistItem, monkeypatch):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(3)]
+    ap = AudioPlayer()
+    ap.playlist = Playlist(songs=items)
+    monkeypatch.setattr(ap, "play", lambda: None)
+    monkeypatch.setattr(ap, "stop", lambda: None)
+    monkeypatch.setattr(ap, "set_volume", lambda value: None)
+
+    with pytest.raises(PlayerError):
+        ap.play_previous()
+
+    ap.change_song(items[0])
+    ap.change_song(items[1])
+    assert ap.play_previous() is items[0]
+    assert ap.current_song is items[0]
+    # song that was playing is played again next and not added to history
+    assert ap._queue[0] is items[1]
+    assert len(ap._history) == 0
+
+
+def test_seek(test_file: PlaylistItem, tmp_path, monkeypatch):
+    music = FakeMusic()
+    monkeypatch.setattr(
+        "mousai.player.audio_player.mixer", SimpleNamespace(music=music)
+    )
+    player = AudioPlayer()
+    player.current_song = test_file
+    player._queued_item = player._gapless_item = test_file
+    player.pause()
+    music.calls.clear()
+
+    # index is built in background, until its ready mixer seeks
+    assert player.seek(7.3) == 7.3
+    assert music.calls == ["set_pos"]
+    player.preloader.wait_idle()
+    music.calls.clear()
+
+    position = player.seek(7.3)
+
+    assert (position, music.data) == build_seek_index(TEST_FILE_PATH).read_from(
+        TEST_FILE_PATH, 7.3
+    )
+    assert 7 < position <= 7.3
+    # stays paused at new position
+    assert music.calls == ["stop", "load", "play", "pause", "set_volume"]
+    assert player.playback_paused
+    # song queued in mixer is dropped by loading new data
+    assert not player.started_gaplessly(test_file)
+    assert player._queued_item is None
+    music.pos = 500
+    assert player.get_playtime() == position * 1000 + 500
+
+    # files without index are seeked by mixer
+    unknown = tmp_path / "song.flac"
+    unknown.write_bytes(b"fLaC")
+    player.current_song = PlaylistItem(unknown, test_file.meta)
+    music.calls.clear()
+    assert player.seek(3) == 3
+    assert music.calls == ["set_pos"]
+    assert player.get_playtime() == 3000
+
+    player.current_song = None
+    with pytest.raises(PlayerError):
+        player.seek(1)
+    player.clean_up()
+
+
+def test_gapless_transition_gap_and_gain(test_file: PlaylistItem, monkeypatch):
+    music = FakeMusic()
+    clock = [100.0]
+    events = []
+    monkeypatch.setattr(
+        "mousai.player.audio_player.mixer", SimpleNamespace(music=music)
+    )
+    monkeypatch.setattr(
+        "mousai.player.audio_player.time",
+        SimpleNamespace(perf_counter=lambda: clock[0]),
+    )
+    monkeypatch.setattr("mousai.player.audio_player.pygame.event.get", lambda: events)
+    player = AudioPlayer()
+    player._end_event_enabled = True
+    first = PlaylistItem(test_file.path, test_file.meta._replace(playtime=10.0))
+    second = PlaylistItem(test_file.path, test_file.meta._replace(gain=-6.0))
+    player.current_song = first
+    player._queued_item = second
+
+    # first song started at 98.0, so it should end at 108.0
+    music.pos = 2000
+    assert not player.song_ended()
+
+    # mixer started queued song at 108.02, before end was noticed
+    clock[0] = 108.05
+    music.pos = 30
+    events.append(SimpleNamespace(type=MUSIC_END_EVENT))
+    assert player.song_ended()
+    assert player.started_gaplessly(second)
+    assert music.volume == pytest.approx(player.volume / 2, abs=0.001)
+    assert not player.transition_gaps
+
+    events.clear()
+    player.current_song = second
+    player.play()
+    clock[0] = 108.1
+    music.pos = 80
+    assert not player.song_ended()
+    assert player.last_transition_gap_ms == pytest.approx(20)
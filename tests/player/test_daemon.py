@@ -0,0 +1,135 @@
+import asyncio
+import shutil
+
+import pytest
+from conftest import TEST_FILE_PATH
+from mousai.player.audio_player import AudioPlayer
+from mousai.player.client import PlayerClient
+from mousai.player.daemon import PlayerDaemon
+from mousai.player.playlist import PlayerError, Playlist, PlaylistItem
+
+
+class FakeMixerPlayer(AudioPlayer):
+    """`AudioPlayer` with mixer calls replaced, mixer is not initialized in tests"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ended = False
+
+    def play(self) -> None:
+        self.playback_paused = False
+
+    def stop(self) -> None:
+        pass
+
+    def pause(self) -> None:
+        self.playback_paused = True
+
+    def song_ended(self) -> bool:
+        ended, self.ended = self.ended, False
+        return ended
+
+    def queue_next(self) -> None:
+        pass
+
+    def get_playtime(self) -> float:
+        return 1500
+
+    def set_volume(self, value: float) -> None:
+        self.volume = round(value, 2)
+
+
+@pytest.fixture
+def player(test_file: PlaylistItem) -> FakeMixerPlayer:
+    player = FakeMixerPlayer()
+    player.set_shuffle(False)
+    player.playlist = Playlist(
+        songs=[PlaylistItem(test_file.path, test_file.meta) for _ in range(3)]
+    )
+    return player
+
+
+def run_with_daemon(player, tmp_path, scenario):
+    async def run():
+        daemon = PlayerDaemon(player, tmp_path / "mousai.sock")
+        daemon.POLL_INTERVAL = 0.01
+        server = asyncio.ensure_future(daemon.serve())
+        while not daemon.socket_path.exists():
+            await asyncio.sleep(0.01)
+        try:
+            async with PlayerClient(daemon.socket_path) as client:
+                return await scenario(client)
+        finally:
+            daemon.stop()
+            await server
+
+    return asyncio.run(run())
+
+
+def test_play_pause_next_and_volume(player, tmp_path):
+    songs = list(player.playlist)
+
+    async def scenario(client: PlayerClient):
+        assert (await client.status())["state"] == "stopped"
+
+        status = await client.play()
+        assert status["state"] == "playing"
+        assert status["song"]["id"] == songs[0].id
+        assert status["position"] == 1.5
+
+        assert (await client.pause())["state"] == "paused"
+        assert (await client.play())["state"] == "playing"
+        assert (await client.next())["song"]["id"] == songs[1].id
+        assert await client.volume(0.3) == 0.3
+        assert await client.volume(5) == 1.0
+
+        queue = await client.queue(id=songs[0].id, next=True)
+        assert queue[0]["id"] == songs[0].id
+
+    run_with_daemon(player, tmp_path, scenario)
+    assert player.current_song is songs[1]
+
+
+def test_errors_are_returned_to_client(player, tmp_path):
+    async def scenario(client: PlayerClient):
+        with pytest.raises(PlayerError, match="Unknown command"):
+            await client.request("rewind")
+        with pytest.raises(PlayerError, match="No song with id"):
+            await client.play(id=-1)
+        with pytest.raises(PlayerError):
+            await client.play(path=str(tmp_path / "missing.mp3"))
+        # connection is still usable
+        return await client.status()
+
+    assert run_with_daemon(player, tmp_path, scenario)["state"] == "stopped"
+
+
+def test_subscribers_get_status_when_song_changes(player, tmp_path):
+    songs = list(player.playlist)
+
+    async def scenario(client: PlayerClient):
+        await client.play()
+        events = client.subscribe()
+        assert (await events.__anext__())["song"]["id"] == songs[0].id
+
+        player.ended = True
+        status = await asyncio.wait_for(events.__anext__(), timeout=5)
+        assert status["song"]["id"] == songs[1].id
+
+    run_with_daemon(player, tmp_path, scenario)
+
+
+def test_add_reports_files_that_cant_be_read(player, tmp_path):
+    music = tmp_path / "music"
+    music.mkdir()
+    shutil.copy(TEST_FILE_PATH, music / "song.mp3")
+    missing = [tmp_path / "missing.mp3", tmp_path / "missing.ogg"]
+
+    async def scenario(client: PlayerClient):
+        return await client.add([str(missing[0]), str(music), str(missing[1])])
+
+    result = run_with_daemon(player, tmp_path, scenario)
+    assert result["added"] == 1
+    assert [failure["path"] for failure in result["failed"]] == list(map(str, missing))
+    assert all(failure["error"] for failure in result["failed"])
+    assert len(player.playlist) == 4
@@ -0,0 +1,88 @@
+import shutil
+import wave
+
+from mousai.player.duplicates import DuplicateFinder, payload_range
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+from mousai.player.search import SearchIndex
+
+from conftest import TEST_FILE_PATH
+
+
+def make_item(path):
+    return PlaylistItem(path, AudioMetaData(path.name, 15))
+
+
+def test_copies_with_different_tags(tmp_path):
+    copy_path = tmp_path / "copy.mp3"
+    retagged_path = tmp_path / "retagged.mp3"
+    shutil.copy(TEST_FILE_PATH, copy_path)
+    # replacing ID3v2 tag with an empty one changes file but not the audio
+    start, _ = payload_range(str(TEST_FILE_PATH))
+    retagged_path.write_bytes(
+        b"ID3\3\0\0\0\0\1\0" + b"\0" * 128 + TEST_FILE_PATH.read_bytes()[start:]
+    )
+
+    items = [make_item(p) for p in (TEST_FILE_PATH, copy_path, retagged_path)]
+    finder = DuplicateFinder()
+
+    assert finder.find(items) == [items]
+    start, end = payload_range(str(retagged_path))
+    assert (start, end - start) == (138, 15264)
+
+
+def test_same_edges_different_audio(tmp_path):
+    start, end = payload_range(str(TEST_FILE_PATH))
+    data = bytearray(TEST_FILE_PATH.read_bytes())
+    data[(start + end) // 2] ^= 0xFF
+    changed_path = tmp_path / "changed.mp3"
+    changed_path.write_bytes(data)
+
+    finder = DuplicateFinder()
+    items = [make_item(TEST_FILE_PATH), make_item(changed_path)]
+
+    assert finder.find(items) == []
+    assert finder.stats.edges_hashed == 2
+    assert finder.stats.fully_hashed == 2
+
+
+def test_duration_and_size_filter_without_hashing(tmp_path):
+    short_path = tmp_path / "short.mp3"
+    short_path.write_bytes(TEST_FILE_PATH.read_bytes()[:-1000])
+
+    finder = DuplicateFinder()
+    items = [
+        make_item(TEST_FILE_PATH),
+        make_item(short_path),
+        PlaylistItem(TEST_FILE_PATH, AudioMetaData("other", 200)),
+    ]
+
+    # same path is a duplicate even though its duration differs
+    assert finder.find(items) == [[items[0], items[2]]]
+    assert finder.stats.edges_hashed == 0
+
+
+def test_wav_payload_range(tmp_path):
+    path = tmp_path / "song.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(b"\1\0" * 100)
+
+    assert payload_range(str(path)) == (44, 244)
+
+
+def test_remove_duplicates(tmp_path):
+    copy_path = tmp_path / "copy.mp3"
+    shutil.copy(TEST_FILE_PATH, copy_path)
+    original, copy = make_item(TEST_FILE_PATH), make_item(copy_path)
+    other = PlaylistItem(TEST_FILE_PATH, AudioMetaData("other", 15))
+    playlist = Playlist(songs=[other, original, copy, original])
+    index = SearchIndex(playlist)
+
+    groups = playlist.remove_duplicates()
+
+    assert groups == [[other, original, original, copy]]
+    assert playlist.songs == [other]
+    assert playlist.index(other.id) == 0
+    assert len(index) == 1
@@ -0,0 +1,85 @@
+import shutil
+import threading
+
+from mousai.player.importer import (
+    IMPORT_BATCH_EVENT,
+    IMPORT_CANCELLED_EVENT,
+    IMPORT_DONE_EVENT,
+    IMPORT_PROGRESS_EVENT,
+    LibraryImporter,
+    scan_audio_files,
+)
+
+from conftest import TEST_FILE_PATH
+
+
+def make_library(root, count=3):
+    (root / "b" / "nested").mkdir(parents=True)
+    (root / "a").mkdir()
+    (root / "a" / "cover.jpg").write_bytes(b"")
+    (root / "notes.txt").write_text("")
+    for i in range(count):
+        shutil.copy(TEST_FILE_PATH, root / "b" / "nested" / f"{i}.mp3")
+    (root / "a" / "song.OGG").write_bytes(b"")
+    (root / "a" / "missing.mp3").symlink_to(root / "does-not-exist.mp3")
+
+
+def test_scan_audio_files(tmp_path):
+    make_library(tmp_path)
+
+    paths = list(scan_audio_files(tmp_path))
+
+    assert [p.relative_to(tmp_path).as_posix() for p in paths] == [
+        "a/missing.mp3",
+        "a/song.OGG",
+        "b/nested/0.mp3",
+        "b/nested/1.mp3",
+        "b/nested/2.mp3",
+    ]
+
+
+def test_importer_emits_batches(tmp_path):
+    make_library(tmp_path, count=5)
+    events = []
+    importer = LibraryImporter(
+        scan_audio_files(tmp_path),
+        lambda event, value: events.append((event, value)),
+        max_workers=2,
+        batch_size=2,
+    )
+    importer.start()
+    importer.join(timeout=10)
+
+    batches = [value for event, value in events if event == IMPORT_BATCH_EVENT]
+    progress = [value for event, value in events if event == IMPORT_PROGRESS_EVENT]
+    event, result = events[-1]
+
+    assert event == IMPORT_DONE_EVENT
+    assert sum(len(batch) for batch in batches) == result.added == 6
+    assert all(len(batch) <= 2 for batch in batches[:-1])
+    assert [path.name for path, _ in result.failed] == ["missing.mp3"]
+    assert progress[-1].done == progress[-1].total == 7
+
+
+def test_importer_cancel(tmp_path):
+    make_library(tmp_path, count=5)
+    events = []
+    first_batch = threading.Event()
+
+    def emit(event, value):
+        events.append((event, value))
+        if event == IMPORT_BATCH_EVENT:
+            first_batch.set()
+            importer.cancel()
+
+    importer = LibraryImporter(
+        scan_audio_files(tmp_path), emit, max_workers=1, batch_size=1
+    )
+    importer.start()
+    importer.join(timeout=10)
+
+    event, result = events[-1]
+    assert first_batch.is_set()
+    assert event == IMPORT_CANCELLED_EVENT
+    assert result.cancelled
+    assert result.added < 5
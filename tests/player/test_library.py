@@ -0,0 +1,80 @@
+import os
+import queue
+import shutil
+import time
+
+import pytest
+from mousai.player.library import (
+    LibraryChanges,
+    LibraryWatcher,
+    PathIndex,
+    apply_library_changes,
+)
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+
+from conftest import TEST_FILE_PATH
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def watcher(request):
+    changes = queue.Queue()
+    watcher = LibraryWatcher(
+        lambda event, value: changes.put(value),
+        poll_interval=0.1,
+        use_inotify=request.param,
+    )
+    watcher.DEBOUNCE = 0.1
+    watcher.changes = changes
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def add_root(watcher, root):
+    watcher.add_root(root)
+    deadline = time.monotonic() + 5
+    while not watcher.roots and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_reports_changed_files_only(watcher, tmp_path):
+    existing = tmp_path / "a.mp3"
+    shutil.copy(TEST_FILE_PATH, existing)
+    add_root(watcher, tmp_path)
+
+    (tmp_path / "sub").mkdir()
+    new = tmp_path / "sub" / "b.mp3"
+    shutil.copy(TEST_FILE_PATH, new)
+    (tmp_path / "cover.jpg").write_bytes(b"not audio")
+    changes = watcher.changes.get(timeout=5)
+    assert [item.path for item in changes.added] == [new]
+    assert changes.updated == changes.removed == []
+
+    os.utime(existing, ns=(1, 1))
+    changes = watcher.changes.get(timeout=5)
+    assert [item.path for item in changes.updated] == [existing]
+
+    new.unlink()
+    changes = watcher.changes.get(timeout=5)
+    assert changes.removed == [str(new)]
+    assert watcher.changes.empty()
+
+
+def test_apply_library_changes(test_file):
+    kept = PlaylistItem("/music/kept.mp3", test_file.meta)
+    changed = PlaylistItem("/music/changed.mp3", test_file.meta)
+    deleted = PlaylistItem("/music/deleted.mp3", test_file.meta)
+    playlist = Playlist(songs=[kept, changed, deleted])
+    paths = PathIndex(playlist)
+
+    updated = PlaylistItem("/music/changed.mp3", AudioMetaData("changed.mp3", 1))
+    added = PlaylistItem("/music/new.mp3", test_file.meta)
+    apply_library_changes(
+        playlist,
+        paths,
+        LibraryChanges([added], [updated], ["/music/deleted.mp3"]),
+    )
+
+    assert playlist.songs == [kept, updated, added]
+    assert paths.get("/music/changed.mp3") == [updated]
+    assert paths.get("/music/deleted.mp3") == []
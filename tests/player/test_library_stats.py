@@ -0,0 +1,62 @@
+import pytest
+
+from mousai.player.library_stats import GroupStats, LibraryStats
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+
+
+def make_item(title, artist=None, album=None, genre=None, playtime=60.1):
+    return PlaylistItem(
+        f"/music/{title}.mp3",
+        AudioMetaData(f"{title}.mp3", playtime, artist, album, title, genre),
+    )
+
+
+def test_groups_follow_playlist():
+    playlist = Playlist(
+        songs=[
+            make_item("Something", "The Beatles", "Abbey Road", "Rock", 182.5),
+            make_item("Come Together", "The Beatles", "Abbey Road", "Rock", 259),
+            make_item("Halo", "Beyoncé", genre="Pop", playtime=None),
+        ]
+    )
+    stats = LibraryStats(playlist)
+    playlist.add(make_item("Hello", playtime=295))
+
+    assert stats.total == GroupStats(None, 4, 736.5)
+    assert stats.unknown_duration == 1
+    assert stats.count("artist") == 2
+    assert stats.groups("artist") == [
+        GroupStats("Beyoncé", 1, 0.0),
+        GroupStats("The Beatles", 2, 441.5),
+        # songs without artist are last
+        GroupStats(None, 1, 295.0),
+    ]
+    assert stats.group("album", "Abbey Road") == GroupStats("Abbey Road", 2, 441.5)
+
+    # retagged song replaces old one
+    playlist[0] = make_item("Something", "George Harrison", "Abbey Road", "Rock", 182.5)
+    playlist.remove_item(playlist[1].id)
+
+    assert stats.total == GroupStats(None, 3, 477.5)
+    assert stats.group("artist", "The Beatles") is None
+    assert stats.group("album", "Abbey Road") == GroupStats("Abbey Road", 1, 182.5)
+    assert stats.item_ids("album", "Abbey Road") == [playlist[0].id]
+    assert stats.item_ids("genre", "Rock") == [playlist[0].id]
+
+
+def test_copies_and_errors():
+    item = make_item("Song", "Artist", playtime=0.1)
+    playlist = Playlist(songs=[item, item, item])
+    stats = LibraryStats(playlist)
+
+    playlist.remove(0)
+    playlist.remove(0)
+
+    assert stats.group("artist", "Artist") == GroupStats("Artist", 1, 0.1)
+    assert stats.item_ids("artist", "Artist") == [item.id]
+
+    playlist.remove(0)
+    assert stats.total == GroupStats(None, 0, 0.0)
+    assert stats.groups("artist") == []
+    with pytest.raises(ValueError):
+        stats.groups("title")
@@ -0,0 +1,75 @@
+import wave
+
+import pytest
+from mousai.player.loudness import (
+    LOUDNESS_DONE_EVENT,
+    LOUDNESS_PROGRESS_EVENT,
+    SILENCE_DB,
+    LoudnessAnalyzer,
+    TrackLoudness,
+    measure,
+)
+from mousai.player.metadata_cache import MetadataCache
+from mousai.player.playlist import PlaylistItem
+
+np = pytest.importorskip("numpy")
+
+SAMPLE_RATE = 8000
+
+
+def sine(seconds, amplitude, channels=2):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    wave = amplitude * np.sin(2 * np.pi * 440 * t)
+    return np.repeat(wave[:, None], channels, axis=1).astype(np.float32)
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples * 32767).astype("<i2").tobytes())
+
+
+def test_measure_sine():
+    result = measure(sine(2, 0.5), SAMPLE_RATE)
+
+    # RMS of sine is amplitude / sqrt(2)
+    assert result.loudness == pytest.approx(-9.03, abs=0.05)
+    assert result.peak == pytest.approx(0.5, abs=0.01)
+    assert result.gain(-18) == pytest.approx(-8.97, abs=0.05)
+
+
+def test_silence_does_not_change_loudness():
+    song = sine(2, 0.1)
+    with_silence = np.concatenate([np.zeros((SAMPLE_RATE * 4, 2)), song])
+
+    assert measure(with_silence, SAMPLE_RATE).loudness == pytest.approx(
+        measure(song, SAMPLE_RATE).loudness, abs=0.1
+    )
+    silent = measure(np.zeros((SAMPLE_RATE, 2)), SAMPLE_RATE)
+    assert silent == TrackLoudness(SILENCE_DB, 0.0)
+    assert silent.gain() == 0.0
+
+
+def test_analyzer_saves_gain_in_cache(tmp_path):
+    quiet, broken = tmp_path / "quiet.wav", tmp_path / "broken.wav"
+    write_wav(quiet, sine(1, 0.05))
+    broken.write_bytes(b"RIFF not really a wav file")
+    cache = MetadataCache()
+    items = [PlaylistItem(quiet, cache.load(quiet)), PlaylistItem.from_file(broken)]
+    events = []
+
+    analyzer = LoudnessAnalyzer(
+        items, lambda *event: events.append(event), max_workers=1, cache=cache
+    )
+    analyzer.start()
+    analyzer.join(timeout=60)
+
+    assert events[-2] == (LOUDNESS_PROGRESS_EVENT, (2, 2, 1))
+    event, result = events[-1]
+    assert event == LOUDNESS_DONE_EVENT
+    # sine with 0.05 amplitude is around -29 dBFS
+    assert result.gains[items[0].id] == pytest.approx(11, abs=0.5)
+    assert [path for path, _ in result.failed] == [str(broken)]
+    assert cache.get(quiet).gain == result.gains[items[0].id]
@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import pytest
+from mousai.player.metadata_cache import MetadataCache
+from mousai.player.playlist import AudioMetaData, PlaylistItem
+
+from conftest import TEST_FILE_PATH
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "song.mp3"
+    shutil.copy(TEST_FILE_PATH, path)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MetadataCache(tmp_path / "cache" / "metadata.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_load_miss_then_hit(cache: MetadataCache, audio_file, monkeypatch):
+    parsed = cache.load(audio_file)
+    assert cache.stats == (0, 1, 0)
+
+    def fail(path):
+        raise AssertionError("audio file should not be parsed on cache hit")
+
+    monkeypatch.setattr(AudioMetaData, "from_file", fail)
+    cached = cache.load(audio_file)
+
+    assert cache.stats == (1, 1, 0)
+    assert cached == parsed
+
+
+def test_stale_entry_is_parsed_again(cache: MetadataCache, audio_file):
+    cache.load(audio_file)
+    st = audio_file.stat()
+    os.utime(audio_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    cache.load(audio_file)
+
+    assert cache.stats == (0, 2, 1)
+    assert cache.get(audio_file) is not None
+    assert len(cache) == 1
+
+
+def test_persists_between_instances(tmp_path, audio_file):
+    db_path = tmp_path / "metadata.sqlite3"
+    cache = MetadataCache(db_path)
+    cache.load(audio_file)
+    cache.close()
+
+    cache = MetadataCache(db_path)
+    item = PlaylistItem.from_file(audio_file, cache=cache)
+
+    assert cache.stats.hits == 1
+    assert item.meta.title == "15 Seconds of Silence"
+    cache.close()
@@ -0,0 +1,63 @@
+import json
+
+from mousai.player.perf import Histogram, PerfStats
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for ms in [0.3] * 90 + [7.0] * 9 + [40.0]:
+        histogram.add(ms)
+
+    assert histogram.count == 100
+    assert histogram.min == 0.3
+    assert histogram.max == 40.0
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(99) == 10
+    assert histogram.percentile(100) == 40.0
+
+
+def test_disabled_stats_record_nothing():
+    stats = PerfStats(enabled=False)
+    func = stats.timed("func")(lambda x: x * 2)
+
+    assert func(2) == 4
+    stats.record("other", 1.0)
+    stats.stop("span", stats.start())
+    stats.mark("click")
+    stats.record_since("click_to_audio", "click")
+
+    assert stats.snapshot()["metrics"] == {}
+
+
+def test_enabled_stats_record_calls_and_spans():
+    stats = PerfStats(enabled=True)
+    func = stats.timed("func")(lambda x: x * 2)
+
+    for i in range(3):
+        assert func(i) == i * 2
+    stats.stop("span", stats.start())
+    stats.mark("click")
+    stats.record_since("click_to_audio", "click")
+    # mark is used once
+    stats.record_since("click_to_audio", "click")
+
+    metrics = json.loads(stats.to_json())["metrics"]
+    assert metrics["func"]["count"] == 3
+    assert metrics["span"]["count"] == 1
+    assert metrics["click_to_audio"]["count"] == 1
+
+    stats.reset()
+    assert stats.get("func") is None
+
+
+def test_export(tmp_path):
+    stats = PerfStats(enabled=True)
+    stats.record("audio_player.load", 12.5)
+    path = tmp_path / "stats.json"
+
+    stats.export(path)
+
+    data = json.loads(path.read_text())
+    assert data["metrics"]["audio_player.load"]["mean_ms"] == 12.5
+    assert data["metrics"]["audio_player.load"]["buckets"] == {"16": 1}
+    assert len(stats.summary()) == 2
@@ -0,0 +1,63 @@
+import pytest
+from mousai.player.play_queue import PlayQueue
+from mousai.player.playlist import AudioMetaData, PlaylistItem
+
+
+@pytest.fixture
+def items():
+    return [
+        PlaylistItem(f"/music/{i}.mp3", AudioMetaData(f"{i}.mp3")) for i in range(5)
+    ]
+
+
+def test_deque_like_ends(items):
+    queue = PlayQueue(maxlen=3)
+    for item in items[:3]:
+        queue.append(item)
+    queue.append(items[3])
+    # like deque with maxlen, item from the other end is dropped
+    assert list(queue) == items[1:4]
+
+    queue.appendleft(items[4])
+    assert queue[0] is items[4]
+    assert queue[-1] is items[2]
+    assert queue.popleft() is items[4]
+    assert queue.pop() is items[2]
+    assert list(queue) == [items[1]]
+
+    queue.clear()
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.popleft()
+
+
+def test_remove_and_move_to_front(items):
+    queue = PlayQueue()
+    for item in items + items[:2]:
+        queue.append(item)
+
+    assert queue.remove(items[0].id) == 2
+    assert items[0] not in queue
+    assert queue.remove(items[0].id) == 0
+
+    # other copy of moved item is dropped
+    assert queue.move_to_front(items[1].id) is items[1]
+    assert list(queue) == [items[1], items[2], items[3], items[4]]
+
+    with pytest.raises(KeyError):
+        queue.move_to_front(items[0].id)
+
+
+def test_pages_follow_changes(items):
+    queue = PlayQueue()
+    for item in items:
+        queue.append(item)
+
+    assert queue.page(0, 2) == items[:2]
+    assert queue.page(4, 2) == items[4:]
+    assert queue[2] is items[2]
+    version = queue.version
+
+    queue.remove(items[2].id)
+    assert queue.version > version
+    assert queue.page(2, 2) == items[3:]
@@ -1,3 +1,9 @@
+import random
+
+import pytest
+from mousai.player.playlist import Playlist, PlaylistItem
+
+
 def test_init_with_songs(dummy_playlist_with_items, test_file):
     assert dummy_playlist_with_items.songs == [test_file for _ in range(10)]
 
@@ -16,3 +22,81 @@ def test_remove(dummy_playlist_with_items, test_file):
     dummy_playlist_with_items.remove(1)
 
     assert len(dummy_playlist_with_items.songs) == length - 1
+
+
+def test_remove_item_by_id(test_file):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(5)]
+    playlist = Playlist(songs=items)
+
+    removed = playlist.remove_item(items[1].id)
+
+    assert removed is items[1]
+    assert len(playlist) == 4
+    assert items[1] not in playlist
+    assert list(playlist) == [items[0], *items[2:]]
+    assert playlist.get(items[3].id) is items[3]
+    assert playlist.index(items[3].id) == 2
+    assert playlist[2] is items[3]
+
+    with pytest.raises(KeyError):
+        playlist.remove_item(items[1].id)
+
+
+def test_setitem(test_file):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(3)]
+    playlist = Playlist(songs=items[:2])
+
+    playlist[-1] = items[2]
+
+    assert playlist.songs == [items[0], items[2]]
+    assert items[1] not in playlist
+    assert playlist.index(items[2].id) == 1
+
+
+def test_copies_of_item(test_file):
+    other = PlaylistItem(test_file.path, test_file.meta)
+    playlist = Playlist(songs=[test_file, other, test_file, test_file])
+
+    playlist.remove(0)
+    assert test_file in playlist
+    assert playlist.index(test_file.id) == 1
+
+    playlist[1] = other
+    assert playlist.get(test_file.id) is test_file
+    assert playlist.remove_item(test_file.id) is test_file
+    assert test_file not in playlist
+    assert playlist.songs == [other, other]
+
+    with pytest.raises(KeyError):
+        playlist.get(test_file.id)
+
+
+def test_get_random_item_skips_removed(test_file):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(3)]
+    playlist = Playlist(songs=items)
+    playlist.remove_item(items[0].id)
+    playlist.remove_item(items[2].id)
+
+    assert all(playlist.get_random_item() is items[1] for _ in range(10))
+
+
+def test_positions_with_empty_slots(test_file):
+    items = [PlaylistItem(test_file.path, test_file.meta) for _ in range(20)]
+    playlist = Playlist(songs=items)
+    expected = list(items)
+    rng = random.Random(0)
+
+    for _ in range(8):
+        position = rng.randrange(len(expected))
+        playlist.remove(position)
+        del expected[position]
+        playlist.remove_item(expected.pop(rng.randrange(len(expected))).id)
+
+        assert [playlist[i] for i in range(len(playlist))] == expected
+        assert playlist[-1] is expected[-1]
+        assert [playlist.index(item.id) for item in expected] == list(
+            range(len(expected))
+        )
+
+    with pytest.raises(IndexError):
+        playlist[len(expected)]
@@ -0,0 +1,87 @@
+import pytest
+from mousai.player.importer import IMPORT_BATCH_EVENT, LibraryImporter
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+from mousai.player.playlist_file import (
+    PlaylistFileError,
+    PlaylistFileReader,
+    save_playlist,
+)
+
+
+@pytest.fixture
+def playlist(test_file):
+    return Playlist(
+        songs=[
+            test_file,
+            PlaylistItem(
+                "/music/zażółć.mp3", AudioMetaData("zażółć.mp3", 12.5, gain=-3.5)
+            ),
+            PlaylistItem(test_file.path, test_file.meta),
+        ]
+    )
+
+
+def test_save_and_load(tmp_path, playlist):
+    path = tmp_path / "playlist.mpl"
+
+    assert save_playlist(playlist, path) == 3
+
+    with PlaylistFileReader(path) as reader:
+        items = list(reader)
+
+    assert len(items) == 3
+    for original, loaded in zip(playlist, items):
+        assert loaded.path == original.path
+        assert loaded.meta == original.meta
+        assert loaded.added == original.added
+    # strings are decoded once and shared
+    assert items[0].meta.title is items[2].meta.title
+
+
+def test_iter_batches(tmp_path, playlist):
+    path = tmp_path / "playlist.mpl"
+    save_playlist(playlist, path)
+
+    with PlaylistFileReader(path) as reader:
+        assert [len(batch) for batch in reader.iter_batches(2)] == [2, 1]
+        assert reader.read_item(1).meta.file_name == "zażółć.mp3"
+        with pytest.raises(IndexError):
+            reader.read_item(3)
+
+
+@pytest.mark.parametrize("content", [b"", b"not a playlist file at all" * 10])
+def test_invalid_file(tmp_path, content):
+    path = tmp_path / "playlist.mpl"
+    path.write_bytes(content)
+
+    with pytest.raises(PlaylistFileError):
+        PlaylistFileReader(path)
+
+
+def test_truncated_file(tmp_path, playlist):
+    path = tmp_path / "playlist.mpl"
+    save_playlist(playlist, path)
+    path.write_bytes(path.read_bytes()[:100])
+
+    with pytest.raises(PlaylistFileError):
+        PlaylistFileReader(path)
+
+
+def test_import_streams_items(tmp_path, playlist):
+    path = tmp_path / "playlist.mpl"
+    save_playlist(playlist, path)
+    reader = PlaylistFileReader(path)
+    events = []
+
+    importer = LibraryImporter(
+        iter(reader),
+        lambda event, value: events.append((event, value)),
+        total=len(reader),
+        batch_size=2,
+    )
+    importer.start()
+    importer.join(timeout=10)
+    reader.close()
+
+    batches = [value for event, value in events if event == IMPORT_BATCH_EVENT]
+    assert [len(batch) for batch in batches] == [2, 1]
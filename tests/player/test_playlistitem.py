@@ -1,3 +1,5 @@
+import pickle
+
 from mousai.player.playlist import AudioMetaData, PlaylistItem
 
 from conftest import TEST_FILE_PATH
@@ -16,3 +18,20 @@ def test_str_meta_title_artist_is_none():
     item = PlaylistItem(__file__, meta_data=dummy_meta_data)
 
     assert str(item) == "test.mp3"
+
+
+def test_unpickled_item_gets_new_id(test_file: PlaylistItem):
+    copy = pickle.loads(pickle.dumps(test_file))
+
+    assert copy.id != test_file.id
+    assert copy.path == test_file.path
+    assert copy.meta == test_file.meta
+
+
+def test_repeated_metadata_is_shared():
+    items = [
+        PlaylistItem(f"{i}.mp3", AudioMetaData(f"{i}.mp3", artist="".join(["A", "b"])))
+        for i in range(2)
+    ]
+
+    assert items[0].meta.artist is items[1].meta.artist
@@ -0,0 +1,39 @@
+from mousai.player.playlist import PlaylistItem
+from mousai.player.preloader import TrackPreloader
+
+from conftest import TEST_FILE_PATH
+
+
+def test_preloads_requested_song(test_file: PlaylistItem):
+    preloader = TrackPreloader()
+    assert preloader.get(test_file) is None
+
+    preloader.request(test_file)
+    preloader.wait_idle()
+
+    assert preloader.get(test_file) == TEST_FILE_PATH.read_bytes()
+    preloader.close()
+
+
+def test_keeps_only_last_requested_song(test_file: PlaylistItem):
+    other = PlaylistItem(test_file.path, test_file.meta)
+    preloader = TrackPreloader()
+
+    preloader.request(test_file)
+    preloader.request(other)
+    preloader.wait_idle()
+
+    assert preloader.get(test_file) is None
+    assert preloader.get(other) is not None
+    preloader.close()
+
+
+def test_missing_file(tmp_path, test_file: PlaylistItem):
+    missing = PlaylistItem(tmp_path / "missing.mp3", test_file.meta)
+    preloader = TrackPreloader()
+
+    preloader.request(missing)
+    preloader.wait_idle()
+
+    assert preloader.get(missing) is None
+    preloader.close()
@@ -0,0 +1,59 @@
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+from mousai.player.search import SearchIndex, fold
+
+
+def make_item(title, artist=None, album=None, genre=None):
+    return PlaylistItem(
+        f"/music/{title}.mp3",
+        AudioMetaData(f"{title}.mp3", 60, artist, album, title, genre),
+    )
+
+
+def test_fold():
+    assert fold("Beyoncé") == "beyonce"
+    assert fold("MOTÖRHEAD") == "motorhead"
+
+
+def test_prefix_and_token_matching():
+    items = [
+        make_item("Come Together", "The Beatles", "Abbey Road", "Rock"),
+        make_item("Something", "The Beatles", "Abbey Road", "Rock"),
+        make_item("Halo", "Beyoncé", "I Am... Sasha Fierce", "Pop"),
+    ]
+    index = SearchIndex(Playlist(songs=items))
+
+    assert list(index.search("beat abb")) == items[:2]
+    assert list(index.search("SOMETH")) == [items[1]]
+    assert list(index.search("beyonce")) == [items[2]]
+    assert list(index.search("pop rock")) == []
+    assert len(index.search("  ")) == 0
+
+
+def test_updates_with_playlist():
+    items = [make_item("Halo", "Beyoncé"), make_item("Hello", "Adele")]
+    playlist = Playlist(songs=items[:1])
+    index = SearchIndex(playlist)
+
+    playlist.add(items[1])
+    assert list(index.search("h")) == items
+
+    playlist.remove_item(items[0].id)
+    assert list(index.search("h")) == [items[1]]
+    assert len(index.search("halo")) == 0
+
+    replacement = make_item("Skyfall", "Adele")
+    playlist[0] = replacement
+    assert list(index.search("adele")) == [replacement]
+
+
+def test_item_added_twice():
+    item = make_item("Halo")
+    playlist = Playlist(songs=[item, item])
+    index = SearchIndex(playlist)
+
+    playlist.remove(0)
+    assert list(index.search("halo")) == [item]
+
+    playlist.remove(0)
+    assert len(index.search("halo")) == 0
+    assert len(index) == 0
@@ -0,0 +1,142 @@
+import os
+import shutil
+import struct
+import wave
+
+import pytest
+from mousai.player.seek_index import (
+    FrameIndex,
+    PageIndex,
+    SampleIndex,
+    SeekIndexCache,
+    SeekIndexError,
+    build_seek_index,
+)
+
+from conftest import TEST_FILE_PATH
+
+
+def ogg_page(granule, body, sequence):
+    lacing = [255] * (len(body) // 255) + [len(body) % 255]
+    header = struct.pack(
+        "<4sBBqIIIB", b"OggS", 0, 0, granule, 1, sequence, 0, len(lacing)
+    )
+    return header + bytes(lacing) + body
+
+
+def test_mp3_frames():
+    index = build_seek_index(TEST_FILE_PATH)
+    data = TEST_FILE_PATH.read_bytes()
+
+    assert isinstance(index, FrameIndex)
+    assert index.duration == pytest.approx(15.3, abs=0.1)
+    time, offset = index.locate(7.3)
+    assert 7.3 - index.frame_duration < time <= 7.3
+    assert data[offset] == 0xFF
+    # position past the end plays last frame
+    assert index.locate(100).offset == index.offsets[-1]
+
+
+def test_ogg_pages(tmp_path):
+    identification = b"\x01vorbis" + struct.pack("<IBI", 0, 1, 8000) + bytes(15)
+    pages = [
+        ogg_page(0, identification, 0),
+        ogg_page(0, b"\x03vorbis comments", 1),
+        ogg_page(8000, b"a" * 300, 2),
+        ogg_page(-1, b"b" * 300, 3),
+        ogg_page(24000, b"c" * 300, 4),
+        ogg_page(32000, b"d" * 300, 5),
+    ]
+    path = tmp_path / "song.ogg"
+    path.write_bytes(b"".join(pages))
+
+    index = build_seek_index(path)
+
+    assert isinstance(index, PageIndex)
+    assert index.duration == 4.0
+    # page after the one without granule cant be a seek point
+    assert list(index.times) == [0.0, 1.0, 3.0]
+    time, data = index.read_from(path, 3.5)
+    assert time == 3.0
+    assert data == b"".join(pages[:2] + pages[5:])
+
+    # mixer reads file object in chunks, header pages and the rest are joined without copying the file
+    time, stream = index.open_from(path.read_bytes(), 3.5)
+    headers = len(pages[0] + pages[1])
+    stream.seek(headers - 2)
+    assert stream.read(4) == (pages[1][-2:] + pages[5][:2])
+    assert stream.seek(0, os.SEEK_END) == headers + len(pages[5])
+
+    restored = PageIndex.from_bytes(index.to_bytes())
+    assert (restored.headers, restored.times, restored.offsets) == (
+        index.headers,
+        index.times,
+        index.offsets,
+    )
+
+
+def test_wav_samples(tmp_path):
+    path = tmp_path / "song.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(b"".join(struct.pack("<hh", i, -i) for i in range(16000)))
+
+    index = build_seek_index(path)
+    time, data = index.read_from(path, 1.25)
+
+    assert isinstance(index, SampleIndex)
+    assert index.duration == 2.0
+    assert SampleIndex.from_bytes(index.to_bytes()).to_bytes() == index.to_bytes()
+    assert time == 1.25
+    sliced = tmp_path / "sliced.wav"
+    sliced.write_bytes(data)
+    with wave.open(str(sliced)) as f:
+        assert f.getnframes() == 6000
+        assert struct.unpack("<hh", f.readframes(1)) == (10000, -10000)
+
+
+def test_unsupported_file(tmp_path):
+    path = tmp_path / "song.wav"
+    path.write_bytes(b"not a wav file")
+
+    with pytest.raises(SeekIndexError):
+        build_seek_index(path)
+
+
+def test_cache_rebuilds_changed_file(tmp_path):
+    path = tmp_path / "song.mp3"
+    shutil.copy(TEST_FILE_PATH, path)
+    cache = SeekIndexCache(max_entries=1)
+
+    index = cache.get(path)
+    assert cache.get(path) is index
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path) is not index
+    assert len(cache) == 1
+
+
+def test_cache_stores_indexes_on_disk(tmp_path, monkeypatch):
+    path = tmp_path / "song.mp3"
+    shutil.copy(TEST_FILE_PATH, path)
+    db_path = tmp_path / "seek_index.sqlite3"
+    cache = SeekIndexCache(db_path=db_path)
+    assert cache.peek(path) is None
+    index = cache.get(path)
+    assert cache.peek(path) is index
+    cache.close()
+
+    def build(path):
+        raise AssertionError("index was built again")
+
+    monkeypatch.setattr("mousai.player.seek_index.build_seek_index", build)
+    cache = SeekIndexCache(db_path=db_path)
+    restored = cache.get(path)
+    cache.close()
+
+    assert isinstance(restored, FrameIndex)
+    assert restored.offsets == index.offsets
+    assert restored.locate(7.3) == index.locate(7.3)
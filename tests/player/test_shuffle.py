@@ -0,0 +1,77 @@
+import random
+
+import pytest
+from mousai.player.playlist import AudioMetaData, PlayerError, Playlist, PlaylistItem
+from mousai.player.shuffle import WEIGHT_PLAY_COUNT, ShuffleEngine
+
+
+def make_items(count, artists=None):
+    return [
+        PlaylistItem(
+            f"/music/{i}.mp3",
+            AudioMetaData(
+                f"{i}.mp3", 60, artists[i % len(artists)] if artists else None
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def test_no_repeats_within_cycle():
+    items = make_items(50)
+    engine = ShuffleEngine(Playlist(songs=items), rng=random.Random(1))
+
+    first_cycle = [engine.pick() for _ in range(50)]
+    assert set(item.id for item in first_cycle) == set(item.id for item in items)
+    assert engine.remaining == 0
+
+    engine.pick()
+    assert engine.remaining == 49
+
+
+def test_songs_added_and_removed_mid_cycle():
+    items = make_items(10)
+    playlist = Playlist(songs=items[:5])
+    engine = ShuffleEngine(playlist, rng=random.Random(2))
+
+    picked = [engine.pick() for _ in range(2)]
+    for item in items[5:]:
+        playlist.add(item)
+    removed = next(item for item in items[:5] if item not in picked)
+    playlist.remove_item(removed.id)
+
+    rest = [engine.pick() for _ in range(engine.remaining)]
+    assert removed not in rest
+    assert len(picked) + len(rest) == 9
+    assert set(picked + rest) == set(items) - {removed}
+
+
+def test_empty_playlist():
+    with pytest.raises(PlayerError):
+        ShuffleEngine(Playlist()).pick()
+
+
+def test_artist_spacing():
+    items = make_items(40, artists=["A", "B", "C", "D"])
+    engine = ShuffleEngine(
+        Playlist(songs=items), artist_spacing=2, rng=random.Random(3)
+    )
+
+    artists = [engine.pick().meta.artist for _ in range(20)]
+    assert all(artists[i] not in artists[i - 2 : i] for i in range(2, 20))
+
+
+def test_play_count_weighting():
+    items = make_items(2)
+    engine = ShuffleEngine(
+        Playlist(songs=items), weighting=WEIGHT_PLAY_COUNT, rng=random.Random(4)
+    )
+    for _ in range(100):
+        engine.record_play(items[0])
+
+    firsts = []
+    for _ in range(50):
+        engine.reset_cycle()
+        firsts.append(engine.pick())
+
+    assert firsts.count(items[1]) > 40
@@ -0,0 +1,83 @@
+import pytest
+
+from mousai.player.playlist import AudioMetaData, Playlist, PlaylistItem
+from mousai.player.sorting import SortIndex
+
+
+def make_item(title, artist=None, album=None, playtime=60):
+    return PlaylistItem(
+        f"/music/{title}.mp3",
+        AudioMetaData(f"{title}.mp3", playtime, artist, album, title, None),
+    )
+
+
+def titles(items):
+    return [item.meta.title for item in items]
+
+
+def test_multi_key_order():
+    items = [
+        make_item("Something", "The Beatles", "Abbey Road", 182),
+        make_item("halo", "Beyoncé", playtime=None),
+        make_item("Come Together", "The Beatles", "Abbey Road", 259),
+        make_item("Hello", None, playtime=295),
+        make_item("Help!", "The Beatles", "Help!", 138),
+    ]
+    index = SortIndex(Playlist(songs=items))
+
+    # missing artist is last, same artist is sorted by album and title
+    assert titles(index.sorted("artist")) == [
+        "halo",
+        "Come Together",
+        "Something",
+        "Help!",
+        "Hello",
+    ]
+    # case is ignored
+    assert titles(index.sorted("title"))[:3] == ["Come Together", "halo", "Hello"]
+    # missing duration is last
+    assert titles(index.sorted("duration"))[-1] == "halo"
+
+    with pytest.raises(ValueError):
+        index.sorted("bpm")
+
+
+def test_reverse():
+    items = [make_item(title) for title in ("b", "c", "a")]
+    index = SortIndex(Playlist(songs=items))
+
+    ascending = index.sorted("title")
+    descending = index.sorted("title", reverse=True)
+    assert descending.ids is ascending.ids
+    assert titles(descending) == ["c", "b", "a"]
+    assert descending[0] is items[1]
+    assert descending[-1] is items[2]
+    assert titles(descending[1:]) == ["b", "a"]
+
+
+@pytest.mark.parametrize("changed", [1, 20])
+def test_updates_with_playlist(changed):
+    # few changes are merged into cached order, many sort it again
+    items = [make_item(f"song {i:03}") for i in range(0, 200, 2)]
+    playlist = Playlist(songs=items)
+    index = SortIndex(playlist)
+    assert len(index.sorted("title")) == 100
+
+    added = [make_item(f"song {i:03}") for i in range(1, changed * 2, 2)]
+    for item in added:
+        playlist.add(item)
+    for item in items[-changed:]:
+        playlist.remove_item(item.id)
+    playlist[0] = make_item("a song")
+
+    expected = sorted(titles(playlist), key=str.lower)
+    assert titles(index.sorted("title")) == expected
+    assert titles(index.sorted("title", reverse=True)) == expected[::-1]
+
+
+def test_sort_subset():
+    items = [make_item(title) for title in ("d", "b", "c", "a")]
+    index = SortIndex(Playlist(songs=items))
+
+    result = index.sort([items[0].id, items[3].id, items[1].id], "title")
+    assert titles(result) == ["a", "b", "d"]
@@ -0,0 +1,103 @@
+import base64
+import struct
+import wave
+
+import pytest
+from mousai.player.playlist import AudioMetaData, art_digest
+from mousai.player.tag_reader import TagError, read_art, read_metadata
+
+from conftest import TEST_FILE_PATH
+
+
+def ogg_page(granule, body, sequence, serial=1):
+    lacing = [255] * (len(body) // 255) + [len(body) % 255]
+    header = struct.pack(
+        "<4sBBqIIIB", b"OggS", 0, 0, granule, serial, sequence, 0, len(lacing)
+    )
+    return header + bytes(lacing) + body
+
+
+def vorbis_comments(*comments):
+    data = b"\x03vorbis" + struct.pack("<I", 6) + b"vendor"
+    data += struct.pack("<I", len(comments))
+    for comment in comments:
+        data += struct.pack("<I", len(comment)) + comment
+    return data + b"\x01"
+
+
+def test_mp3_same_as_eyed3():
+    meta = read_metadata(TEST_FILE_PATH)
+    expected = AudioMetaData.from_eyed3(TEST_FILE_PATH)
+
+    for field in ("artist", "album", "title", "genre", "release_date"):
+        assert getattr(meta, field) == getattr(expected, field)
+    assert meta.art.digest == expected.art.digest
+    # eyed3 counts ID3v1 tag at the end of file as audio
+    assert meta.playtime == pytest.approx(expected.playtime, abs=0.2)
+    assert art_digest(read_art(TEST_FILE_PATH)) == meta.art.digest
+
+
+def test_ogg_comments_and_picture(tmp_path):
+    image = bytes(range(256)) * 100
+    picture = (
+        struct.pack(">II", 3, 10)
+        + b"image/jpeg"
+        + struct.pack(">I", 0)
+        + bytes(16)
+        + struct.pack(">I", len(image))
+        + image
+    )
+    comments = vorbis_comments(
+        b"ARTIST=Artist",
+        b"title=Title",
+        b"METADATA_BLOCK_PICTURE=" + base64.b64encode(picture),
+        b"GENRE=Jazz",
+    )
+    identification = b"\x01vorbis" + struct.pack("<IBI", 0, 2, 8000) + bytes(15)
+    # comment header spans pages, other stream is multiplexed between them
+    path = tmp_path / "song.ogg"
+    path.write_bytes(
+        ogg_page(0, identification, 0)
+        + ogg_page(0, comments[:5000], 1)
+        + ogg_page(0, b"other stream", 0, serial=2)
+        + ogg_page(0, comments[5000:], 2)
+        + ogg_page(8000, b"a" * 300, 3)
+        + ogg_page(20000, b"b" * 300, 4)
+        + ogg_page(96000, b"c" * 300, 1, serial=2)
+    )
+
+    meta = read_metadata(path)
+
+    assert (meta.artist, meta.title, meta.genre) == ("Artist", "Title", "Jazz")
+    assert meta.playtime == 2.5
+    assert read_art(path) == image
+    assert meta.art.digest == art_digest(image)
+
+
+def test_wav_info(tmp_path):
+    path = tmp_path / "song.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(bytes(4 * 12000))
+    info = b"INFO" + b"INAM\x06\x00\x00\x00Title\x00" + b"ICRD\x04\x00\x00\x001999"
+    with open(path, "ab") as f:
+        f.write(b"LIST" + struct.pack("<I", len(info)) + info)
+
+    meta = read_metadata(path)
+
+    assert meta.playtime == 1.5
+    assert (meta.title, meta.release_date, meta.art) == ("Title", "1999", None)
+
+
+def test_unsupported_files(tmp_path):
+    path = tmp_path / "song.ogg"
+    path.write_bytes(b"not an ogg file")
+
+    with pytest.raises(TagError):
+        read_metadata(path)
+    # other formats than MP3 arent parsed by eyed3, only name is kept
+    assert AudioMetaData.from_file(path) == AudioMetaData("song.ogg")
+    with pytest.raises(FileNotFoundError):
+        AudioMetaData.from_file(tmp_path / "missing.mp3")
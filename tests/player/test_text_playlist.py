@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+from mousai.player.playlist import AudioMetaData, PlaylistItem
+from mousai.player.playlist_file import PlaylistFileError
+from mousai.player.text_playlist import (
+    count_entries,
+    playlist_items,
+    read_text_playlist,
+    save_text_playlist,
+)
+
+
+def test_read_m3u(tmp_path: Path):
+    playlist = tmp_path / "list.m3u8"
+    playlist.write_text(
+        "\ufeff#EXTM3U\n"
+        "#EXTINF:182,The Beatles - Something\n"
+        "Abbey Road/Something.mp3\n"
+        "\n"
+        "/music/Halo.ogg\n"
+        "#EXTINF:-1,Radio\n"
+        "http://example.com/stream\n"
+        "file:///music/Hello%20World.wav\n",
+        encoding="utf-8",
+    )
+
+    entries = list(read_text_playlist(playlist))
+    assert [entry.path for entry in entries] == [
+        tmp_path / "Abbey Road" / "Something.mp3",
+        Path("/music/Halo.ogg"),
+        Path("/music/Hello World.wav"),
+    ]
+    assert entries[0][1:] == ("Something", "The Beatles", 182)
+    # info applies only to the entry right after it
+    assert entries[1][1:] == (None, None, None)
+    assert count_entries(playlist) == 4
+
+
+def test_read_pls(tmp_path: Path):
+    playlist = tmp_path / "list.pls"
+    playlist.write_text(
+        "[playlist]\n"
+        "File1=song.mp3\n"
+        "Title1=Song\n"
+        "Length1=60\n"
+        "File2=/music/other.ogg\n"
+        "Length2=-1\n"
+        "NumberOfEntries=2\n"
+        "Version=2\n"
+    )
+
+    entries = list(read_text_playlist(playlist))
+    assert entries[0] == (tmp_path / "song.mp3", "Song", None, 60)
+    assert entries[1] == (Path("/music/other.ogg"), None, None, None)
+    assert count_entries(playlist) == 2
+
+    playlist.write_text("File1=song.mp3\n")
+    with pytest.raises(PlaylistFileError):
+        read_text_playlist(playlist)
+
+
+@pytest.mark.parametrize("name", ["list.m3u", "list.pls"])
+def test_save_and_read_back(tmp_path: Path, name: str):
+    items = [
+        PlaylistItem(
+            tmp_path / "music" / "Something.mp3",
+            AudioMetaData("Something.mp3", 182.4, "The Beatles", title="Something"),
+        ),
+        PlaylistItem("/other/Halo.ogg", AudioMetaData("Halo.ogg")),
+    ]
+    path = tmp_path / name
+
+    assert save_text_playlist(items, path) == 2
+    # songs next to playlist are stored with relative paths
+    assert str(tmp_path) not in path.read_text()
+    assert str(Path("/other/Halo.ogg")) in path.read_text()
+
+    entries = list(read_text_playlist(path))
+    assert [entry.path.resolve() for entry in entries] == [
+        item.path.resolve() for item in items
+    ]
+    assert entries[0][1:] == ("Something", "The Beatles", 182)
+    assert entries[1].title == "Halo"
+    assert entries[1].duration is None
+
+
+def test_playlist_items_reuse_playlist_info(tmp_path: Path):
+    path = tmp_path / "list.m3u"
+    path.write_text("#EXTINF:60,Artist - Title\na.mp3\nb.mp3\n#EXTINF:60,Text\nc.txt\n")
+
+    song, *paths = playlist_items(read_text_playlist(path))
+    assert isinstance(song, PlaylistItem)
+    assert song.meta == AudioMetaData("a.mp3", 60, "Artist", title="Title")
+    # songs without info and not supported files are parsed by importer
+    assert paths == [tmp_path / "b.mp3", tmp_path / "c.txt"]
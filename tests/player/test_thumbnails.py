@@ -0,0 +1,58 @@
+import pytest
+from mousai.player.art_store import ArtStore
+from mousai.player.playlist import AudioMetaData
+from mousai.player.thumbnails import ThumbnailCache
+
+from conftest import TEST_FILE_PATH
+
+
+@pytest.fixture
+def art_ref():
+    return AudioMetaData.from_file(TEST_FILE_PATH).art
+
+
+def render(data: bytes) -> bytes:
+    return b"thumbnail:" + data[:8]
+
+
+def test_get_renders_once(art_ref):
+    cache = ThumbnailCache(ArtStore(), render)
+
+    first = cache.get(art_ref)
+    second = cache.get(art_ref)
+
+    assert first is second
+    assert cache.stats == (1, 0, 1)
+    assert cache.get(None) is None
+
+
+def test_disk_cache(tmp_path, art_ref):
+    ThumbnailCache(ArtStore(), render, tmp_path).get(art_ref)
+    cache = ThumbnailCache(ArtStore(), render, tmp_path)
+
+    thumbnail = cache.get(art_ref)
+
+    assert thumbnail.startswith(b"thumbnail:")
+    assert cache.stats == (0, 1, 0)
+    assert (tmp_path / f"{art_ref.digest}.png").read_bytes() == thumbnail
+
+
+def test_prefetch(art_ref):
+    cache = ThumbnailCache(ArtStore(), render)
+
+    cache.prefetch([art_ref, None, art_ref])
+    cache.wait_idle()
+
+    assert art_ref.digest in cache
+    cache.get(art_ref)
+    assert cache.stats == (1, 0, 1)
+    cache.close()
+
+
+def test_lru_limit(art_ref):
+    cache = ThumbnailCache(ArtStore(), render, max_items=1)
+    cache.get(art_ref)
+    cache.get(art_ref._replace(digest="other"))
+
+    assert art_ref.digest not in cache
+    assert "other" in cache
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+from mousai.player.preloader import TrackPreloader
+from mousai.player.seek_index import build_seek_index
+from mousai.player.track_cache import TrackCache
+
+from conftest import TEST_FILE_PATH
+
+
+def test_load_from_memory(tmp_path):
+    path = tmp_path / "song.mp3"
+    shutil.copy(TEST_FILE_PATH, path)
+    cache = TrackCache()
+
+    first = cache.load(path)
+    second = cache.load(path)
+
+    assert first == TEST_FILE_PATH.read_bytes()
+    assert second is first
+    assert cache.stats == (1, 1, 1, len(first))
+    assert cache.stats.hit_rate == 0.5
+
+    # changed file is read again
+    path.write_bytes(b"new content")
+    os.utime(path, ns=(0, 0))
+    assert cache.get(path) is None
+    assert cache.load(path) == b"new content"
+    assert cache.size == len(b"new content")
+
+
+def test_memory_budget(tmp_path):
+    paths = []
+    for i, size in enumerate((30, 30, 30, 30, 31)):
+        paths.append(tmp_path / f"{i}.wav")
+        paths[-1].write_bytes(bytes(size))
+    cache = TrackCache(max_bytes=100)
+    cache.MAX_ENTRY_RATIO = 0.3
+
+    for path in paths[:3]:
+        cache.load(path)
+    cache.load(paths[0])  # `paths[0]` is now most recently used
+    cache.load(paths[3])
+
+    assert [path in cache for path in paths] == [True, False, True, True, False]
+    assert cache.size == 90
+    # too big to be cached, mixer streams it from disk
+    assert cache.load(paths[4]) is None
+
+    cache.resize(50)
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_preloader_fills_cache(test_file):
+    cache = TrackCache()
+    preloader = TrackPreloader(cache)
+    preloader.request(test_file)
+    preloader.wait_idle()
+
+    assert preloader.get(test_file) is cache.get(TEST_FILE_PATH)
+    # preloading doesnt count as load
+    assert cache.stats == (0, 0, 1, TEST_FILE_PATH.stat().st_size)
+
+    # song streamed from disk is read into cache only
+    cache.clear()
+    assert cache.get(TEST_FILE_PATH, record=True) is None
+    preloader.fill_cache(test_file)
+    preloader.wait_idle()
+    preloader.close()
+    assert cache.get(TEST_FILE_PATH, record=True) == TEST_FILE_PATH.read_bytes()
+    assert preloader.get(test_file) is not None
+    assert cache.stats[:2] == (1, 1)
+
+    # seeking slices cached file instead of reading it
+    index = build_seek_index(TEST_FILE_PATH)
+    position, stream = index.open_from(cache.get(TEST_FILE_PATH), 7.3)
+    assert (position, stream.read()) == index.read_from(TEST_FILE_PATH, 7.3)
@@ -0,0 +1,38 @@
+from mousai.scheduler import TickScheduler
+
+
+def test_blocks_when_not_playing():
+    assert TickScheduler().next_timeout(False) is None
+
+
+def test_wakes_up_when_displayed_second_changes():
+    scheduler = TickScheduler()
+
+    assert (
+        scheduler.next_timeout(True, True, 10_250, 60_000)
+        == 750 + scheduler.MIN_TIMEOUT
+    )
+    assert (
+        scheduler.next_timeout(True, True, 10_000, 60_000)
+        == 1000 + scheduler.MIN_TIMEOUT
+    )
+
+
+def test_hidden_window():
+    scheduler = TickScheduler()
+
+    assert (
+        scheduler.next_timeout(True, False, 10_250, 60_000) == scheduler.HIDDEN_TIMEOUT
+    )
+
+
+def test_end_of_song():
+    scheduler = TickScheduler()
+
+    assert scheduler.next_timeout(True, False, 59_500, 60_000) == scheduler.MIN_TIMEOUT
+    # dont oversleep into the end of song window
+    assert scheduler.next_timeout(True, False, 58_700, 60_000) == 300
+    assert (
+        scheduler.next_timeout(True, True, 5_000, 0)
+        == scheduler.UNKNOWN_DURATION_TIMEOUT
+    )
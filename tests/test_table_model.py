@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from mousai.table_model import TableModel
+
+
+def make_model(count, visible_rows=3):
+    items = [SimpleNamespace(id=i, name=f"song {i}") for i in range(count)]
+    formatted = []
+
+    def format_row(item):
+        formatted.append(item.id)
+        return [item.name]
+
+    return items, TableModel(items, format_row, visible_rows=visible_rows), formatted
+
+
+def test_formats_visible_rows_only():
+    _, model, formatted = make_model(1000)
+
+    assert model.get_visible_rows() == [
+        ["1", "song 0"],
+        ["2", "song 1"],
+        ["3", "song 2"],
+    ]
+    assert formatted == [0, 1, 2]
+
+    model.get_visible_rows()
+    assert formatted == [0, 1, 2]  # rows are cached
+
+
+def test_dirty_only_when_visible_rows_change():
+    items, model, _ = make_model(5)
+    model.get_visible_rows()
+    assert not model.dirty
+
+    items.append(SimpleNamespace(id=5, name="song 5"))
+    model.items_changed(5, 6)
+    assert not model.dirty
+
+    model.items_changed(1)
+    assert model.dirty
+
+
+def test_scrolling():
+    _, model, _ = make_model(10)
+
+    model.scroll_by(4)
+    assert model.get_visible_rows()[0] == ["5", "song 4"]
+    assert model.item_at(1).id == 5
+
+    model.scroll_to(100)
+    assert model.offset == model.max_offset == 7
+    model.scroll_by(-100)
+    assert model.offset == 0
+
+
+def test_clamps_offset_when_items_removed():
+    items, model, _ = make_model(10)
+    model.scroll_to(7)
+    model.get_visible_rows()
+
+    del items[5:]
+    model.items_changed(5)
+    assert model.dirty
+    assert model.offset == 2
+
+
+def test_invalidate():
+    items, model, formatted = make_model(3)
+    model.get_visible_rows()
+
+    items[1].name = "renamed"
+    model.invalidate(items[1])
+    assert model.get_visible_rows()[1] == ["2", "renamed"]
+    assert formatted == [0, 1, 2, 1]
+
+    model.invalidate_all()
+    model.get_visible_rows()
+    assert formatted == [0, 1, 2, 1, 0, 1, 2]
@@ -6,3 +6,19 @@ def test_playtime_to_str():
     assert utils.playtime_to_str(10) == "0:10"
     assert utils.playtime_to_str(0) == "0:00"
     assert utils.playtime_to_str(3600) == "60:00"
+
+
+def test_total_time_to_str():
+    assert utils.total_time_to_str(0) == "0:00:00"
+    assert utils.total_time_to_str(3725.4) == "1:02:05"
+    assert utils.total_time_to_str(2 * 86400 + 3 * 3600 + 245) == "2 d 3:04:05"
+
+
+def test_get_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.sys, "platform", "linux")
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+
+    data_dir = utils.get_data_dir()
+
+    assert data_dir == tmp_path / "mousai"
+    assert data_dir.is_dir()